@@ -0,0 +1,11 @@
+"""Offline benchmark suite
+
+Synthetic OHLCV universes (50-5000 tickers, daily and 15m bars) and a mocked
+yahooquery with injected latency; nothing touches the network. memory.*
+benchmarks report peak RSS growth of a fresh interpreter instead of time.
+Correctness checks (e.g. kernel parity with ta) live in tests/.
+
+    python -m benchmarks run --tickers 50 500 --save     # write the baseline
+    python -m benchmarks check --tolerance 0.25          # rerun and compare
+    python -m benchmarks run --tickers 2000 --only memory    # peak RSS, default vs MEMORY_LEAN
+"""
@@ -0,0 +1,101 @@
+"""Command-line entry point: python -m benchmarks"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from benchmarks.suite import BENCHMARKS, MEMORY_BENCHMARKS, run_suite
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def environment() -> dict:
+    return {
+        'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> bool:
+    """
+    Print a baseline vs current table
+
+    A benchmark regresses when its best time is more than `tolerance`
+    (fraction) slower than the baseline's best time.
+
+    Returns:
+        True if nothing regressed
+    """
+    ok = True
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>8}")
+
+    for key, base in baseline['results'].items():
+        if key not in current['results']:
+            print(f"{key:<45} {'':>12} {'missing':>12}")
+            continue
+
+        # Timings compare best times; memory benchmarks compare peak RSS growth
+        metric, scale, unit = ('peak_rss', 1 / 2**20, "MB") if 'peak_rss' in base else ('min', 1000, "ms")
+        before, after = base[metric], current['results'][key][metric]
+        ratio = after / before if before else float('inf')
+        regressed = ratio > 1 + tolerance
+        ok &= not regressed
+
+        flag = "  ❌ REGRESSION" if regressed else ""
+        print(f"{key:<45} {before * scale:10.2f}{unit} {after * scale:10.2f}{unit} {ratio:7.2f}x{flag}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write the results as JSON")
+    run.add_argument("--tickers", type=int, nargs="+", default=[50, 500], help="Universe sizes (50-5000)")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--only", nargs="+", default=None, help=f"Name prefixes ({', '.join([*BENCHMARKS, *MEMORY_BENCHMARKS])})")
+    run.add_argument("--output", default=None, help="Results file")
+    run.add_argument("--save", action="store_true", help=f"Write the results as the baseline ({DEFAULT_BASELINE})")
+
+    check = commands.add_parser("check", help="Compare against the baseline; exit 1 on regression")
+    check.add_argument("--baseline", default=DEFAULT_BASELINE)
+    check.add_argument("--results", default=None, help="Compare this results file instead of rerunning")
+    check.add_argument("--repeat", type=int, default=None)
+    check.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = {'environment': environment(), 'sizes': args.tickers, 'results': run_suite(args.tickers, args.repeat, args.only)}
+
+        for path in filter(None, [args.output, DEFAULT_BASELINE if args.save else None]):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            print(f"Results written: {path}")
+        return
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if args.results:
+        with open(args.results, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        names = sorted({key.split("[")[0] for key in baseline['results']})
+        repeat = args.repeat or next((r['repeat'] for r in baseline['results'].values() if 'repeat' in r), 3)
+        current = {'results': run_suite(baseline['sizes'], repeat, names)}
+
+    sys.exit(0 if compare(baseline, current, args.tolerance) else 1)
+
+
+if __name__ == "__main__":
+    main()
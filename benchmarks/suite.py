@@ -0,0 +1,526 @@
+"""Benchmark definitions and timing"""
+
+import contextlib
+import gc
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+import config.settings as settings
+from benchmarks.synthetic import BARS_PER_SESSION, MockTicker, make_frames, make_tickers
+
+DAILY_BARS = 250                        # ~1 year of daily bars
+INTRADAY_BARS = 5 * BARS_PER_SESSION    # DATA_PERIOD_INTRADAY of 15m bars
+FETCH_LATENCY = 0.05                    # Seconds per mocked yahooquery request
+
+# name -> setup(n_tickers) returning the callable to time
+BENCHMARKS: Dict[str, Callable[[int], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark; the setup runs untimed and returns the timed callable"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence Logger output while timing"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+class _Data:
+    """Synthetic inputs shared between benchmarks of one size"""
+
+    _cache: Dict[tuple, object] = {}
+
+    @classmethod
+    def get(cls, key: tuple, build: Callable):
+        if key not in cls._cache:
+            cls._cache[key] = build()
+        return cls._cache[key]
+
+    @classmethod
+    def daily(cls, n: int):
+        return cls.get(('daily', n), lambda: make_frames(n, DAILY_BARS, "1d"))
+
+    @classmethod
+    def intraday(cls, n: int):
+        return cls.get(('intraday', n), lambda: make_frames(n, INTRADAY_BARS, "15m"))
+
+    @classmethod
+    def latest(cls, n: int, kind: str):
+        from src.indicators import IndicatorCalculator
+
+        def build():
+            frames = cls.daily(n) if kind == 'daily' else cls.intraday(n)
+            return {
+                ticker: IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))
+                for ticker, df in frames.items()
+            }
+        return cls.get(('latest', kind, n), build)
+
+    @classmethod
+    def picks(cls, n: int):
+        from src.scanners.swing_scanner import SwingScanner
+        from src.scanners.intraday_scanner import IntradayScanner
+
+        def build():
+            return (SwingScanner().scan(cls.latest(n, 'daily')), IntradayScanner().scan(cls.latest(n, 'intraday')))
+        return cls.get(('picks', n), build)
+
+
+@benchmark("fetch.fetch_multiple_stocks")
+def _fetch(n: int):
+    from src.data_fetcher import DataFetcher
+    from src.utils.rate_limiter import TokenBucket
+
+    fetcher = DataFetcher(
+        use_cache=False,
+        rate_limiter=TokenBucket(None),
+        ticker_factory=MockTicker.factory(FETCH_LATENCY)
+    )
+    tickers = make_tickers(n)
+    return lambda: fetcher.fetch_multiple_stocks(tickers, period="1y", interval="1d")
+
+
+@benchmark("fetch.fetch_multiple_stocks.hung")
+def _fetch_hung(n: int):
+    """1% of .NS symbols (at least one) hang until the request timeout; hedging to .BO bounds the stage"""
+    from src.data_fetcher import DataFetcher
+    from src.utils.rate_limiter import TokenBucket
+
+    tickers = make_tickers(n)
+    fetcher = DataFetcher(
+        use_cache=False,
+        rate_limiter=TokenBucket(None),
+        ticker_factory=MockTicker.factory(FETCH_LATENCY, hang=tickers[::100])
+    )
+
+    def run():
+        saved = settings.FETCH_TIMEOUT
+        settings.FETCH_TIMEOUT = 2
+        try:
+            fetcher.fetch_multiple_stocks(tickers, period="1y", interval="1d")
+        finally:
+            settings.FETCH_TIMEOUT = saved
+
+    return run
+
+
+@benchmark("indicators.calculate_all.daily")
+def _calculate_all_daily(n: int):
+    from src.indicators import IndicatorCalculator
+    frames = _Data.daily(n)
+    return lambda: [IndicatorCalculator.calculate_all(df) for df in frames.values()]
+
+
+@benchmark("indicators.calculate_all.15m")
+def _calculate_all_intraday(n: int):
+    from src.indicators import IndicatorCalculator
+    frames = _Data.intraday(n)
+    return lambda: [IndicatorCalculator.calculate_all(df) for df in frames.values()]
+
+
+@contextlib.contextmanager
+def indicator_backend(name: str):
+    """Run IndicatorCalculator on one backend ("ta" or "numpy")"""
+    saved = settings.INDICATOR_BACKEND
+    settings.INDICATOR_BACKEND = name
+    try:
+        yield
+    finally:
+        settings.INDICATOR_BACKEND = saved
+
+
+def _calculate_all_on(backend: str, frames: Dict) -> Callable[[], object]:
+    from src.indicators import IndicatorCalculator
+
+    def run():
+        with indicator_backend(backend):
+            return [IndicatorCalculator.calculate_all(df) for df in frames.values()]
+    return run
+
+
+@benchmark("indicators.backend.ta.daily")
+def _backend_ta_daily(n: int):
+    return _calculate_all_on("ta", _Data.daily(n))
+
+
+@benchmark("indicators.backend.numpy.daily")
+def _backend_numpy_daily(n: int):
+    return _calculate_all_on("numpy", _Data.daily(n))
+
+
+@benchmark("indicators.backend.ta.15m")
+def _backend_ta_intraday(n: int):
+    return _calculate_all_on("ta", _Data.intraday(n))
+
+
+@benchmark("indicators.backend.numpy.15m")
+def _backend_numpy_intraday(n: int):
+    return _calculate_all_on("numpy", _Data.intraday(n))
+
+
+@benchmark("indicators.get_latest_values")
+def _get_latest_values(n: int):
+    from src.indicators import IndicatorCalculator
+    computed = [IndicatorCalculator.calculate_all(df) for df in _Data.daily(n).values()]
+    return lambda: [IndicatorCalculator.get_latest_values(df) for df in computed]
+
+
+@benchmark("indicators.panel")
+def _panel(n: int):
+    from src.pipeline import compute_snapshots
+    frames = _Data.daily(n)
+    return lambda: compute_snapshots(frames, engine="panel")
+
+
+def _rescan(frames: Dict, memo) -> Callable[[], object]:
+    from src.pipeline import compute_snapshots
+    from src.scanners.swing_scanner import SwingScanner
+
+    scanner = SwingScanner()
+    return lambda: scanner.scan_columns(*compute_snapshots(frames, scanner.REQUIRED_FIELDS, memo=memo))
+
+
+@benchmark("rescore.full")
+def _rescore_full(n: int):
+    """Swing scan of daily bars, every indicator recomputed"""
+    return _rescan(_Data.daily(n), None)
+
+
+@benchmark("rescore.unchanged")
+def _rescore_unchanged(n: int):
+    """The same scan again with a memo: only fingerprints, no indicators"""
+    from src.rescoring import SnapshotMemo
+
+    frames, memo = _Data.daily(n), SnapshotMemo()
+    rescan = _rescan(frames, memo)
+    rescan()
+    return rescan
+
+
+@benchmark("rescore.changed_10pct")
+def _rescore_changed(n: int):
+    """A tenth of the stocks get a new last bar between scans"""
+    from src.rescoring import SnapshotMemo
+
+    frames, memo = dict(_Data.daily(n)), SnapshotMemo()
+    moved = list(frames)[:max(1, n // 10)]
+    versions = [{ticker: frames[ticker] for ticker in moved}, {}]
+    for ticker in moved:
+        df = frames[ticker].copy()
+        df.iloc[-1, df.columns.get_loc('Close')] *= 1.01
+        versions[1][ticker] = df
+
+    rescan = _rescan(frames, memo)
+    rescan()
+    state = {'turn': 0}
+
+    def run():
+        state['turn'] ^= 1
+        frames.update(versions[state['turn']])
+        return rescan()
+
+    return run
+
+
+@benchmark("scanner.swing.scan")
+def _swing_scan(n: int):
+    from src.scanners.swing_scanner import SwingScanner
+    latest = _Data.latest(n, 'daily')
+    return lambda: SwingScanner().scan(latest)
+
+
+@benchmark("scanner.intraday.scan")
+def _intraday_scan(n: int):
+    from src.scanners.intraday_scanner import IntradayScanner
+    latest = _Data.latest(n, 'intraday')
+    return lambda: IntradayScanner().scan(latest)
+
+
+def _swing_variants(count: int):
+    """The swing strategy plus count-1 variants with other RSI bands and volume floors"""
+    from config.strategies import STRATEGIES
+    from src.scanners.rules import Strategy
+
+    spec = STRATEGIES['swing']
+    variants = [Strategy('swing', **spec)]
+    for k in range(1, count):
+        rules = [spec['rules'][0], f"{30 + k} <= rsi <= {70 + k}", f"not volume_ratio < {0.5 + 0.1 * k:.1f}"]
+        variants.append(Strategy(f"swing_{k}", **{**spec, 'rules': rules}))
+    return variants
+
+
+def _strategies(n: int, count: int, together: bool):
+    from src.pipeline import compute_snapshots
+    from src.scanners.rules import StrategySet
+
+    frames = _Data.daily(n)
+    strategies = _swing_variants(count)
+
+    if together:
+        combined = StrategySet(strategies)
+        return lambda: combined.scan_columns(*compute_snapshots(frames, combined.fields))
+
+    # One scanner per strategy, each with its own pass over the bars
+    separate = [StrategySet([strategy]) for strategy in strategies]
+    return lambda: [rules.scan_columns(*compute_snapshots(frames, rules.fields)) for rules in separate]
+
+
+@benchmark("rules.strategies.1")
+def _strategies_one(n: int):
+    """Snapshots of daily bars, then the swing strategy through the rule engine"""
+    return _strategies(n, 1, together=True)
+
+
+@benchmark("rules.strategies.10")
+def _strategies_ten(n: int):
+    """Ten swing variants evaluated in one pass over a shared snapshot"""
+    return _strategies(n, 10, together=True)
+
+
+@benchmark("rules.strategies.10.separate")
+def _strategies_ten_separate(n: int):
+    """The same ten variants as ten separate scans"""
+    return _strategies(n, 10, together=False)
+
+
+@benchmark("ai._build_prompt")
+def _build_prompt(n: int):
+    from src.ai_analyzer import AIAnalyzer
+    swing, intraday = _Data.picks(n)
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    return lambda: analyzer._build_prompt(swing, intraday, "daily")
+
+
+@benchmark("report.save_report")
+def _save_report(n: int):
+    import main
+    from src.utils.logger import Logger
+
+    swing, intraday = _Data.picks(n)
+    output_dir = tempfile.mkdtemp(prefix="bench_reports_")
+
+    def run():
+        saved = settings.OUTPUT_DIR, settings.HISTORY_DB
+        settings.OUTPUT_DIR = output_dir
+        settings.HISTORY_DB = os.path.join(output_dir, "history.db")
+        try:
+            main.save_report(swing, intraday, "Benchmark summary\n", Logger())
+        finally:
+            settings.OUTPUT_DIR, settings.HISTORY_DB = saved
+
+    return run
+
+
+ARCHIVE_BARS = 5 * DAILY_BARS    # Multi-year daily history
+
+
+def _multi_year(n: int):
+    return _Data.get(('multi_year', n), lambda: make_frames(n, ARCHIVE_BARS, "1d"))
+
+
+@benchmark("archive.cache_load_window")
+def _archive_baseline(n: int):
+    """5 years of daily bars per ticker through the per-ticker NPZ cache"""
+    from src.data_cache import OHLCVCache
+
+    frames = _multi_year(n)
+    cache = OHLCVCache(tempfile.mkdtemp(prefix="bench_cache_"))
+    for ticker, df in frames.items():
+        cache.save(ticker, "1d", df, {})
+    return lambda: cache.load_window(list(frames), "1d", "max")
+
+
+@benchmark("archive.read_many")
+def _archive_read(n: int):
+    """The same bars as memory-mapped slices of the bar archive"""
+    from src.bar_archive import BarArchive
+
+    frames = _multi_year(n)
+    archive = BarArchive(tempfile.mkdtemp(prefix="bench_archive_"))
+    archive.write(frames, "1d")
+    return lambda: archive.read_many(list(frames), "1d")
+
+
+@benchmark("archive.read_many.range")
+def _archive_read_range(n: int):
+    """One quarter of every ticker's archived history (binary search on the timestamps)"""
+    from src.bar_archive import BarArchive
+
+    frames = _multi_year(n)
+    archive = BarArchive(tempfile.mkdtemp(prefix="bench_archive_"))
+    archive.write(frames, "1d")
+    index = next(iter(frames.values())).index
+    start, end = index[-DAILY_BARS], index[-DAILY_BARS + 63]
+    return lambda: archive.read_many(list(frames), "1d", start, end)
+
+
+@benchmark("archive.calculate_from_archive")
+def _archive_calculate(n: int):
+    """calculate_all straight off the archive maps"""
+    from src.bar_archive import BarArchive
+    from src.indicators import IndicatorCalculator
+
+    frames = _multi_year(n)
+    archive = BarArchive(tempfile.mkdtemp(prefix="bench_archive_"))
+    archive.write(frames, "1d")
+    return lambda: [IndicatorCalculator.calculate_from_archive(archive, ticker, "1d") for ticker in frames]
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_python(args: List[str], cwd: str):
+    """Run a fresh interpreter (startup cost included) with the repo importable"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    subprocess.run([sys.executable] + args, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+@benchmark("cli.import_main")
+def _import_main(n: int):
+    return lambda: _run_python(["-c", "import main"], REPO_ROOT)
+
+
+@benchmark("cli.intraday_from_cache")
+def _intraday_from_cache(n: int):
+    """`python main.py intraday --from-cache` against a warm synthetic cache"""
+    from src.data_cache import OHLCVCache, count_sessions
+
+    workdir = tempfile.mkdtemp(prefix="bench_cli_")
+    frames = _Data.intraday(n)
+    cache = OHLCVCache(os.path.join(workdir, settings.CACHE_DIR))
+    for ticker, df in frames.items():
+        cache.save(ticker, settings.INTRADAY_INTERVAL, df, {settings.DATA_PERIOD_INTRADAY: count_sessions(df.index)})
+
+    universe = os.path.join(workdir, "universe.txt")
+    with open(universe, 'w', encoding='utf-8') as f:
+        f.write("\n".join(frames))
+
+    # Relative CACHE_DIR / OUTPUT_DIR resolve inside the scratch directory
+    main_path = os.path.join(REPO_ROOT, "main.py")
+    return lambda: _run_python([main_path, "intraday", "--from-cache", "--universe", universe], workdir)
+
+
+# name -> script(n_tickers) run in a fresh interpreter; its peak RSS growth is reported
+MEMORY_BENCHMARKS: Dict[str, Callable[[int], str]] = {}
+
+HOLD_SCRIPT = """
+import resource
+import config.settings as settings
+settings.MEMORY_LEAN = {lean}
+from benchmarks.synthetic import MockTicker, make_tickers
+from src.data_fetcher import DataFetcher
+from src.indicators import IndicatorCalculator
+from src.utils.rate_limiter import TokenBucket
+
+fetcher = DataFetcher(use_cache=False, rate_limiter=TokenBucket(None),
+                      ticker_factory=MockTicker.factory(0.0, {{'15m': {bars}}}))
+start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+frames = fetcher.fetch_multiple_stocks(make_tickers({n}), period="60d", interval="15m")
+computed = {{ticker: IndicatorCalculator.calculate_all(df) for ticker, df in frames.items()}}
+print((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start) * 1024)
+"""
+
+
+def memory_benchmark(name: str):
+    """Register a peak-RSS benchmark; the setup returns the script to run"""
+    def register(setup):
+        MEMORY_BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@memory_benchmark("memory.hold_15m.default")
+def _hold_default(n: int) -> str:
+    """Peak RSS growth while holding n tickers of 60 sessions of 15m bars, fetched and computed"""
+    return HOLD_SCRIPT.format(lean=False, bars=60 * BARS_PER_SESSION, n=n)
+
+
+@memory_benchmark("memory.hold_15m.lean")
+def _hold_lean(n: int) -> str:
+    """Same as memory.hold_15m.default with settings.MEMORY_LEAN"""
+    return HOLD_SCRIPT.format(lean=True, bars=60 * BARS_PER_SESSION, n=n)
+
+
+def peak_rss(script: str) -> int:
+    """Bytes the script's peak RSS grew by (printed by the script)"""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run([sys.executable, "-c", script], cwd=REPO_ROOT, env=env, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return int(result.stdout.strip().splitlines()[-1])
+
+
+def time_call(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Wall-clock timings of `repeat` calls (GC off while timing)"""
+    timings = []
+
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'repeat': repeat,
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    repeat: int = 3,
+    only: Optional[List[str]] = None,
+    progress: Callable[[str], None] = print
+) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmarks at every universe size
+
+    Args:
+        sizes: Universe sizes (number of tickers)
+        repeat: Timed runs per benchmark
+        only: Benchmark name prefixes to run (None = all)
+        progress: Called with one line per finished benchmark
+
+    Returns:
+        Dictionary {"<name>[<size>]": timing stats, or {'peak_rss': bytes}
+        for memory benchmarks}
+    """
+    results = {}
+
+    for n in sizes:
+        for name, setup in BENCHMARKS.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+
+            key = f"{name}[{n}]"
+            with quiet():
+                func = setup(n)
+                stats = time_call(func, repeat)
+
+            results[key] = stats
+            progress(f"{key:<45} min {stats['min'] * 1000:10.2f} ms   median {stats['median'] * 1000:10.2f} ms")
+
+        for name, setup in MEMORY_BENCHMARKS.items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+
+            key = f"{name}[{n}]"
+            results[key] = {'peak_rss': peak_rss(setup(n))}
+            progress(f"{key:<45} peak RSS +{results[key]['peak_rss'] / 2**20:9.1f} MB")
+
+    return results
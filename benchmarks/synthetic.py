@@ -0,0 +1,133 @@
+"""Synthetic OHLCV data and an offline stand-in for yahooquery.Ticker"""
+
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+import config.settings as settings
+
+BARS_PER_SESSION = 25   # 15m bars from 09:15 to 15:15
+
+
+def make_index(n_bars: int, interval: str = "1d", end: Optional[pd.Timestamp] = None) -> pd.DatetimeIndex:
+    """
+    Bar timestamps ending at `end` (defaults to today)
+
+    Daily bars are business days at midnight; 15m bars follow the NSE
+    session (09:15-15:30 IST) on business days.
+    """
+    end = end or pd.Timestamp.now().normalize()
+
+    if interval == "1d":
+        return pd.bdate_range(end=end.tz_localize(None).normalize(), periods=n_bars)
+
+    if interval != "15m":
+        raise ValueError(f"Unsupported synthetic interval: {interval}")
+
+    days = pd.bdate_range(end=end.tz_localize(None).normalize(), periods=-(-n_bars // BARS_PER_SESSION))
+    offsets = pd.timedelta_range(settings.MARKET_OPEN + ":00", periods=BARS_PER_SESSION, freq="15min")
+    stamps = (days.values[:, None] + offsets.values[None, :]).ravel()[-n_bars:]
+
+    return pd.DatetimeIndex(stamps).tz_localize(settings.MARKET_TIMEZONE)
+
+
+def make_frame(n_bars: int, interval: str = "1d", seed: int = 0, end: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+    """
+    One ticker's OHLCV history
+
+    A geometric random walk with a per-ticker price level and volatility,
+    highs/lows around the open-close range and lognormal volume, in the
+    column layout DataFetcher returns.
+    """
+    rng = np.random.default_rng(seed)
+    index = make_index(n_bars, interval, end)
+
+    level = rng.uniform(50, 5000)
+    vol = rng.uniform(0.008, 0.025) * (1.0 if interval == "1d" else 0.2)
+
+    close = level * np.exp(np.cumsum(rng.normal(0.0002, vol, n_bars)))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, vol / 4, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, vol / 2, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, vol / 2, n_bars)))
+    volume = np.round(rng.lognormal(np.log(rng.uniform(1e4, 1e6)), 0.5, n_bars))
+
+    return pd.DataFrame({
+        'Open': open_, 'High': high, 'Low': low, 'Close': close,
+        'Volume': volume, 'Adj Close': close,
+    }, index=index)
+
+
+def make_tickers(n_tickers: int) -> List[str]:
+    return [f"SYN{i:04d}.NS" for i in range(n_tickers)]
+
+
+def make_frames(n_tickers: int, n_bars: int, interval: str = "1d", seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Dictionary {ticker: OHLCV frame} for a synthetic universe"""
+    end = pd.Timestamp.now().normalize()
+    return {
+        ticker: make_frame(n_bars, interval, seed + i, end)
+        for i, ticker in enumerate(make_tickers(n_tickers))
+    }
+
+
+class MockTicker:
+    """
+    Offline yahooquery.Ticker: history() returns synthetic bars after a delay
+
+    Build one with MockTicker.factory(latency) and pass it to
+    DataFetcher(ticker_factory=...). Responses use yahooquery's layout (a
+    (symbol, date) MultiIndex with lower-case columns). Requests including
+    a `hang` symbol stall until the request timeout and then raise, and
+    requests including a `fail` symbol raise at once.
+    """
+
+    def __init__(
+        self,
+        symbols,
+        latency: float = 0.0,
+        n_bars: Optional[Dict[str, int]] = None,
+        hang: Iterable[str] = (),
+        fail: Iterable[str] = (),
+        timeout: float = 5
+    ):
+        self.symbols = symbols if isinstance(symbols, list) else symbols.split()
+        self.latency = latency
+        self.n_bars = n_bars or {'1d': 250, '15m': 5 * BARS_PER_SESSION}
+        self.hang = set(hang)
+        self.fail = set(fail)
+        self.timeout = timeout
+
+    @classmethod
+    def factory(
+        cls,
+        latency: float = 0.0,
+        n_bars: Optional[Dict[str, int]] = None,
+        hang: Iterable[str] = (),
+        fail: Iterable[str] = ()
+    ):
+        def make(symbols, timeout: float = 5, **kwargs):
+            return cls(symbols, latency, n_bars, hang, fail, timeout)
+        return make
+
+    def history(self, period: str = "ytd", interval: str = "1d", start=None, end=None) -> pd.DataFrame:
+        if self.fail.intersection(self.symbols):
+            raise ConnectionError("connection reset by peer")
+        if self.hang.intersection(self.symbols):
+            time.sleep(self.timeout)
+            raise TimeoutError(f"read timed out ({self.timeout}s)")
+
+        time.sleep(self.latency)
+
+        frames = []
+        for symbol in self.symbols:
+            df = make_frame(self.n_bars[interval], interval, seed=zlib.crc32(symbol.encode()))
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start, tz=df.index.tz)]
+
+            df = df.drop(columns=['Adj Close']).rename(columns=str.lower)
+            df['adjclose'] = df['close']
+            df.index = pd.MultiIndex.from_product([[symbol], df.index], names=['symbol', 'date'])
+            frames.append(df)
+
+        return pd.concat(frames)
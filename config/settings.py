@@ -4,12 +4,23 @@
 DATA_PERIOD_SWING = "60d"      # 60 days for swing analysis
 DATA_PERIOD_INTRADAY = "5d"    # 5 days for intraday
 INTRADAY_INTERVAL = "15m"      # 15-minute candles
+RESAMPLE_BASE_INTERVAL = "15m" # Fetch this once, build coarser bars locally (None = fetch each interval)
+RESAMPLE_BASE_HISTORY = "60d"  # History the upstream keeps at the base interval (daily bars need 50 sessions of it)
+
+# NSE session (bar boundaries are anchored to the open)
+MARKET_TIMEZONE = "Asia/Kolkata"
+MARKET_OPEN = "09:15"
+MARKET_CLOSE = "15:30"
 
 # Indicator parameters
 EMA_SHORT = 20
 EMA_LONG = 50
 RSI_PERIOD = 14
 VOLUME_PERIOD = 20
+INDICATOR_ENGINE = "panel"      # "panel" (whole universe), "lazy" (tail-only) or "per_ticker"
+INDICATOR_BACKEND = "numpy"     # "numpy" (src.kernels) or "ta" (reference library) for IndicatorCalculator
+LAZY_TOLERANCE = 1e-6           # Max influence of history dropped by the lazy engine
+MEMORY_LEAN = False             # OHLCV only, float32 prices/indicators, no copies (may differ in the last digits)
 
 # Swing scanner thresholds (RELAXED)
 SWING_RSI_MIN = 35              # Lowered from 40
@@ -23,4 +34,68 @@ INTRADAY_VOLUME_SPIKE = 0.8     # Lowered from 1.5
 
 # Output settings
 TOP_N_STOCKS = 3
-OUTPUT_DIR = "outputs"
\ No newline at end of file
+OUTPUT_DIR = "outputs"
+HISTORY_ENABLED = True          # Also append every run's picks to the history store
+HISTORY_DB = "outputs/history.db"
+
+# Instrumentation
+METRICS_ENABLED = True          # Record stage timings and counters (no-op when False)
+METRICS_EXPORT = True           # Write metrics_<ts>.json / .prom next to the report
+METRICS_SERVER_WINDOW = 1000    # Latest samples per metric kept by the server for /metrics
+
+# Cache settings
+CACHE_ENABLED = True
+CACHE_DIR = "cache"             # Per-ticker OHLCV cache (delta fetch)
+ARCHIVE_ENABLED = False         # Also merge every fetch into the memory-mapped bar archive
+ARCHIVE_DIR = "archive"         # Multi-year bar archive (src.bar_archive)
+RESCORE_ENABLED = True          # Recompute indicators only for stocks whose bars changed since the last scan
+RESCORE_DIR = "cache/rescore"   # Per-timeframe bar fingerprints, snapshots and last picks
+
+# Fetch settings
+FETCH_BATCH_SIZE = 10           # Symbols per yahooquery request
+FETCH_MAX_WORKERS = 4           # Concurrent batch requests
+FETCH_RATE_LIMIT = 2.0          # Requests per second (0 = unlimited)
+FETCH_RATE_BURST = 4            # Requests allowed back-to-back
+FETCH_TIMEOUT = 10              # Seconds before an upstream request is abandoned
+FETCH_RETRIES = 2               # Retries after a failed request (jittered exponential backoff)
+FETCH_BACKOFF_BASE = 0.5        # Upper bound of the first retry delay (seconds, doubles per retry)
+FETCH_BACKOFF_MAX = 8           # Largest retry delay bound (seconds)
+FETCH_BREAKER_FAILURES = 5      # Consecutive failures that open a host's circuit
+FETCH_BREAKER_RESET = 30        # Seconds an open circuit waits before a trial request
+FETCH_FALLBACK = {".NS": ".BO"} # Exchange tried when the primary fails, has no data or is slow
+FETCH_HEDGE_PERCENTILE = 0.95   # Fire the fallback in parallel once a request is slower than this
+FETCH_HEDGE_MIN_SAMPLES = 5     # Latencies needed before the percentile is trusted
+FETCH_HEDGE_DELAY = 3.0         # Hedge threshold until then (None = never hedge)
+FETCH_DEADLINE = 60             # Seconds the whole fetch stage may take before giving up on stragglers
+
+# Watch mode settings
+WATCH_GRACE_SECONDS = 20        # Wait after a candle closes before fetching it
+WATCH_HOLIDAYS = ()             # Exchange holidays ("YYYY-MM-DD") slept through like weekends
+
+# Server mode settings
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_SOCKET = None            # Unix socket path (serves there instead of TCP)
+SERVER_REFRESH_SECONDS = 60     # Delay between refreshes of the in-memory state
+
+# Backtest settings
+BACKTEST_HORIZONS = [1, 5, 10]  # Forward-return horizons (bars)
+BACKTEST_WORKERS = None         # Process pool size (None = CPU count)
+
+# Universe / pipeline settings
+UNIVERSE = "nifty50"            # Built-in name, config/universes/<name>.txt|csv, or a path
+PIPELINE_SHARD_SIZE = 100       # Tickers per worker task
+PIPELINE_WORKERS = None         # Process pool size (None = CPU count)
+
+# Parameter sweep settings
+SWEEP_HORIZON = 5               # Forward-return horizon used to rank parameter sets
+SWEEP_MAX_CELLS = 20_000_000    # Max (params x bars x tickers) cells evaluated per chunk
+
+# AI analysis settings
+AI_MODEL = "llama-3.3-70b-versatile"
+AI_TIMEOUT = 20                 # Hard deadline (seconds) before falling back
+AI_CACHE_ENABLED = True
+AI_CACHE_TTL = 6 * 3600         # Seconds a cached analysis stays fresh
+AI_CACHE_MAX_ENTRIES = 200      # Cached analyses kept (least recently used evicted)
+AI_STREAM_COMMENTARY = False    # Per-pick commentary streamed as it is generated
+AI_MAX_CONCURRENCY = 4          # Concurrent requests in streaming mode
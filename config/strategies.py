@@ -0,0 +1,57 @@
+"""Scan strategies as declarative rules over indicator snapshot fields
+
+Each strategy is compiled by src.scanners.rules into NumPy expressions and
+all of them are evaluated together in one pass over a snapshot batch.
+
+Expressions are Python syntax over snapshot fields (close, ema20, ema50,
+rsi, volume, volume_ma, volume_ratio, atr, vwap, prev_close), numbers,
+UPPERCASE config.settings names (read at scan time), + - * /, comparisons
+(chains allowed), and/or/not, and min(a, b), max(a, b), abs(x), isnan(x).
+Comparisons with a missing value (NaN) are false.
+
+    rules:          All must hold for a stock to qualify
+    score:          Terms summed into the score, in order (rounded to 2 places)
+    status:         (condition, label) pairs; the first that holds wins
+    default_status: Label when no status condition holds
+"""
+
+STRATEGIES = {
+    # Daily timeframe
+    'swing': {
+        'rules': [
+            "close > ema20 > ema50",                        # Uptrend
+            "SWING_RSI_MIN <= rsi <= SWING_RSI_MAX",        # RSI in healthy range
+            "not volume_ratio < SWING_MIN_VOLUME_RATIO",    # Volume not too weak
+        ],
+        'score': [
+            "min((ema20 - ema50) / ema50 * 100 * 10, 40)",  # Trend strength (40 points)
+            "max(30 - abs(rsi - 55) * 0.5, 0)",             # RSI positioning, best around 50-60 (30 points)
+            "min(volume_ratio * 15, 30)",                   # Volume (30 points)
+        ],
+        'status': [
+            ("abs(close - ema20) / ema20 < 0.01", "READY"),  # Price pulled back to EMA20
+            ("rsi > 68", "WAIT (RSI high)"),                # RSI overextended
+        ],
+        'default_status': "READY",
+    },
+
+    # INTRADAY_INTERVAL timeframe
+    'intraday': {
+        'rules': [
+            "not isnan(vwap)",                              # Must have VWAP (None or NaN; a NaN VWAP once qualified with a NaN score)
+            "not close <= vwap",                            # Price above VWAP (bullish bias)
+            "not ema20 <= ema50",                           # EMA20 > EMA50 (momentum)
+            "INTRADAY_RSI_MIN <= rsi <= INTRADAY_RSI_MAX",  # RSI not extreme
+        ],
+        'score': [
+            "min((close - vwap) / vwap * 100 * 30, 30)",    # Distance from VWAP (30 points)
+            "min((volume_ratio - 1) * 20, 40)",             # Volume spike (40 points)
+            "max((rsi - 50) * 0.6, 0)",                     # RSI momentum (30 points)
+        ],
+        'status': [
+            ("volume_ratio < 0.8", "WAIT (Low volume)"),    # Volume dried up
+            ("abs(close - vwap) / vwap > 0.02", "WAIT (Far from VWAP)"),
+        ],
+        'default_status': "READY",
+    },
+}
@@ -0,0 +1,81 @@
+"""Stock universe registry
+
+A universe is either a built-in list (e.g. 'nifty50') or a file: a name
+found in config/universes/ (<name>.txt or <name>.csv) or any path. Text
+files hold one symbol per line ('#' starts a comment); CSV files need a
+'Symbol' column, as in the index constituent lists published by NSE.
+Symbols without an exchange suffix get DEFAULT_SUFFIX.
+"""
+
+import csv
+import os
+from typing import List
+from config.nifty50 import get_nifty50_tickers
+
+UNIVERSE_DIR = os.path.join(os.path.dirname(__file__), "universes")
+DEFAULT_SUFFIX = ".NS"
+
+_BUILTIN = {
+    "nifty50": get_nifty50_tickers,
+}
+
+
+def list_universes() -> List[str]:
+    """Returns names of the built-in and file-based universes"""
+    names = set(_BUILTIN)
+
+    if os.path.isdir(UNIVERSE_DIR):
+        for filename in os.listdir(UNIVERSE_DIR):
+            name, ext = os.path.splitext(filename)
+            if ext in (".txt", ".csv"):
+                names.add(name)
+
+    return sorted(names)
+
+
+def load_universe(name: str) -> List[str]:
+    """
+    Returns the ticker list for a universe name or file path
+
+    Args:
+        name: Built-in name, file name in config/universes/, or a path
+
+    Returns:
+        List of stock symbols (duplicates removed, order kept)
+    """
+    if name in _BUILTIN:
+        return list(_BUILTIN[name]())
+
+    path = _resolve_path(name)
+    if path is None:
+        raise ValueError(f"Unknown universe '{name}'. Available: {', '.join(list_universes())}")
+
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            symbols = [row["Symbol"] for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            symbols = [line.split("#", 1)[0] for line in f]
+
+    tickers = []
+    for symbol in symbols:
+        symbol = symbol.strip().upper()
+        if not symbol:
+            continue
+        if "." not in symbol:
+            symbol += DEFAULT_SUFFIX
+        tickers.append(symbol)
+
+    return list(dict.fromkeys(tickers))
+
+
+def _resolve_path(name: str):
+    if os.path.isfile(name):
+        return name
+
+    for ext in (".txt", ".csv"):
+        path = os.path.join(UNIVERSE_DIR, name + ext)
+        if os.path.isfile(path):
+            return path
+
+    return None
@@ -4,50 +4,128 @@ Main execution file
 """
 
 import os
+import sys
+import argparse
 from datetime import datetime
-from config.nifty50 import get_nifty50_tickers
+from colorama import Fore, Style
 import config.settings as settings
-from src.data_fetcher import DataFetcher
-from src.indicators import IndicatorCalculator
-from src.scanners.swing_scanner import SwingScanner
-from src.scanners.intraday_scanner import IntradayScanner
-from src.ai_analyzer import AIAnalyzer
 from src.utils.logger import Logger
+from src.utils.metrics import metrics
 
-def main():
+# Heavy modules (pandas, ta, yahooquery, groq) are imported inside the stages
+# that use them, so each subcommand only pays for what it runs.
+
+def main(universe=settings.UNIVERSE, stream_ai=settings.AI_STREAM_COMMENTARY, from_cache=False):
     """Main execution flow"""
     
     logger = Logger()
     logger.header(f"🚀 NIFTY 50 AI SCANNER - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Initialize components
-    fetcher = DataFetcher()
-    calculator = IndicatorCalculator()
-    swing_scanner = SwingScanner()
-    intraday_scanner = IntradayScanner()
+    pipeline = build_pipeline(universe, from_cache, logger)
+    
+    # ========== SWING ANALYSIS (Daily) ==========
+    swing_picks = run_swing(pipeline, logger)
+    
+    # ========== INTRADAY ANALYSIS (15-min) ==========
+    intraday_picks = run_intraday(pipeline, logger)
+    
+    from src.ai_analyzer import AIAnalyzer
     ai_analyzer = AIAnalyzer()
     
-    # Get NIFTY 50 tickers
-    tickers = get_nifty50_tickers()
-    logger.info(f"Scanning {len(tickers)} NIFTY 50 stocks...")
+    if stream_ai:
+        print_intraday_picks(intraday_picks)
+        
+        # ========== AI COMMENTARY (streamed into terminal and report) ==========
+        logger.header("🤖 AI ANALYSIS")
+        
+        with metrics.span("stage", stage="ai"):
+            f, filename = open_report(swing_picks, intraday_picks)
+            with f:
+                print()
+                ai_analyzer.stream_commentary(swing_picks, intraday_picks, [sys.stdout, f])
+        logger.success(f"Report saved: {filename}")
+        record_history(swing_picks, intraday_picks, filename)
+    else:
+        # Start the AI call now so it overlaps with printing the results
+        pending_analysis = ai_analyzer.start_analysis(swing_picks, intraday_picks)
+        
+        # Display intraday results
+        print_intraday_picks(intraday_picks)
+        
+        # ========== AI ANALYSIS ==========
+        logger.header("🤖 AI ANALYSIS")
+        
+        with metrics.span("stage", stage="ai"):
+            ai_summary = pending_analysis.result()
+        print(f"\n{ai_summary}\n")
+        
+        # ========== SAVE REPORT ==========
+        save_report(swing_picks, intraday_picks, ai_summary, logger)
+    
+    logger.success("✅ Scan complete!")
+    report_metrics(logger)
+
+def build_pipeline(universe, from_cache, logger, timeframes=None):
+    """Scan pipeline for a universe (cached bars only with from_cache)"""
+    
+    from config.universes import load_universe
+    from src.pipeline import ScanPipeline
+    
+    # Get universe tickers
+    tickers = load_universe(universe)
+    source = "cached bars" if from_cache else "live data"
+    logger.info(f"Scanning {len(tickers)} stocks ({universe}, {source})...")
+    
+    # Fetch -> indicators -> snapshots, sharded across processes for large universes
+    return ScanPipeline(tickers, from_cache=from_cache, timeframes=timeframes)
+
+def run_swing(pipeline, logger):
+    """Swing scan on daily bars; prints and returns the picks"""
+    
+    from src.scanners.swing_scanner import SwingScanner
     
-    # ========== SWING ANALYSIS (Daily) ==========
     logger.header("📊 SWING SCANNER (Daily Timeframe)")
     
-    swing_data_raw = fetcher.fetch_multiple_stocks(
-        tickers, 
-        period=settings.DATA_PERIOD_SWING,
-        interval="1d"
-    )
+    with metrics.span("stage", stage="swing"):
+        swing_picks = pipeline.scan(
+            SwingScanner(),
+            period=settings.DATA_PERIOD_SWING,
+            interval="1d"
+        )
+    
+    log_changes(pipeline, SwingScanner, logger)
+    print_swing_picks(swing_picks)
+    return swing_picks
+
+def run_intraday(pipeline, logger):
+    """Intraday scan on INTRADAY_INTERVAL bars; returns the picks (printed by the caller)"""
+    
+    from src.scanners.intraday_scanner import IntradayScanner
+    
+    logger.header("⚡ INTRADAY SCANNER (15-min Timeframe)")
+    
+    with metrics.span("stage", stage="intraday"):
+        intraday_picks = pipeline.scan(
+            IntradayScanner(),
+            period=settings.DATA_PERIOD_INTRADAY,
+            interval=settings.INTRADAY_INTERVAL
+        )
+    
+    log_changes(pipeline, IntradayScanner, logger)
+    return intraday_picks
+
+def log_changes(pipeline, scanner_class, logger):
+    """Log what changed in a scanner's picks since its previous scan"""
     
-    swing_data_processed = {}
-    for ticker, df in swing_data_raw.items():
-        df_with_indicators = calculator.calculate_all(df)
-        swing_data_processed[ticker] = calculator.get_latest_values(df_with_indicators)
+    from src.rescoring import format_diff
     
-    swing_picks = swing_scanner.scan(swing_data_processed)
+    changes = pipeline.changes.get(scanner_class.__name__)
+    if changes is not None:
+        logger.info(f"🔁 Since last scan: {format_diff(changes)}")
+
+def print_swing_picks(swing_picks):
+    """Display swing results"""
     
-    # Display swing results
     print(f"\n{Fore.BLUE}{'='*60}")
     print(f"{Fore.BLUE}🟦 TOP {settings.TOP_N_STOCKS} SWING PICKS")
     print(f"{Fore.BLUE}{'='*60}{Style.RESET_ALL}\n")
@@ -60,24 +138,59 @@ def main():
         print(f"   Score: {pick['score']}/100")
         print(f"   Close: ₹{ind['close']:.2f} | EMA20: ₹{ind['ema20']:.2f} | EMA50: ₹{ind['ema50']:.2f}")
         print(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x{Style.RESET_ALL}\n")
+
+def scan_only(scanner, universe, from_cache):
+    """`swing` / `intraday` subcommands: one scanner, report without AI"""
     
-    # ========== INTRADAY ANALYSIS (15-min) ==========
-    logger.header("⚡ INTRADAY SCANNER (15-min Timeframe)")
+    logger = Logger()
+    logger.header(f"🚀 NIFTY 50 {scanner.upper()} SCAN - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Only this scanner's timeframe is built from the resampled bars
+    timeframe = (settings.DATA_PERIOD_SWING, "1d") if scanner == "swing" else (settings.DATA_PERIOD_INTRADAY, settings.INTRADAY_INTERVAL)
+    pipeline = build_pipeline(universe, from_cache, logger, [timeframe])
     
-    intraday_data_raw = fetcher.fetch_multiple_stocks(
-        tickers,
-        period=settings.DATA_PERIOD_INTRADAY,
-        interval=settings.INTRADAY_INTERVAL
-    )
+    swing_picks, intraday_picks = [], []
+    if scanner == "swing":
+        swing_picks = run_swing(pipeline, logger)
+    else:
+        intraday_picks = run_intraday(pipeline, logger)
+        print_intraday_picks(intraday_picks)
+    
+    save_report(swing_picks, intraday_picks, "AI analysis skipped (run `python main.py ai`)\n", logger)
+    
+    logger.success("✅ Scan complete!")
+    report_metrics(logger)
+
+def analyze_latest(stream_ai=settings.AI_STREAM_COMMENTARY):
+    """`ai` subcommand: AI analysis of the most recently recorded picks, no rescan"""
+    
+    from src.ai_analyzer import AIAnalyzer
+    from src.history import HistoryStore
+    
+    logger = Logger()
+    logger.header("🤖 AI ANALYSIS (latest recorded picks)")
+    
+    with HistoryStore() as store:
+        swing_picks = store.latest_picks("swing")
+        intraday_picks = store.latest_picks("intraday")
+    
+    if not swing_picks and not intraday_picks:
+        logger.warning("No recorded picks yet - run a scan first")
+        return
+    
+    ai_analyzer = AIAnalyzer()
     
-    intraday_data_processed = {}
-    for ticker, df in intraday_data_raw.items():
-        df_with_indicators = calculator.calculate_all(df)
-        intraday_data_processed[ticker] = calculator.get_latest_values(df_with_indicators)
+    with metrics.span("stage", stage="ai"):
+        if stream_ai:
+            ai_analyzer.stream_commentary(swing_picks, intraday_picks, [sys.stdout])
+        else:
+            print(f"\n{ai_analyzer.analyze_results(swing_picks, intraday_picks)}\n")
     
-    intraday_picks = intraday_scanner.scan(intraday_data_processed)
+    report_metrics(logger)
+
+def print_intraday_picks(intraday_picks):
+    """Display intraday results"""
     
-    # Display intraday results
     print(f"\n{Fore.RED}{'='*60}")
     print(f"{Fore.RED}🟥 TOP {settings.TOP_N_STOCKS} INTRADAY PICKS")
     print(f"{Fore.RED}{'='*60}{Style.RESET_ALL}\n")
@@ -90,55 +203,173 @@ def main():
         print(f"   Score: {pick['score']}/100")
         print(f"   Close: ₹{ind['close']:.2f} | VWAP: ₹{ind['vwap']:.2f}")
         print(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x{Style.RESET_ALL}\n")
+
+def watch(universe=settings.UNIVERSE):
+    """Stay resident and rescan intraday on every candle close"""
+    
+    logger = Logger()
+    logger.header(f"👀 NIFTY 50 INTRADAY WATCH - {settings.INTRADAY_INTERVAL} candles")
     
-    # ========== AI ANALYSIS ==========
-    logger.header("🤖 AI ANALYSIS")
+    from config.universes import load_universe
+    from src.data_fetcher import DataFetcher
+    from src.watcher import IntradayWatcher
     
-    ai_summary = ai_analyzer.analyze_results(swing_picks, intraday_picks)
-    print(f"\n{ai_summary}\n")
+    def on_change(intraday_picks):
+        print_intraday_picks(intraday_picks)
+        save_report([], intraday_picks, "AI analysis skipped (watch mode)\n", logger)
     
-    # ========== SAVE REPORT ==========
-    save_report(swing_picks, intraday_picks, ai_summary, logger)
+    watcher = IntradayWatcher(load_universe(universe), DataFetcher(), on_change=on_change)
     
-    logger.success("✅ Scan complete!")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logger.info("Watch stopped")
+        report_metrics(logger)
+
+def serve(universe=settings.UNIVERSE, host=None, port=None, socket_path=None, refresh_seconds=None):
+    """Stay resident, refresh on a schedule and serve the latest state over HTTP"""
+    
+    logger = Logger()
+    logger.header(f"🛰️  NIFTY 50 SCAN SERVER - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    from config.universes import load_universe
+    from src.server import serve as run_server
+    
+    run_server(load_universe(universe), host, port, socket_path or settings.SERVER_SOCKET, refresh_seconds)
+    report_metrics(logger)
 
 def save_report(swing_picks, intraday_picks, ai_summary, logger):
     """Save results to file"""
     
-    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    with metrics.span("report.write"):
+        f, filename = open_report(swing_picks, intraday_picks)
+        
+        with f:
+            f.write(ai_summary)
     
-    filename = f"{settings.OUTPUT_DIR}/scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    logger.success(f"Report saved: {filename}")
+    record_history(swing_picks, intraday_picks, filename)
+
+def record_history(swing_picks, intraday_picks, filename):
+    """Append the run's picks to the history store"""
     
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(f"NIFTY 50 SCANNER REPORT\n")
-        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"{'='*60}\n\n")
-        
-        f.write(f"🟦 SWING PICKS (Daily)\n")
-        f.write(f"{'-'*60}\n")
-        for i, pick in enumerate(swing_picks, 1):
-            ind = pick['indicators']
-            f.write(f"{i}. {pick['ticker'].replace('.NS', '')} - {pick['status']}\n")
-            f.write(f"   Score: {pick['score']}/100\n")
-            f.write(f"   Close: ₹{ind['close']:.2f} | EMA20: ₹{ind['ema20']:.2f} | EMA50: ₹{ind['ema50']:.2f}\n")
-            f.write(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x\n\n")
+    if not settings.HISTORY_ENABLED:
+        return
+    
+    from src.history import HistoryStore
+    
+    with metrics.span("report.history"), HistoryStore() as store:
+        store.record_run(swing_picks, intraday_picks, report=filename)
+
+def report_metrics(logger):
+    """Print the run's p50/p95 timings and export them as JSON and Prometheus text"""
+    
+    if not metrics.enabled:
+        return
+    
+    logger.header("⏱️  RUN METRICS")
+    print(metrics.summary())
+    
+    if settings.METRICS_EXPORT:
+        os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
         
-        f.write(f"\n🟥 INTRADAY PICKS (15-min)\n")
-        f.write(f"{'-'*60}\n")
-        for i, pick in enumerate(intraday_picks, 1):
-            ind = pick['indicators']
-            f.write(f"{i}. {pick['ticker'].replace('.NS', '')} - {pick['status']}\n")
-            f.write(f"   Score: {pick['score']}/100\n")
-            f.write(f"   CLOSE: ₹{ind['close']:.2f} | VWAP: ₹{ind['vwap']:.2f}\n")
-            f.write(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x\n\n")
+        base = f"{settings.OUTPUT_DIR}/metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        metrics.to_json(f"{base}.json")
+        with open(f"{base}.prom", 'w', encoding='utf-8') as f:
+            f.write(metrics.to_prometheus())
         
-        f.write(f"\n🤖 AI ANALYSIS \n")
-        f.write(f"{'-'*60}\n")
-        f.write(ai_summary)
+        logger.success(f"Metrics saved: {base}.json, {base}.prom")
+
+def open_report(swing_picks, intraday_picks):
+    """Create a report file with the picks written, open for the AI section"""
     
-    logger.success(f"Report saved: {filename}")
+    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    
+    filename = f"{settings.OUTPUT_DIR}/scan_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    
+    f = open(filename, 'w', encoding='utf-8')
+    f.write(f"NIFTY 50 SCANNER REPORT\n")
+    f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    f.write(f"{'='*60}\n\n")
+    
+    f.write(f"🟦 SWING PICKS (Daily)\n")
+    f.write(f"{'-'*60}\n")
+    for i, pick in enumerate(swing_picks, 1):
+        ind = pick['indicators']
+        f.write(f"{i}. {pick['ticker'].replace('.NS', '')} - {pick['status']}\n")
+        f.write(f"   Score: {pick['score']}/100\n")
+        f.write(f"   Close: ₹{ind['close']:.2f} | EMA20: ₹{ind['ema20']:.2f} | EMA50: ₹{ind['ema50']:.2f}\n")
+        f.write(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x\n\n")
+    
+    f.write(f"\n🟥 INTRADAY PICKS (15-min)\n")
+    f.write(f"{'-'*60}\n")
+    for i, pick in enumerate(intraday_picks, 1):
+        ind = pick['indicators']
+        f.write(f"{i}. {pick['ticker'].replace('.NS', '')} - {pick['status']}\n")
+        f.write(f"   Score: {pick['score']}/100\n")
+        f.write(f"   CLOSE: ₹{ind['close']:.2f} | VWAP: ₹{ind['vwap']:.2f}\n")
+        f.write(f"   RSI: {ind['rsi']:.1f} | Vol Ratio: {ind['volume_ratio']:.2f}x\n\n")
+    
+    f.write(f"\n🤖 AI ANALYSIS \n")
+    f.write(f"{'-'*60}\n")
+    
+    return f, filename
+
+def build_parser():
+    """Command-line interface; no subcommand runs the full scan + AI report"""
+    
+    parser = argparse.ArgumentParser(description="NIFTY 50 AI-Powered Stock Scanner")
+    parser.add_argument("--watch", action="store_true",
+                        help=f"Stay running and rescan intraday on every {settings.INTRADAY_INTERVAL} candle close")
+    parser.add_argument("--universe", default=settings.UNIVERSE,
+                        help="Universe to scan: built-in name, config/universes/<name>.txt|csv, or a file path")
+    parser.add_argument("--stream-ai", action="store_true", default=settings.AI_STREAM_COMMENTARY,
+                        help="Stream a market overview and per-pick AI commentary as it is generated")
+    
+    commands = parser.add_subparsers(dest="command")
+    
+    for name, help_text in (
+        ("swing", "Swing scan only (daily bars), report without AI"),
+        ("intraday", f"Intraday scan only ({settings.INTRADAY_INTERVAL} bars), report without AI"),
+        ("report", "Both scans, AI analysis and the report (the default)"),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--from-cache", action="store_true",
+                             help="Use the cached bars only (no network)")
+        command.add_argument("--universe", default=argparse.SUPPRESS)
+        if name == "report":
+            command.add_argument("--stream-ai", action="store_true", default=argparse.SUPPRESS)
+    
+    ai = commands.add_parser("ai", help="AI analysis of the most recently recorded picks (no rescan)")
+    ai.add_argument("--stream-ai", action="store_true", default=argparse.SUPPRESS)
+    
+    watch_command = commands.add_parser("watch", help=f"Rescan intraday on every {settings.INTRADAY_INTERVAL} candle close")
+    watch_command.add_argument("--universe", default=argparse.SUPPRESS)
+    
+    serve_command = commands.add_parser("serve", help="Keep the latest picks and indicators in memory and serve them over HTTP")
+    serve_command.add_argument("--universe", default=argparse.SUPPRESS)
+    serve_command.add_argument("--host", default=None, help=f"Bind address (default {settings.SERVER_HOST})")
+    serve_command.add_argument("--port", type=int, default=None, help=f"TCP port (default {settings.SERVER_PORT})")
+    serve_command.add_argument("--socket", default=None, help="Serve on this Unix socket instead of TCP")
+    serve_command.add_argument("--refresh", type=float, default=None,
+                               help=f"Seconds between refreshes (default {settings.SERVER_REFRESH_SECONDS})")
+    
+    return parser
+
+def cli(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or ("watch" if args.watch else "report")
+    
+    if command == "watch":
+        watch(args.universe)
+    elif command == "serve":
+        serve(args.universe, args.host, args.port, args.socket, args.refresh)
+    elif command == "ai":
+        analyze_latest(stream_ai=args.stream_ai)
+    elif command == "report":
+        main(args.universe, stream_ai=args.stream_ai, from_cache=getattr(args, "from_cache", False))
+    else:
+        scan_only(command, args.universe, args.from_cache)
 
 if __name__ == "__main__":
-    # Add missing import
-    from colorama import Fore, Style
-    main()
\ No newline at end of file
+    cli()
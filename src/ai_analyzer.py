@@ -64,56 +64,330 @@
 """AI-powered analysis using Groq"""
 
 import os
-from groq import Groq  # Changed from anthropic
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from groq import Groq, AsyncGroq  # Changed from anthropic
 from dotenv import load_dotenv
-from typing import List, Dict
+from typing import List, Dict, Optional, TextIO, Tuple
+import config.settings as settings
 from src.utils.logger import Logger
+from src.utils.metrics import metrics
+from src.utils.response_cache import ResponseCache
 
 load_dotenv()
 
+
+class PendingAnalysis:
+    """An AI analysis running in the background with a hard deadline"""
+    
+    def __init__(self, future: Future, deadline: float, fallback):
+        self.future = future
+        self.deadline = deadline
+        self.fallback = fallback
+        self.logger = Logger()
+    
+    def result(self) -> str:
+        """Wait until the deadline at most, then fall back"""
+        try:
+            return self.future.result(timeout=max(0.0, self.deadline - time.monotonic()))
+        except FutureTimeout:
+            self.logger.warning("AI analysis timed out")
+            return self.fallback("timed out")
+        except Exception as e:
+            self.logger.error(f"AI analysis failed: {str(e)}")
+            return self.fallback(str(e))
+
+
+class OrderedStreamWriter:
+    """
+    Writes concurrently generated sections to the sinks in order
+
+    The first unfinished section streams straight through; later sections
+    buffer until every section before them is complete, so output starts
+    with the first token of the first response and never interleaves.
+    """
+    
+    def __init__(self, sinks: List[TextIO], headers: List[str]):
+        self.sinks = sinks
+        self.buffers = [[header] for header in headers]
+        self.done = [False] * len(headers)
+        self.head = 0
+        
+        if headers:
+            self._flush_head()
+    
+    def write(self, index: int, text: str):
+        self.buffers[index].append(text)
+        if index == self.head:
+            self._flush_head()
+    
+    def finish(self, index: int):
+        self.done[index] = True
+        while self.head < len(self.done) and self.done[self.head]:
+            self.head += 1
+            if self.head < len(self.done):
+                self._flush_head()
+    
+    def _flush_head(self):
+        text = "".join(self.buffers[self.head])
+        self.buffers[self.head] = []
+        if not text:
+            return
+        for sink in self.sinks:
+            sink.write(text)
+            sink.flush()
+
+
 class AIAnalyzer:
-    def __init__(self):
+    def __init__(
+        self,
+        client=None,
+        cache: Optional[ResponseCache] = None,
+        timeout: Optional[float] = None,
+        model: Optional[str] = None,
+        async_client=None
+    ):
+        """
+        Args:
+            client: Groq-compatible client (chat.completions.create); built from
+                    GROQ_API_KEY / GROQ_BASE_URL when not given
+            async_client: AsyncGroq-compatible client for stream_commentary
+                          (built per run from the same variables when not given)
+            cache: Response cache (defaults to one under settings.CACHE_DIR)
+            timeout: Hard deadline in seconds for one analysis
+            model: Chat model name
+        """
         self.logger = Logger()
+        self.timeout = settings.AI_TIMEOUT if timeout is None else timeout
+        self.model = model or settings.AI_MODEL
+        
+        if cache is None and settings.AI_CACHE_ENABLED:
+            cache = ResponseCache(
+                os.path.join(settings.CACHE_DIR, "ai"),
+                ttl=settings.AI_CACHE_TTL,
+                max_entries=settings.AI_CACHE_MAX_ENTRIES
+            )
+        self.cache = cache
+        self.async_client = async_client
+        
         # Change the variable name in your .env file to GROQ_API_KEY
-        api_key = os.getenv("GROQ_API_KEY") 
+        self.api_key = os.getenv("GROQ_API_KEY") 
+        # GROQ_BASE_URL points the clients at another (e.g. local) endpoint
+        self.base_url = os.getenv("GROQ_BASE_URL") or None
         
-        if not api_key:
-            self.logger.warning("GROQ_API_KEY not found. AI analysis will be skipped.")
+        if client is not None:
+            self.client = client
+        elif not self.api_key:
+            if async_client is None:
+                self.logger.warning("GROQ_API_KEY not found. AI analysis will be skipped.")
             self.client = None
         else:
-            self.client = Groq(api_key=api_key) # Changed to Groq client
+            self.client = Groq(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout)
     
     def analyze_results(self, swing_picks: List[Dict], intraday_picks: List[Dict], scan_type: str = "daily") -> str:
-        if not self.client:
-            return "⚠️ AI analysis unavailable (API key not configured)"
+        return self.start_analysis(swing_picks, intraday_picks, scan_type).result()
+    
+    def start_analysis(self, swing_picks: List[Dict], intraday_picks: List[Dict], scan_type: str = "daily") -> PendingAnalysis:
+        """
+        Start the analysis without blocking
         
+        A fresh cached response for the same prompt is returned immediately.
+        Otherwise the request runs on a daemon thread; if it misses the
+        deadline, result() falls back to a stale cached response or a
+        placeholder, and a late answer is still cached for the next run.
+        
+        Returns:
+            PendingAnalysis; call result() to collect the summary
+        """
         prompt = self._build_prompt(swing_picks, intraday_picks, scan_type)
+        key = ResponseCache.key_for(f"{self.model}\n{prompt}")
+        future = Future()
         
-        try:
+        def fallback(reason: str) -> str:
+            stale = self.cache.get_stale(key) if self.cache else None
+            if stale is not None:
+                self.logger.warning("Using an expired cached AI analysis")
+                return stale
+            return f"⚠️ AI analysis unavailable: {reason}"
+        
+        cached = self.cache.get(key) if self.cache else None
+        if cached is not None:
+            self.logger.info("Using cached AI analysis (picks unchanged)")
+            metrics.count("ai.cache_hits")
+            future.set_result(cached)
+        elif not self.client:
+            future.set_result(fallback("API key not configured"))
+        else:
             self.logger.info("Generating AI analysis via Groq...")
-            
+            threading.Thread(target=self._request, args=(prompt, key, future), daemon=True).start()
+        
+        return PendingAnalysis(future, time.monotonic() + self.timeout, fallback)
+    
+    def _request(self, prompt: str, key: str, future: Future):
+        """Background thread: call the model and cache the answer"""
+        try:
             # Updated for Groq's syntax and model
-            response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile", # <--- THIS is your new model
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            with metrics.span("ai.request", mode="summary"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{
+                        "role": "user",
+                        "content": prompt
+                    }]
+                )
+            text = response.choices[0].message.content
+            self._count_tokens(getattr(response, 'usage', None))
             
-            return response.choices[0].message.content
-        
+            if self.cache:
+                self.cache.set(key, text)
         except Exception as e:
-            self.logger.error(f"AI analysis failed: {str(e)}")
-            return f"⚠️ AI analysis unavailable: {str(e)}"
-
-  
+            future.set_exception(e)
+            return
+        
+        future.set_result(text)
     
+    def stream_commentary(
+        self,
+        swing_picks: List[Dict],
+        intraday_picks: List[Dict],
+        sinks: List[TextIO]
+    ) -> str:
+        """
+        Market overview plus one commentary per pick, streamed as generated
+        
+        Requests run concurrently (at most settings.AI_MAX_CONCURRENCY at a
+        time) and tokens are written to every sink as they arrive, in pick
+        order. Each section is cached like analyze_results and is bounded by
+        the same timeout; a section that fails or times out before its first
+        token falls back to an expired cached answer when there is one.
+        
+        Args:
+            swing_picks: Top swing stocks
+            intraday_picks: Top intraday stocks
+            sinks: Text streams to write to (e.g. sys.stdout and the report file)
+        
+        Returns:
+            The full commentary text
+        """
+        sections = [("📈 MARKET OVERVIEW", self._build_overview_prompt(swing_picks, intraday_picks))]
+        sections += [
+            (f"🟦 {stock['ticker'].replace('.NS', '')} (swing)", self._build_pick_prompt(stock, "swing"))
+            for stock in swing_picks
+        ]
+        sections += [
+            (f"🟥 {stock['ticker'].replace('.NS', '')} (intraday)", self._build_pick_prompt(stock, "intraday"))
+            for stock in intraday_picks
+        ]
+        
+        texts = asyncio.run(self._stream_sections(sections, sinks))
+        return "".join(f"{title}\n{text}\n\n" for (title, _), text in zip(sections, texts))
     
+    async def _stream_sections(self, sections: List[Tuple[str, str]], sinks: List[TextIO]) -> List[str]:
+        client = self.async_client
+        owns_client = client is None and self.api_key is not None
+        if owns_client:
+            client = AsyncGroq(api_key=self.api_key, base_url=self.base_url, timeout=self.timeout)
+        
+        writer = OrderedStreamWriter(sinks, [f"{title}\n" for title, _ in sections])
+        semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        
+        try:
+            return await asyncio.gather(*(
+                self._stream_section(client, index, prompt, writer, semaphore)
+                for index, (_, prompt) in enumerate(sections)
+            ))
+        finally:
+            if owns_client:
+                await client.close()
     
+    async def _stream_section(
+        self,
+        client,
+        index: int,
+        prompt: str,
+        writer: OrderedStreamWriter,
+        semaphore: asyncio.Semaphore
+    ) -> str:
+        """Stream one completion into its section; returns the section text"""
+        key = ResponseCache.key_for(f"{self.model}\n{prompt}")
+        cached = self.cache.get(key) if self.cache else None
+        parts = []
+        
+        def emit(text: str):
+            parts.append(text)
+            writer.write(index, text)
+        
+        if cached is not None:
+            metrics.count("ai.cache_hits")
+            emit(cached)
+        elif client is None:
+            emit("⚠️ AI analysis unavailable (API key not configured)")
+        else:
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(self._stream_completion(client, prompt, emit), self.timeout)
+                    if self.cache:
+                        self.cache.set(key, "".join(parts))
+                except asyncio.TimeoutError:
+                    self.logger.warning("AI commentary timed out")
+                    self._fallback_section(key, parts, emit, "timed out")
+                except Exception as e:
+                    self.logger.error(f"AI commentary failed: {str(e)}")
+                    self._fallback_section(key, parts, emit, str(e))
+        
+        writer.write(index, "\n\n")
+        writer.finish(index)
+        return "".join(parts)
     
+    def _fallback_section(self, key: str, parts: List[str], emit, reason: str):
+        """Finish a failed section with an expired cached answer, or a marker"""
+        if parts:
+            # Tokens already went out: an older answer cannot be spliced in
+            emit(f" ⚠️ ({reason})")
+            return
+        
+        stale = self.cache.get_stale(key) if self.cache else None
+        if stale is not None:
+            self.logger.warning("Using an expired cached AI commentary")
+            emit(stale)
+        else:
+            emit(f"⚠️ AI analysis unavailable: {reason}")
     
+    async def _stream_completion(self, client, prompt: str, emit):
+        start = time.perf_counter()
+        first_token = None
+        
+        stream = await client.chat.completions.create(
+            model=self.model,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }],
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                    metrics.observe("ai.first_token", first_token)
+                emit(chunk.choices[0].delta.content)
+            
+            # Groq reports usage on the final chunk
+            x_groq = getattr(chunk, 'x_groq', None)
+            self._count_tokens(getattr(x_groq, 'usage', None))
+        
+        metrics.observe("ai.request", time.perf_counter() - start, mode="stream")
     
+    @staticmethod
+    def _count_tokens(usage):
+        if usage is None:
+            return
+        metrics.count("ai.prompt_tokens", getattr(usage, 'prompt_tokens', 0) or 0)
+        metrics.count("ai.completion_tokens", getattr(usage, 'completion_tokens', 0) or 0)
+
     def _build_prompt(self, swing: List, intraday: List, scan_type: str) -> str:
         """Build prompt for Claude"""
         
@@ -125,27 +399,12 @@ class AIAnalyzer:
 """
         
         for i, stock in enumerate(swing, 1):
-            ind = stock['indicators']
-            prompt += f"""
-{i}. {stock['ticker'].replace('.NS', '')} - Score: {stock['score']}/100
-   • Close: ₹{ind['close']:.2f}
-   • EMA20: ₹{ind['ema20']:.2f} | EMA50: ₹{ind['ema50']:.2f}
-   • RSI: {ind['rsi']:.1f}
-   • Volume Ratio: {ind['volume_ratio']:.2f}x
-   • Status: {stock['status']}
-"""
+            prompt += self._format_swing_pick(i, stock)
         
         prompt += "\n🟥 INTRADAY PICKS (15-min Timeframe):\n"
         
         for i, stock in enumerate(intraday, 1):
-            ind = stock['indicators']
-            prompt += f"""
-{i}. {stock['ticker'].replace('.NS', '')} - Score: {stock['score']}/100
-   • Close: ₹{ind['close']:.2f} | VWAP: ₹{ind['vwap']:.2f}
-   • RSI: {ind['rsi']:.1f}
-   • Volume Ratio: {ind['volume_ratio']:.2f}x
-   • Status: {stock['status']}
-"""
+            prompt += self._format_intraday_pick(i, stock)
         
         prompt += """
 
@@ -157,4 +416,56 @@ Provide a concise analysis covering:
 
 Keep it professional, actionable, and under 150 words total."""
         
-        return prompt
\ No newline at end of file
+        return prompt
+    
+    def _build_overview_prompt(self, swing: List, intraday: List) -> str:
+        """Short market-overview prompt for streaming mode"""
+        
+        prompt = "You are a professional stock market analyst. These NIFTY 50 stocks passed today's swing and intraday scans:\n"
+        
+        for i, stock in enumerate(swing, 1):
+            prompt += self._format_swing_pick(i, stock)
+        for i, stock in enumerate(intraday, 1):
+            prompt += self._format_intraday_pick(i, stock)
+        
+        prompt += """
+In 2-3 sentences, describe the overall market sentiment these picks suggest and one risk to watch. Do not discuss individual stocks."""
+        
+        return prompt
+    
+    def _build_pick_prompt(self, stock: Dict, timeframe: str) -> str:
+        """Prompt for one pick in streaming mode"""
+        
+        if timeframe == "swing":
+            details = self._format_swing_pick(1, stock)
+            setup = "a swing trade (daily timeframe)"
+        else:
+            details = self._format_intraday_pick(1, stock)
+            setup = "an intraday trade (15-min timeframe)"
+        
+        return f"""You are a professional stock market analyst. This NIFTY 50 stock was flagged as {setup}:
+{details}
+In 2 sentences, explain why the setup looks strong and name the level that would invalidate it."""
+    
+    @staticmethod
+    def _format_swing_pick(i: int, stock: Dict) -> str:
+        ind = stock['indicators']
+        return f"""
+{i}. {stock['ticker'].replace('.NS', '')} - Score: {stock['score']}/100
+   • Close: ₹{ind['close']:.2f}
+   • EMA20: ₹{ind['ema20']:.2f} | EMA50: ₹{ind['ema50']:.2f}
+   • RSI: {ind['rsi']:.1f}
+   • Volume Ratio: {ind['volume_ratio']:.2f}x
+   • Status: {stock['status']}
+"""
+    
+    @staticmethod
+    def _format_intraday_pick(i: int, stock: Dict) -> str:
+        ind = stock['indicators']
+        return f"""
+{i}. {stock['ticker'].replace('.NS', '')} - Score: {stock['score']}/100
+   • Close: ₹{ind['close']:.2f} | VWAP: ₹{ind['vwap']:.2f}
+   • RSI: {ind['rsi']:.1f}
+   • Volume Ratio: {ind['volume_ratio']:.2f}x
+   • Status: {stock['status']}
+"""
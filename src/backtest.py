@@ -0,0 +1,356 @@
+"""Historical backtest: replay the scanners' rules over every past bar"""
+
+import argparse
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+import config.settings as settings
+from src.indicators import IndicatorCalculator
+from src.scanners import columnar
+from src.scanners.swing_scanner import SwingScanner
+from src.scanners.intraday_scanner import IntradayScanner
+from src.snapshot import SNAPSHOT_FIELDS
+from src.utils.logger import Logger
+
+MIN_BARS = 50   # Same history requirement as IndicatorCalculator.get_latest_values
+
+SCANNERS = {
+    'swing': SwingScanner,
+    'intraday': IntradayScanner,
+}
+
+# calculate_all column -> snapshot field
+_COLUMN_FIELDS = {
+    'Close': 'close', 'EMA20': 'ema20', 'EMA50': 'ema50', 'RSI': 'rsi',
+    'Volume': 'volume', 'Volume_MA': 'volume_ma', 'Volume_Ratio': 'volume_ratio',
+    'ATR': 'atr', 'VWAP': 'vwap',
+}
+
+
+def _indicator_chunk(items: List[Tuple[str, pd.DataFrame]]) -> List[Tuple[str, pd.DataFrame]]:
+    """Process-pool worker: calculate_all for a chunk of tickers"""
+    results = []
+
+    for ticker, df in items:
+        if len(df) < 14:
+            # Too short for ATR; the ticker could never pass the 50-bar rule anyway
+            continue
+
+        df = IndicatorCalculator.calculate_all(df)
+        columns = {field: df[column].to_numpy(dtype=np.float64) for column, field in _COLUMN_FIELDS.items()}
+        columns['prev_close'] = np.concatenate([columns['close'][:1], columns['close'][:-1]])
+        columns['bars'] = np.arange(1, len(df) + 1, dtype=np.float64)
+
+        results.append((ticker, pd.DataFrame(columns, index=df.index)))
+
+    return results
+
+
+class HistoryPanel:
+    """
+    Indicator history for a universe on a shared (dates x tickers) grid
+
+    Each snapshot field is a 2-D array; entry [t, j] is what
+    get_latest_values would have returned for ticker j at bar t (NaN where
+    the ticker has no bar). `valid` marks entries with at least MIN_BARS of
+    history, matching the live scanners.
+    """
+
+    def __init__(self, index: pd.DatetimeIndex, tickers: List[str], fields: Dict[str, np.ndarray]):
+        self.index = index
+        self.tickers = tickers
+        self.fields = fields
+        self.valid = fields['bars'] >= MIN_BARS
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> 'HistoryPanel':
+        """
+        Calculate indicators once per ticker across a process pool and align them
+
+        Args:
+            frames: Dictionary {ticker: OHLCV dataframe}
+            workers: Pool size (1 = run in-process)
+            chunk_size: Tickers per task (defaults to ~4 tasks per worker)
+
+        Returns:
+            HistoryPanel over the union of all bar timestamps
+        """
+        workers = workers or settings.BACKTEST_WORKERS or os.cpu_count() or 1
+        items = list(frames.items())
+        chunk_size = chunk_size or max(1, math.ceil(len(items) / (workers * 4)))
+        chunks = [items[i:i+chunk_size] for i in range(0, len(items), chunk_size)]
+
+        if workers == 1:
+            computed = [_indicator_chunk(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                computed = list(pool.map(_indicator_chunk, chunks))
+
+        per_ticker = dict(pair for chunk in computed for pair in chunk)
+        tickers = list(per_ticker)
+
+        index = pd.DatetimeIndex([])
+        for df in per_ticker.values():
+            index = index.union(df.index)
+
+        fields = {}
+        for field in list(SNAPSHOT_FIELDS) + ['bars']:
+            grid = np.full((len(index), len(tickers)), np.nan)
+            for j, ticker in enumerate(tickers):
+                df = per_ticker[ticker]
+                grid[index.get_indexer(df.index), j] = df[field].to_numpy()
+            fields[field] = grid
+
+        return cls(index, tickers, fields)
+
+    def save(self, path: str):
+        """Write the panel to an NPZ file so later runs can skip fetch and indicators"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        tz = str(self.index.tz) if self.index.tz is not None else ""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                index=self.index.as_unit('ns').asi8,
+                tz=np.array(tz),
+                tickers=np.array(self.tickers),
+                **{f"field_{name}": values for name, values in self.fields.items()}
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'HistoryPanel':
+        """Read a panel written by save()"""
+        with np.load(path, allow_pickle=False) as archive:
+            tz = str(archive['tz'])
+            index = pd.to_datetime(archive['index'], unit='ns', utc=bool(tz))
+            if tz:
+                index = index.tz_convert(tz)
+
+            fields = {
+                key[len("field_"):]: archive[key]
+                for key in archive.files if key.startswith("field_")
+            }
+
+            return cls(pd.DatetimeIndex(index), [str(t) for t in archive['tickers']], fields)
+
+    def forward_returns(self, horizon: int) -> np.ndarray:
+        """Close-to-close return from bar t to bar t + horizon (NaN past the end)"""
+        close = self.fields['close']
+        future = np.full_like(close, np.nan)
+        future[:-horizon or None] = close[horizon:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return future / close - 1
+
+
+class Backtester:
+    """Evaluates a scanner's rules at every historical bar and tracks its picks"""
+
+    def __init__(
+        self,
+        scanner=None,
+        horizons: Sequence[int] = None,
+        top_n: Optional[int] = None
+    ):
+        """
+        Args:
+            scanner: SwingScanner or IntradayScanner instance
+            horizons: Forward-return horizons in bars
+            top_n: Picks per bar (defaults to settings.TOP_N_STOCKS)
+        """
+        self.logger = Logger()
+        self.scanner = scanner or SwingScanner()
+        self.horizons = list(horizons or settings.BACKTEST_HORIZONS)
+        self.top_n = top_n or settings.TOP_N_STOCKS
+
+    def select(self, panel: HistoryPanel) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-N picks at every bar, using the scanner's vectorized rules
+
+        Masks and raw scores are computed for the whole panel at once; each
+        bar is then ranked like the live scan_columns (Python rounding, ties
+        broken by ticker position), so backtest picks match live picks.
+
+        Returns:
+            Tuple of (pick indices, scores), both (dates x top_n); slots with
+            fewer than top_n qualified tickers hold -1 / -inf
+        """
+        cols = panel.fields
+        mask = self.scanner.qualify_mask(cols) & panel.valid
+        raw_scores = self.scanner.raw_score_array(cols)
+
+        n = min(self.top_n, mask.shape[1])
+        picks = np.full((mask.shape[0], n), -1, dtype=np.int64)
+        top_scores = np.full((mask.shape[0], n), -np.inf)
+        if n == 0:
+            return picks, top_scores
+
+        for t in np.flatnonzero(mask.any(axis=1)):
+            scores = columnar.round_top_scores(raw_scores[t], mask[t], n)
+            top = columnar.top_n_indices(scores, mask[t], n)
+            picks[t, :len(top)] = top
+            top_scores[t, :len(top)] = scores[top]
+
+        return picks, top_scores
+
+    def run(self, panel: HistoryPanel) -> pd.DataFrame:
+        """
+        Record every bar's picks with their forward returns
+
+        Returns:
+            DataFrame with one row per (date, rank) pick
+        """
+        picks, scores = self.select(panel)
+        returns = {h: panel.forward_returns(h) for h in self.horizons}
+
+        rows, ranks = np.nonzero(picks >= 0)
+        tickers = picks[rows, ranks]
+
+        result = pd.DataFrame({
+            'date': panel.index[rows],
+            'rank': ranks + 1,
+            'ticker': np.asarray(panel.tickers, dtype=object)[tickers],
+            'score': scores[rows, ranks],
+        })
+
+        for h, fwd in returns.items():
+            result[f'fwd_{h}'] = fwd[rows, tickers]
+
+        return result
+
+    def summarize(self, panel: HistoryPanel, result: pd.DataFrame) -> pd.DataFrame:
+        """
+        Forward-return statistics of the picks versus the whole universe
+
+        Returns:
+            DataFrame indexed by horizon
+        """
+        summary = []
+
+        for h in self.horizons:
+            picked = result[f'fwd_{h}'].dropna()
+            universe = panel.forward_returns(h)[panel.valid]
+            universe = universe[~np.isnan(universe)]
+
+            summary.append({
+                'horizon': h,
+                'picks': len(picked),
+                'mean_return': picked.mean(),
+                'hit_rate': (picked > 0).mean(),
+                'universe_mean': universe.mean() if len(universe) else math.nan,
+                'excess_return': picked.mean() - (universe.mean() if len(universe) else math.nan),
+            })
+
+        return pd.DataFrame(summary).set_index('horizon')
+
+
+def panel_is_fresh(path: str, interval: str) -> bool:
+    """
+    Whether a saved panel exists and is younger than one bar of its interval
+
+    Older panels are missing at least one bar the upstream API now has.
+    """
+    from src.data_cache import interval_to_timedelta
+
+    if not os.path.exists(path):
+        return False
+
+    age = time.time() - os.path.getmtime(path)
+    return age < interval_to_timedelta(interval).total_seconds()
+
+
+def load_history_panel(
+    universe: str,
+    period: str,
+    interval: str,
+    refresh: bool = False,
+    workers: Optional[int] = None,
+    from_archive: bool = False
+) -> HistoryPanel:
+    """
+    Cached HistoryPanel for a universe, building (and saving) it if needed
+
+    Args:
+        universe: Universe name or file (see config.universes)
+        period: History to fetch
+        interval: Bar interval
+        refresh: Ignore any saved panel and rebuild it (a panel older than
+                 one bar is always rebuilt)
+        workers: Process pool size for indicator calculation
+        from_archive: Read bars from the bar archive instead of fetching them
+
+    Returns:
+        HistoryPanel
+    """
+    from config.universes import load_universe
+    from src.data_fetcher import DataFetcher
+
+    name = os.path.splitext(os.path.basename(universe))[0]
+    path = os.path.join(settings.CACHE_DIR, "panels", f"{name}_{period}_{interval}.npz")
+
+    if not refresh and panel_is_fresh(path, interval):
+        Logger.info(f"Using cached indicator panel: {path}")
+        return HistoryPanel.load(path)
+
+    if from_archive:
+        from src.bar_archive import BarArchive
+        from src.data_cache import period_to_timedelta
+
+        window = period_to_timedelta(period)
+        start = pd.Timestamp.now() - window if window is not None else None
+        frames = BarArchive().read_many(load_universe(universe), interval, start=start)
+        Logger.info(f"Read {len(frames)} stocks from the bar archive ({settings.ARCHIVE_DIR})")
+    else:
+        fetcher = DataFetcher()
+        try:
+            frames = fetcher.fetch_multiple_stocks(load_universe(universe), period=period, interval=interval)
+        finally:
+            fetcher.close()
+    panel = HistoryPanel.from_frames(frames, workers=workers)
+    panel.save(path)
+
+    return panel
+
+
+def main():
+    """Command-line entry point: python -m src.backtest"""
+    parser = argparse.ArgumentParser(description="Backtest the scanners over historical bars")
+    parser.add_argument("--scanner", choices=sorted(SCANNERS), default="swing")
+    parser.add_argument("--period", default="5y", help="History to fetch (e.g. 2y, 5y, max)")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--horizons", type=int, nargs="+", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--universe", default=settings.UNIVERSE)
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the cached indicator panel")
+    parser.add_argument("--from-archive", action="store_true", help="Read bars from the bar archive instead of fetching")
+    args = parser.parse_args()
+
+    logger = Logger()
+    logger.header(f"🧪 BACKTEST - {args.scanner} on {args.period} of {args.interval} bars")
+
+    panel = load_history_panel(args.universe, args.period, args.interval, args.refresh, args.workers, args.from_archive)
+    logger.info(f"Indicator history: {len(panel.index)} bars x {len(panel.tickers)} stocks")
+
+    backtester = Backtester(SCANNERS[args.scanner](), horizons=args.horizons)
+    result = backtester.run(panel)
+    print(backtester.summarize(panel, result).to_string(float_format=lambda x: f"{x:.4f}"))
+
+    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    filename = f"{settings.OUTPUT_DIR}/backtest_{args.scanner}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    result.to_csv(filename, index=False)
+    logger.success(f"Picks saved: {filename}")
+
+
+if __name__ == "__main__":
+    main()
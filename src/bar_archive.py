@@ -0,0 +1,487 @@
+"""Memory-mapped multi-year bar archive: fixed-width field files plus a per-ticker offset index"""
+
+import argparse
+import json
+import os
+import re
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import config.settings as settings
+from src.frames import OHLCV_COLUMNS
+from src.utils.logger import Logger
+from src.utils.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:     # Windows: writers are not serialized
+    fcntl = None
+
+# Field -> (file stem, record dtype); one file per field and interval
+FIELDS = {
+    'Timestamp': ('timestamp', np.dtype('<i8')),     # ns since epoch (UTC when the interval has a timezone)
+    'Open': ('open', np.dtype('<f8')),
+    'High': ('high', np.dtype('<f8')),
+    'Low': ('low', np.dtype('<f8')),
+    'Close': ('close', np.dtype('<f8')),
+    'Volume': ('volume', np.dtype('<f8')),
+}
+
+RECORD_BYTES = sum(dtype.itemsize for _, dtype in FIELDS.values())
+
+INDEX_FILE = "index.json"
+LOCK_FILE = ".lock"
+BLOCK_SLACK = 0.125     # Spare capacity per ticker block, as a fraction of its bars...
+MIN_BLOCK_SLACK = 32    # ...and at least this many bars, so updates can be written in place
+COMPACT_RATIO = 2.0     # write() compacts once records on disk exceed this multiple of allocated ones
+
+
+def block_capacity(length: int) -> int:
+    """Records allocated to a ticker block holding `length` bars"""
+    return length + max(int(length * BLOCK_SLACK), MIN_BLOCK_SLACK)
+
+
+class _Segment:
+    """One interval's index and memory maps, as of one index version"""
+
+    def __init__(self, directory: str, index: Dict, version: Tuple[int, int]):
+        self.index = index
+        self.version = version
+        self.tz = index['tz'] or None
+        # ticker -> (offset, bars, capacity)
+        self.tickers: Dict[str, Tuple[int, int, int]] = {t: tuple(entry) for t, entry in index['tickers'].items()}
+
+        count = index['records']
+        self.maps: Dict[str, np.ndarray] = {}
+        for field, (stem, dtype) in FIELDS.items():
+            path = os.path.join(directory, f"{stem}.{index['generation']}.bin")
+            # A zero-length file cannot be mapped
+            self.maps[field] = np.memmap(path, dtype=dtype, mode='r', shape=(count,)) if count else np.zeros(0, dtype)
+
+
+class BarArchive:
+    """
+    Whole-universe OHLCV history as memory-mapped fixed-width records
+
+    Each interval has a directory holding one flat binary file per field
+    (timestamp, open, high, low, close, volume; 8 bytes per bar) and a small
+    JSON index mapping every ticker to the (offset, length, capacity) of
+    its block, whose bars are contiguous and sorted by time. Readers map the files with
+    numpy.memmap, so a ticker's bars - or any date range of them, found by
+    binary search on the timestamps - are zero-copy slices, and only the
+    pages touched are ever read from disk.
+
+    New bars fill a block's spare capacity in place; a ticker that outgrows
+    its block (or whose history changed) moves to a new block at the end of
+    the files. The index is swapped atomically after the data is written.
+    Space left behind by moved tickers is reclaimed by compact(), which
+    writes a new file generation. Writers (write and compact, in any
+    process) take an exclusive lock on the interval; readers never lock.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Args:
+            root: Archive directory (defaults to settings.ARCHIVE_DIR)
+        """
+        self.root = root or settings.ARCHIVE_DIR
+        self.logger = Logger()
+        self._segments: Dict[str, _Segment] = {}
+
+    def _directory(self, interval: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_-]", "_", interval))
+
+    @contextmanager
+    def _locked(self, interval: str):
+        """Exclusive writer lock on an interval's directory (held across processes)"""
+        directory = self._directory(interval)
+        os.makedirs(directory, exist_ok=True)
+
+        with open(os.path.join(directory, LOCK_FILE), 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _segment(self, interval: str) -> Optional[_Segment]:
+        """Current index and maps for an interval (re-read when the index changed)"""
+        path = os.path.join(self._directory(interval), INDEX_FILE)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        # The index is replaced, never edited, so a new inode means a new version
+        version = (stat.st_ino, stat.st_mtime_ns)
+        segment = self._segments.get(interval)
+        if segment is None or segment.version != version:
+            with open(path, encoding='utf-8') as f:
+                segment = _Segment(self._directory(interval), json.load(f), version)
+            self._segments[interval] = segment
+
+        return segment
+
+    def tickers(self, interval: str) -> List[str]:
+        """Tickers with archived bars for an interval"""
+        segment = self._segment(interval)
+        return list(segment.tickers) if segment else []
+
+    def columns(
+        self,
+        ticker: str,
+        interval: str,
+        start=None,
+        end=None,
+        warmup: int = 0
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Zero-copy views of one ticker's bars
+
+        Args:
+            ticker: Stock symbol
+            interval: Data interval
+            start: First timestamp to include (anything pd.Timestamp accepts; None = from the first bar)
+            end: Last timestamp to include (None = up to the last bar)
+            warmup: Extra bars to include before start
+
+        Returns:
+            Dictionary {field: read-only array} with 'Timestamp' (int64 ns)
+            and the OHLCV fields, or None if the ticker is not archived
+        """
+        segment = self._segment(interval)
+        if segment is None or ticker not in segment.tickers:
+            return None
+
+        offset, length, _ = segment.tickers[ticker]
+        stamps = segment.maps['Timestamp'][offset:offset + length]
+
+        lo = 0 if start is None else int(np.searchsorted(stamps, self._to_ns(start, segment.tz), side='left'))
+        hi = length if end is None else int(np.searchsorted(stamps, self._to_ns(end, segment.tz), side='right'))
+        lo = max(min(lo, hi) - warmup, 0)
+
+        return {field: values[offset + lo:offset + hi] for field, values in segment.maps.items()}
+
+    def read(self, ticker: str, interval: str, start=None, end=None, warmup: int = 0) -> Optional[pd.DataFrame]:
+        """
+        One ticker's bars as an OHLCV dataframe backed by the memory maps
+
+        Args:
+            ticker: Stock symbol
+            interval: Data interval
+            start: First timestamp to include (None = from the first bar)
+            end: Last timestamp to include (None = up to the last bar)
+            warmup: Extra bars to include before start
+
+        Returns:
+            Read-only DataFrame in the DataFetcher layout, or None if the
+            ticker is not archived
+        """
+        columns = self.columns(ticker, interval, start, end, warmup)
+        if columns is None:
+            return None
+
+        tz = self._segment(interval).tz
+        index = pd.DatetimeIndex(columns['Timestamp'].astype('datetime64[ns]'))
+        if tz:
+            index = index.tz_localize('UTC').tz_convert(tz)
+
+        return pd.DataFrame({col: columns[col] for col in OHLCV_COLUMNS}, index=index, copy=False)
+
+    def read_many(
+        self,
+        tickers: Iterable[str],
+        interval: str,
+        start=None,
+        end=None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        read() for many tickers (tickers without archived bars in range are left out)
+
+        Returns:
+            Dictionary {ticker: dataframe}
+        """
+        frames = {}
+        with metrics.span("archive.read", interval=interval):
+            for ticker in tickers:
+                df = self.read(ticker, interval, start, end)
+                if df is not None and len(df):
+                    frames[ticker] = df
+        return frames
+
+    def write(self, frames: Dict[str, pd.DataFrame], interval: str) -> int:
+        """
+        Merge bars into the archive
+
+        Each ticker's new bars are merged with its archived ones (a new bar
+        replaces an archived bar with the same timestamp). Every ticker owns
+        a block with some spare capacity after its bars: when the merge only
+        rewrites the last archived bar (a candle that was still forming) and
+        appends, and the block has room, the bars are written in place.
+        Otherwise the merged run moves to a new block at the end of the
+        files. Tickers whose bars did not change are not touched. The index
+        is replaced last; readers of the previous index see their bars
+        unchanged, apart from an in-place rewrite of a last bar. Once dead
+        blocks outweigh live ones by COMPACT_RATIO the interval is compacted.
+
+        Args:
+            frames: Dictionary {ticker: OHLCV dataframe}
+            interval: Data interval
+
+        Returns:
+            Number of bars the archive gained (bars that replaced archived
+            ones are not counted)
+        """
+        frames = {ticker: df for ticker, df in frames.items() if df is not None and len(df)}
+        if not frames:
+            return 0
+
+        with self._locked(interval):
+            return self._write(frames, interval)
+
+    def _write(self, frames: Dict[str, pd.DataFrame], interval: str) -> int:
+        """write() with the interval locked: merges against the latest index"""
+        directory = self._directory(interval)
+        segment = self._segment(interval)
+        tz = segment.tz if segment else self._frame_tz(next(iter(frames.values())))
+        index = dict(segment.index) if segment else {'tz': tz or "", 'generation': 0, 'records': 0, 'tickers': {}}
+        index['tickers'] = dict(index['tickers'])
+
+        with metrics.span("archive.write", interval=interval):
+            blocks = {field: [] for field in FIELDS}
+            in_place = []
+            offset = index['records']
+            gained = 0
+
+            for ticker, df in frames.items():
+                entry = segment.tickers.get(ticker) if segment else None
+                merged, changed_from = self._merge(segment, ticker, df, tz)
+                if merged is None:
+                    continue
+
+                length = len(merged['Timestamp'])
+                gained += length - (entry[1] if entry else 0)
+
+                if entry is not None and changed_from >= entry[1] - 1 and length <= entry[2]:
+                    in_place.append((entry[0] + changed_from, {field: merged[field][changed_from:] for field in FIELDS}))
+                    index['tickers'][ticker] = [entry[0], length, entry[2]]
+                    continue
+
+                capacity = block_capacity(length)
+                for field, (_, dtype) in FIELDS.items():
+                    blocks[field].append(merged[field])
+                    blocks[field].append(np.zeros(capacity - length, dtype))
+                index['tickers'][ticker] = [offset, length, capacity]
+                offset += capacity
+
+            if not in_place and offset == index['records']:
+                return 0
+
+            for field, (stem, dtype) in FIELDS.items():
+                path = os.path.join(directory, f"{stem}.{index['generation']}.bin")
+                if in_place:
+                    values = np.memmap(path, dtype=dtype, mode='r+', shape=(index['records'],))
+                    for position, tail in in_place:
+                        values[position:position + len(tail[field])] = tail[field]
+                    values.flush()
+                    del values
+                if offset > index['records']:
+                    # New blocks go right after the indexed records; anything past
+                    # them (left by a write that died before its index) is dropped
+                    with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                        f.seek(index['records'] * dtype.itemsize)
+                        f.truncate()
+                        np.concatenate(blocks[field]).astype(dtype, copy=False).tofile(f)
+
+            metrics.count("archive.records_written", offset - index['records'], interval=interval)
+            metrics.count("archive.in_place_updates", len(in_place), interval=interval)
+
+            index['records'] = offset
+            self._write_index(directory, index)
+
+        allocated = sum(capacity for _, _, capacity in index['tickers'].values())
+        if index['records'] > COMPACT_RATIO * allocated:
+            self._compact(interval)
+
+        return gained
+
+    def _merge(
+        self,
+        segment: Optional[_Segment],
+        ticker: str,
+        df: pd.DataFrame,
+        tz: Optional[str]
+    ) -> Tuple[Optional[Dict[str, np.ndarray]], int]:
+        """
+        Archived bars of a ticker overlaid with df's bars, sorted by time
+
+        Returns:
+            Tuple of (merged bars or None if nothing changed, position of
+            the first bar that differs from the archived ones)
+        """
+        stamps = df.index
+        if tz:
+            stamps = stamps.tz_convert('UTC') if stamps.tz is not None else stamps.tz_localize(tz).tz_convert('UTC')
+        elif stamps.tz is not None:
+            stamps = stamps.tz_localize(None)
+
+        fresh = {'Timestamp': stamps.as_unit('ns').asi8}
+        for col in OHLCV_COLUMNS:
+            fresh[col] = df[col].to_numpy(dtype=np.float64)
+
+        if segment is None or ticker not in segment.tickers:
+            archived = None
+        else:
+            offset, length, _ = segment.tickers[ticker]
+            archived = {field: values[offset:offset + length] for field, values in segment.maps.items()}
+
+        merged = fresh if archived is None else {
+            field: np.concatenate([archived[field], fresh[field]]) for field in FIELDS
+        }
+
+        # Latest write wins per timestamp (stable sort keeps fresh bars after archived ones)
+        order = np.argsort(merged['Timestamp'], kind='stable')
+        sorted_stamps = merged['Timestamp'][order]
+        keep = np.concatenate([sorted_stamps[1:] != sorted_stamps[:-1], [True]])
+        order = order[keep]
+        merged = {field: values[order] for field, values in merged.items()}
+
+        if archived is None:
+            return merged, 0
+
+        # First position where the merged bars stop matching the archived ones
+        common = min(len(order), len(archived['Timestamp']))
+        differs = np.zeros(common, dtype=bool)
+        for field in FIELDS:
+            old, new = archived[field][:common], merged[field][:common]
+            same = old == new
+            if old.dtype.kind == 'f':
+                same |= np.isnan(old) & np.isnan(new)
+            differs |= ~same
+        changed_from = int(np.argmax(differs)) if differs.any() else common
+
+        if changed_from == len(order) == len(archived['Timestamp']):
+            return None, changed_from
+
+        return merged, changed_from
+
+    def compact(self, interval: str) -> int:
+        """
+        Rewrite an interval's files without the blocks left by moved tickers
+
+        The compacted files are a new generation (every block resized to
+        block_capacity of its bars); the index switches to them atomically
+        and the old generation is removed (readers still mapping it keep
+        their pages until they re-read the index).
+
+        Returns:
+            Bytes reclaimed
+        """
+        if not os.path.exists(os.path.join(self._directory(interval), INDEX_FILE)):
+            return 0
+
+        with self._locked(interval):
+            return self._compact(interval)
+
+    def _compact(self, interval: str) -> int:
+        """compact() with the interval locked"""
+        segment = self._segment(interval)
+        if segment is None:
+            return 0
+
+        directory = self._directory(interval)
+        generation = segment.index['generation'] + 1
+        tickers, offset = {}, 0
+
+        for ticker, (_, length, _) in segment.tickers.items():
+            tickers[ticker] = [offset, length, block_capacity(length)]
+            offset += block_capacity(length)
+
+        with metrics.span("archive.compact", interval=interval):
+            for field, (stem, dtype) in FIELDS.items():
+                with open(os.path.join(directory, f"{stem}.{generation}.bin"), 'wb') as f:
+                    for start, length, _ in segment.tickers.values():
+                        segment.maps[field][start:start + length].tofile(f)
+                        np.zeros(block_capacity(length) - length, dtype).tofile(f)
+
+            index = dict(segment.index, generation=generation, records=offset, tickers=tickers)
+            self._write_index(directory, index)
+
+        for stem, _ in FIELDS.values():
+            os.remove(os.path.join(directory, f"{stem}.{generation - 1}.bin"))
+
+        return (segment.index['records'] - offset) * RECORD_BYTES
+
+    def stats(self, interval: str) -> Dict:
+        """Tickers, bars, allocated and total records and bytes on disk for an interval"""
+        segment = self._segment(interval)
+        if segment is None:
+            return {'tickers': 0, 'bars': 0, 'allocated': 0, 'records': 0, 'bytes': 0}
+
+        return {
+            'tickers': len(segment.tickers),
+            'bars': sum(length for _, length, _ in segment.tickers.values()),
+            'allocated': sum(capacity for _, _, capacity in segment.tickers.values()),
+            'records': segment.index['records'],
+            'bytes': segment.index['records'] * RECORD_BYTES,
+        }
+
+    def intervals(self) -> List[str]:
+        """Intervals with an archive directory"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.exists(os.path.join(self.root, name, INDEX_FILE)))
+
+    @staticmethod
+    def _write_index(directory: str, index: Dict):
+        # Field files are already on disk; replacing the index publishes them
+        path = os.path.join(directory, INDEX_FILE)
+        # Per-writer name, so an unlocked writer (no fcntl) cannot replace another's file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _frame_tz(df: pd.DataFrame) -> Optional[str]:
+        return str(df.index.tz) if df.index.tz is not None else None
+
+    @staticmethod
+    def _to_ns(timestamp, tz: Optional[str]) -> int:
+        """Archive timestamp (ns) for a bound given in any pd.Timestamp form"""
+        timestamp = pd.Timestamp(timestamp)
+        if tz:
+            timestamp = timestamp.tz_localize(tz) if timestamp.tz is None else timestamp
+            return timestamp.tz_convert('UTC').as_unit('ns').value
+        return (timestamp.tz_localize(None) if timestamp.tz is not None else timestamp).as_unit('ns').value
+
+
+def main():
+    """Command-line entry point: python -m src.bar_archive"""
+    parser = argparse.ArgumentParser(description="Inspect or compact the bar archive")
+    parser.add_argument("--root", default=None, help="Archive directory (defaults to settings.ARCHIVE_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("info", help="Tickers, bars and size per interval")
+    compact = commands.add_parser("compact", help="Reclaim space left by rewritten tickers")
+    compact.add_argument("--interval", nargs="+", default=None)
+    args = parser.parse_args()
+
+    archive = BarArchive(args.root)
+
+    if args.command == "info":
+        for interval in archive.intervals():
+            stats = archive.stats(interval)
+            print(f"{interval:<6} {stats['tickers']:>6} tickers  {stats['bars']:>12,} bars  "
+                  f"{stats['allocated'] - stats['bars']:>10,} spare  {stats['records'] - stats['allocated']:>10,} dead  "
+                  f"{stats['bytes'] / 2**20:10.1f} MB")
+    else:
+        for interval in args.interval or archive.intervals():
+            Logger.success(f"{interval}: reclaimed {archive.compact(interval) / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
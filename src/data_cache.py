@@ -0,0 +1,220 @@
+"""On-disk OHLCV cache for incremental data fetching"""
+
+import os
+import re
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+import config.settings as settings
+from src.utils.logger import Logger
+
+
+def period_to_timedelta(period: str) -> Optional[timedelta]:
+    """
+    Convert a yahooquery period string to a timedelta
+
+    Args:
+        period: Data period (e.g., '5d', '60d', '1mo', '1y', 'ytd', 'max')
+
+    Returns:
+        Equivalent timedelta, or None for open-ended periods ('max')
+    """
+    if period == "max":
+        return None
+
+    if period == "ytd":
+        now = pd.Timestamp.now()
+        return now - now.normalize().replace(month=1, day=1)
+
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    days_per_unit = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}
+
+    return timedelta(days=count * days_per_unit[unit])
+
+
+def interval_to_timedelta(interval: str) -> timedelta:
+    """
+    Convert a yahooquery interval string to the length of one bar
+
+    Args:
+        interval: Data interval (e.g., '5m', '15m', '1h', '1d', '1wk')
+
+    Returns:
+        Bar length as a timedelta
+    """
+    match = re.fullmatch(r"(\d+)(m|h|d|wk)", interval)
+    if not match:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    minutes_per_unit = {'m': 1, 'h': 60, 'd': 24 * 60, 'wk': 7 * 24 * 60}
+
+    return timedelta(minutes=count * minutes_per_unit[unit])
+
+
+def session_dates(index: pd.DatetimeIndex) -> np.ndarray:
+    """Trading session (exchange-local date, as datetime64[D]) of every bar"""
+    if index.tz is not None:
+        index = index.tz_convert(settings.MARKET_TIMEZONE).tz_localize(None)
+    return index.as_unit('ns').asi8.astype('datetime64[ns]').astype('datetime64[D]')
+
+
+def count_sessions(index: pd.DatetimeIndex) -> int:
+    """Number of distinct trading sessions the bars span"""
+    return len(np.unique(session_dates(index)))
+
+
+def last_sessions(data: pd.DataFrame, sessions: int) -> pd.DataFrame:
+    """
+    Bars of the last `sessions` trading sessions
+
+    Whole sessions are kept, the way upstream lays out a period, so an
+    intraday window never starts in the middle of a day.
+    """
+    dates = session_dates(data.index)
+    kept = np.unique(dates)[-sessions:] if sessions > 0 else dates[:0]
+    if len(kept) == 0:
+        return data.iloc[:0]
+    return data[dates >= kept[0]]
+
+
+class OHLCVCache:
+    """
+    Columnar OHLCV cache stored as one NPZ file per ticker and interval
+
+    Each file holds the bar timestamps (int64 ns), the timezone, one float
+    array per price/volume column and, for every period fetched in full,
+    the number of trading sessions upstream returned for it. A later
+    request for a known period only needs a delta fetch and is cut to that
+    many sessions, so cached and fresh windows hold the same bars. Files
+    keep only the sessions of their longest known period.
+    """
+
+    def __init__(self, cache_dir: str = "cache"):
+        self.cache_dir = cache_dir
+        self.logger = Logger()
+
+    def _path(self, ticker: str, interval: str) -> str:
+        """Build the cache file path for a ticker/interval pair"""
+        safe_ticker = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.cache_dir, interval, f"{safe_ticker}.npz")
+
+    def load(self, ticker: str, interval: str) -> Tuple[Optional[pd.DataFrame], Dict[str, int]]:
+        """
+        Load cached bars for a ticker
+
+        Args:
+            ticker: Stock symbol (e.g., 'RELIANCE.NS')
+            interval: Data interval (e.g., '1d', '15m')
+
+        Returns:
+            Tuple of (DataFrame or None, {period: sessions upstream returned for it})
+        """
+        path = self._path(ticker, interval)
+
+        if not os.path.exists(path):
+            return None, {}
+
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                tz = str(archive['tz'])
+                index = pd.to_datetime(archive['index'], unit='ns', utc=bool(tz))
+                if tz:
+                    index = index.tz_convert(tz)
+
+                columns = [str(col) for col in archive['columns']]
+                data = pd.DataFrame(
+                    {col: archive[f"col_{i}"] for i, col in enumerate(columns)},
+                    index=index
+                )
+
+                # Files written before session windows were kept know no period
+                windows = {}
+                if 'periods' in archive.files:
+                    windows = {str(p): int(n) for p, n in zip(archive['periods'], archive['sessions'])}
+
+            return data, windows
+
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cache for {ticker}: {str(e)}")
+            return None, {}
+
+    def load_window(self, tickers: List[str], interval: str, period: str) -> Dict[str, pd.DataFrame]:
+        """
+        Cached bars for many tickers, without touching the network
+
+        The window is the period's sessions as upstream returned them (or,
+        for a period never fetched in full, the period measured back from
+        the last cached bar), so results are as of the last fetch.
+
+        Args:
+            tickers: Stock symbols
+            interval: Data interval
+            period: Data period (e.g., '5d', '60d')
+
+        Returns:
+            Dictionary {ticker: dataframe} for tickers with cached bars
+        """
+        window = period_to_timedelta(period)
+        frames = {}
+
+        for ticker in tickers:
+            data, windows = self.load(ticker, interval)
+            if data is None or data.empty:
+                continue
+            if period in windows:
+                data = last_sessions(data, windows[period])
+            elif window is not None:
+                data = data[data.index >= data.index[-1] - window]
+            frames[ticker] = data
+
+        return frames
+
+    def save(self, ticker: str, interval: str, data: pd.DataFrame, windows: Dict[str, int]):
+        """
+        Write bars for a ticker, replacing any previous cache file
+
+        Only the sessions of the longest window are written, so the file
+        stops growing once it holds that window.
+
+        Args:
+            ticker: Stock symbol
+            interval: Data interval
+            data: DataFrame with a DatetimeIndex and numeric OHLCV columns
+            windows: {period: sessions upstream returned for it}
+        """
+        path = self._path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if windows:
+            data = last_sessions(data, max(windows.values()))
+
+        numeric = data.select_dtypes(include='number')
+        tz = str(data.index.tz) if data.index.tz is not None else ""
+
+        arrays = {f"col_{i}": numeric[col].to_numpy() for i, col in enumerate(numeric.columns)}
+
+        # Write to a temp file first so a crash never leaves a torn cache entry
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                index=data.index.as_unit('ns').asi8,
+                tz=np.array(tz),
+                columns=np.array(list(numeric.columns)),
+                periods=np.array(list(windows), dtype=str),
+                sessions=np.array(list(windows.values()), dtype=np.int64),
+                **arrays
+            )
+        os.replace(tmp_path, path)
+
+    def clear(self, ticker: str, interval: str):
+        """Remove the cache entry for a ticker/interval pair"""
+        path = self._path(ticker, interval)
+        if os.path.exists(path):
+            os.remove(path)
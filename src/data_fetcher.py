@@ -1,111 +1,701 @@
 """Module for fetching stock market data using yahooquery"""
 
 from yahooquery import Ticker
+import threading
+import time
 import pandas as pd
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, as_completed, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import config.settings as settings
+from src.bar_archive import BarArchive
+from src.data_cache import OHLCVCache, count_sessions, last_sessions, period_to_timedelta
+from src.frames import compact_ohlcv
 from src.utils.logger import Logger
-import time
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import TokenBucket
+from src.utils.resilience import CircuitOpenError, LatencyTracker, backoff_delays, circuit_breaker
+
+
+class _FetchPlan(NamedTuple):
+    """What to request for one ticker, given its cache state"""
+    cached: Optional[pd.DataFrame]
+    windows: Dict[str, int]         # {period: sessions upstream returned for it}
+    period: str
+    start: Optional[str]            # None = full period fetch, else delta start date
+
+
+class UpstreamError(RuntimeError):
+    """The upstream answered a whole request with an error message instead of bars"""
+
+
+class FetchDeadlineError(TimeoutError):
+    """The fetch stage's deadline passed before a request could go out"""
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a time.monotonic() deadline (None = no deadline)"""
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
 
 class DataFetcher:
     """Handles all data fetching operations using yahooquery"""
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        cache: Optional[OHLCVCache] = None,
+        use_cache: bool = settings.CACHE_ENABLED,
+        rate_limiter: Optional[TokenBucket] = None,
+        ticker_factory: Callable = Ticker,
+        archive: Optional[BarArchive] = None,
+        use_archive: bool = settings.ARCHIVE_ENABLED
+    ):
+        """
+        Args:
+            cache: OHLCV cache (defaults to settings.CACHE_DIR when use_cache)
+            use_cache: Whether to read/write the on-disk cache
+            rate_limiter: Limiter shared by all upstream requests
+            ticker_factory: yahooquery.Ticker or a stand-in with the same API
+            archive: Bar archive fetched bars are merged into (defaults to
+                     settings.ARCHIVE_DIR when use_archive)
+            use_archive: Whether to write fetched bars to the archive
+        """
         self.logger = Logger()
-    
+
+        if cache is None and use_cache:
+            cache = OHLCVCache(settings.CACHE_DIR)
+        self.cache = cache
+
+        if archive is None and use_archive:
+            archive = BarArchive(settings.ARCHIVE_DIR)
+        self.archive = archive
+
+        if rate_limiter is None:
+            rate_limiter = TokenBucket(settings.FETCH_RATE_LIMIT, settings.FETCH_RATE_BURST)
+        self.rate_limiter = rate_limiter
+        self.ticker_factory = ticker_factory
+
+        # Every fallback used: (ticker, fallback symbol, reason)
+        self.fallbacks: List[Tuple[str, str, str]] = []
+        self.latency = LatencyTracker(
+            settings.FETCH_HEDGE_PERCENTILE,
+            settings.FETCH_HEDGE_MIN_SAMPLES,
+            settings.FETCH_HEDGE_DELAY
+        )
+        # Runs the primary and hedged requests of each batch
+        self._request_pool = ThreadPoolExecutor(
+            max_workers=2 * settings.FETCH_MAX_WORKERS,
+            thread_name_prefix="fetch-request"
+        )
+
+    def close(self):
+        """Stop the request threads: queued requests are cancelled, running ones end at FETCH_TIMEOUT"""
+        self._request_pool.shutdown(wait=False, cancel_futures=True)
+
     def fetch_stock_data(
-        self, 
-        ticker: str, 
-        period: str = "60d", 
+        self,
+        ticker: str,
+        period: str = "60d",
         interval: str = "1d"
     ) -> Optional[pd.DataFrame]:
         """
         Fetch historical stock data using yahooquery
-        
+
         Args:
             ticker: Stock symbol (e.g., 'RELIANCE.NS')
             period: Data period (e.g., '5d', '1mo', '3mo', '1y', '2y')
             interval: Data interval (e.g., '1d', '1h', '15m', '5m')
-        
+
         Returns:
             DataFrame with OHLCV data or None if failed
         """
         try:
-            # Create ticker object
-            stock = Ticker(ticker)
-            
-            # Fetch data
-            data = stock.history(period=period, interval=interval)
-            
-            # Check if data is valid
-            if isinstance(data, str):
-                # Error message returned
-                self.logger.warning(f"Error for {ticker}: {data}")
-                return None
-            
-            if not isinstance(data, pd.DataFrame) or data.empty:
-                self.logger.warning(f"No data for {ticker}")
-                return None
-            
-            # Handle multi-index (symbol, date)
-            if isinstance(data.index, pd.MultiIndex):
-                # Remove the symbol level, keep only date
-                data = data.reset_index(level=0, drop=True)
-            
-            # Standardize column names (yahooquery uses lowercase)
-            data.columns = [col.capitalize() for col in data.columns]
-            
-            # Rename 'Adjclose' to match our indicators
-            if 'Adjclose' in data.columns:
-                data = data.rename(columns={'Adjclose': 'Adj Close'})
-            
+            plan = self._plan(ticker, period, interval)
+            fresh, sources = self._fetch_batch([ticker], period, interval, plan.start)
+            data = self._resolve(ticker, interval, plan, fresh, sources)
+            if data is not None and ticker not in sources:
+                self._archive({ticker: data}, interval)
             return data
-        
+
         except Exception as e:
             self.logger.error(f"Error fetching {ticker}: {str(e)}")
+            metrics.count("fetch.failures", interval=interval)
             return None
-    
+
     def fetch_multiple_stocks(
-        self, 
-        tickers: list, 
+        self,
+        tickers: list,
         period: str = "60d",
-        interval: str = "1d"
+        interval: str = "1d",
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None
     ) -> dict:
         """
         Fetch data for multiple stocks
-        
+
+        Symbols are requested in batches through a single yahooquery Ticker
+        per batch, and batches run concurrently. Request pacing comes from the
+        shared token bucket, so wall-clock time follows the rate limit rather
+        than the number of tickers. Failed requests are retried, slow or
+        failed symbols fall back to settings.FETCH_FALLBACK, and stocks
+        still pending after settings.FETCH_DEADLINE are dropped.
+
         Args:
             tickers: List of stock symbols
             period: Data period
             interval: Data interval
-        
+            batch_size: Symbols per request (defaults to settings.FETCH_BATCH_SIZE)
+            max_workers: Concurrent requests (defaults to settings.FETCH_MAX_WORKERS)
+
         Returns:
             Dictionary {ticker: dataframe}
         """
+        batch_size = batch_size or settings.FETCH_BATCH_SIZE
+        max_workers = max_workers or settings.FETCH_MAX_WORKERS
+
         results = {}
         total = len(tickers)
-        
+
         self.logger.info(f"Fetching data for {total} stocks...")
-        
-        # Process in batches to avoid overwhelming the API
-        batch_size = 10
-        
-        for i in range(0, len(tickers), batch_size):
-            batch = tickers[i:i+batch_size]
-            
+
+        plans = {}
+        for ticker in tickers:
+            try:
+                plans[ticker] = self._plan(ticker, period, interval)
+            except Exception as e:
+                self.logger.error(f"Error fetching {ticker}: {str(e)}")
+
+        # Tickers sharing a delta start date (or needing a full fetch) can share a request
+        groups = {}
+        for ticker, plan in plans.items():
+            groups.setdefault(plan.start, []).append(ticker)
+
+        batches = [
+            (start, symbols[i:i+batch_size])
+            for start, symbols in groups.items()
+            for i in range(0, len(symbols), batch_size)
+        ]
+
+        done = 0
+        archived = set()
+        for batch, fresh, sources in self._download_batches(batches, period, interval, max_workers):
             for ticker in batch:
-                idx = tickers.index(ticker) + 1
-                
-                if idx % 10 == 0 or idx == 1:
-                    self.logger.info(f"Progress: {idx}/{total} stocks...")
-                
-                data = self.fetch_stock_data(ticker, period, interval)
-                
+                try:
+                    data = self._resolve(ticker, interval, plans[ticker], fresh, sources)
+                except Exception as e:
+                    self.logger.error(f"Error fetching {ticker}: {str(e)}")
+                    continue
+
                 if data is not None and not data.empty:
                     results[ticker] = data
-            
-            # Small delay between batches
-            if i + batch_size < len(tickers):
-                time.sleep(1)
-        
+                    # Fallback-exchange bars stay out of the archive, as they do the cache
+                    if ticker not in sources:
+                        archived.add(ticker)
+
+            done += len(batch)
+            self.logger.info(f"Progress: {done}/{total} stocks...")
+
+        # Keep the caller's ticker order
+        results = {ticker: results[ticker] for ticker in tickers if ticker in results}
+        self._archive({ticker: df for ticker, df in results.items() if ticker in archived}, interval)
+
         self.logger.success(f"Successfully fetched {len(results)}/{total} stocks")
-        return results
\ No newline at end of file
+        return results
+
+    def fetch_latest_bars(
+        self,
+        tickers: list,
+        interval: str = "15m",
+        period: str = "1d",
+        batch_size: Optional[int] = None,
+        max_workers: Optional[int] = None
+    ) -> dict:
+        """
+        Fetch only the most recent bars for each ticker, bypassing the cache
+
+        Used by rescans that already hold indicator state and just need the
+        candles that closed since the last pass.
+
+        Args:
+            tickers: List of stock symbols
+            interval: Data interval
+            period: How far back to look (the current session by default)
+            batch_size: Symbols per request (defaults to settings.FETCH_BATCH_SIZE)
+            max_workers: Concurrent requests (defaults to settings.FETCH_MAX_WORKERS)
+
+        Returns:
+            Dictionary {ticker: dataframe}
+        """
+        batch_size = batch_size or settings.FETCH_BATCH_SIZE
+        max_workers = max_workers or settings.FETCH_MAX_WORKERS
+
+        batches = [(None, tickers[i:i+batch_size]) for i in range(0, len(tickers), batch_size)]
+
+        results = {}
+        for _, fresh, _ in self._download_batches(batches, period, interval, max_workers):
+            results.update(fresh)
+
+        return {ticker: results[ticker] for ticker in tickers if ticker in results}
+
+    def _download_batches(self, batches: list, period: str, interval: str, max_workers: int):
+        """
+        Run (start, symbols) batch requests concurrently
+
+        Batches still running at settings.FETCH_DEADLINE are given up on, so
+        a few hanging symbols cannot hold back the whole stage. Their
+        requests see the same deadline: no request, retry or fallback goes
+        out after it.
+
+        Yields:
+            (symbols, {ticker: dataframe}, {ticker: fallback symbol}) as each batch completes
+        """
+        deadline = time.monotonic() + settings.FETCH_DEADLINE
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {
+            pool.submit(self._fetch_batch, batch, period, interval, start, deadline): batch
+            for start, batch in batches
+        }
+
+        try:
+            for future in as_completed(futures, timeout=settings.FETCH_DEADLINE):
+                batch = futures[future]
+
+                try:
+                    fresh, sources = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error fetching batch {batch[0]}..{batch[-1]}: {str(e)}")
+                    fresh, sources = {}, {}
+
+                if len(fresh) < len(batch):
+                    metrics.count("fetch.failures", len(batch) - len(fresh), interval=interval)
+
+                yield batch, fresh, sources
+
+        except TimeoutError:
+            pending = [ticker for future, batch in futures.items() if not future.done() for ticker in batch]
+            self.logger.error(f"Fetch deadline ({settings.FETCH_DEADLINE}s) passed - dropping {len(pending)} pending stocks")
+            metrics.count("fetch.deadline_dropped", len(pending), interval=interval)
+
+        finally:
+            # Don't wait for stragglers; their requests end at FETCH_TIMEOUT
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_batch(
+        self,
+        symbols: List[str],
+        period: str,
+        interval: str,
+        start: Optional[str],
+        deadline: Optional[float] = None
+    ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        One batch with hedging and exchange fallback
+
+        The primary request goes out first. If it is still running after the
+        hedge threshold (a latency percentile of recent primary requests), a
+        batch is split into one primary request per symbol, so one slow
+        symbol only holds back itself. Symbols still missing after another
+        threshold, or after twice as long as the split requests that did
+        answer took (a single symbol at once), are requested on the fallback
+        exchange in parallel and, per symbol, the first good answer wins.
+        Symbols the primary failed on or had no data for are then requested
+        on the fallback. Fallback requests always cover the full period,
+        since their bars never mix with the primary exchange's cache.
+
+        Args:
+            deadline: time.monotonic() value after which nothing more is
+                      requested; the batch returns what it has by then
+
+        Returns:
+            Tuple of ({ticker: dataframe}, {ticker: fallback symbol used})
+            keyed by the requested (primary) symbols
+        """
+        fallbacks = {symbol: self._fallback_symbol(symbol) for symbol in symbols}
+        fallbacks = {symbol: fallback for symbol, fallback in fallbacks.items() if fallback}
+
+        results, sources = {}, {}
+        primary_error = None
+        split = False
+        hedged = set()
+
+        sent = threading.Event()
+        primary = self._request_pool.submit(self._request, symbols, period, interval, start, sent, deadline)
+        # Request future -> (symbols it covers, whether it went to the fallback exchange)
+        requests = {primary: (symbols, False)}
+        pending = {primary}
+
+        threshold = self.latency.threshold() if fallbacks else None
+        if threshold is not None:
+            sent.wait(_remaining(deadline))
+        hedge_at = time.monotonic() + threshold if threshold is not None else None
+
+        while pending and len(results) < len(symbols):
+            timeout = _remaining(deadline)
+            if hedge_at is not None:
+                until_hedge = max(hedge_at - time.monotonic(), 0)
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                if _remaining(deadline) == 0:
+                    break
+
+                missing = [symbol for symbol in symbols if symbol not in results]
+                if len(missing) > 1 and not split:
+                    split = True
+                    split_at = time.monotonic()
+                    metrics.count("fetch.splits", interval=interval)
+                    for symbol in missing:
+                        future = self._request_pool.submit(self._request, [symbol], period, interval, start, None, deadline)
+                        requests[future] = ([symbol], False)
+                        pending.add(future)
+                    hedge_at = time.monotonic() + threshold
+                else:
+                    missing = [symbol for symbol in missing if symbol in fallbacks]
+                    if missing:
+                        metrics.count("fetch.hedges", interval=interval)
+                        hedged.update(missing)
+                        future = self._request_pool.submit(
+                            self._request, [fallbacks[symbol] for symbol in missing], period, interval, None, None, deadline
+                        )
+                        requests[future] = (missing, True)
+                        pending.add(future)
+                    hedge_at = None
+                continue
+
+            for future in done:
+                requested, on_fallback = requests[future]
+                try:
+                    fresh = future.result()
+                except Exception as e:
+                    if future is primary:
+                        primary_error = e
+                    self.logger.warning(f"Request for {requested[0]}..{requested[-1]} failed: {str(e)}")
+                    continue
+
+                # Split requests still running once the others took as long again are stragglers
+                if split and future is not primary and not on_fallback and hedge_at is not None:
+                    now = time.monotonic()
+                    hedge_at = min(hedge_at, 2 * now - split_at)
+
+                for symbol in requested:
+                    if symbol in results:
+                        continue
+                    if not on_fallback and symbol in fresh:
+                        results[symbol] = fresh[symbol]
+                    elif on_fallback and fallbacks[symbol] in fresh:
+                        results[symbol] = fresh[fallbacks[symbol]]
+                        sources[symbol] = fallbacks[symbol]
+                        self._record_fallback(symbol, fallbacks[symbol], "slow", interval)
+
+        # Requests still queued are no longer needed
+        for future in pending:
+            future.cancel()
+
+        if _remaining(deadline) == 0:
+            return results, sources
+
+        if primary_error is not None and not isinstance(primary_error, CircuitOpenError) and len(symbols) > 1 and not split:
+            # One bad symbol fails the whole request: isolate it rather than
+            # moving every stock in the batch to the fallback exchange
+            for symbol in [symbol for symbol in symbols if symbol not in results]:
+                try:
+                    fresh, fallback_sources = self._fetch_batch([symbol], period, interval, start, deadline)
+                except Exception:
+                    continue
+                results.update(fresh)
+                sources.update(fallback_sources)
+
+            return results, sources
+
+        # Remaining symbols: the primary failed or had no data for them
+        missing = [symbol for symbol in fallbacks if symbol not in results and symbol not in hedged]
+        if missing:
+            reason = "circuit open" if isinstance(primary_error, CircuitOpenError) else ("failed" if primary_error else "no data")
+            try:
+                fresh = self._request([fallbacks[symbol] for symbol in missing], period, interval, deadline=deadline)
+            except Exception as e:
+                self.logger.warning(f"Fallback request for {missing[0]}..{missing[-1]} failed: {str(e)}")
+                fresh = {}
+
+            for symbol in missing:
+                if fallbacks[symbol] in fresh:
+                    results[symbol] = fresh[fallbacks[symbol]]
+                    sources[symbol] = fallbacks[symbol]
+                    self._record_fallback(symbol, fallbacks[symbol], reason, interval)
+
+        if primary_error is not None and not results:
+            raise primary_error
+
+        return results, sources
+
+    def _request(
+        self,
+        symbols: List[str],
+        period: str,
+        interval: str,
+        start: Optional[str] = None,
+        sent: Optional[threading.Event] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        _download with retries (jittered exponential backoff) behind the host's circuit breaker
+
+        Args:
+            sent: Set once the first attempt has gone out (or the request
+                  ended without one); marks a primary request whose latency
+                  feeds the hedge threshold
+            deadline: time.monotonic() value after which no attempt or retry starts
+
+        Raises:
+            FetchDeadlineError: The deadline passed before an attempt could go out
+        """
+        host = self._host(symbols[0])
+        breaker = circuit_breaker(host, settings.FETCH_BREAKER_FAILURES, settings.FETCH_BREAKER_RESET)
+        delays = backoff_delays(settings.FETCH_RETRIES, settings.FETCH_BACKOFF_BASE, settings.FETCH_BACKOFF_MAX)
+
+        try:
+            while True:
+                if _remaining(deadline) == 0:
+                    raise FetchDeadlineError(f"Fetch deadline passed before {symbols[0]}..{symbols[-1]} went out")
+                if not breaker.allow():
+                    metrics.count("fetch.circuit_open", host=host)
+                    raise CircuitOpenError(f"Circuit open for {host}")
+
+                try:
+                    fresh = self._download(symbols, period, interval, start, sent, deadline)
+                except FetchDeadlineError:
+                    raise
+                except Exception as e:
+                    breaker.record_failure()
+                    delay = next(delays, None)
+                    if delay is None or (deadline is not None and delay >= _remaining(deadline)):
+                        raise
+                    metrics.count("fetch.retries", interval=interval)
+                    self.logger.warning(f"Retrying {symbols[0]}..{symbols[-1]} in {delay:.1f}s: {str(e)}")
+                    time.sleep(delay)
+                    continue
+
+                breaker.record_success()
+                return fresh
+        finally:
+            if sent is not None:
+                sent.set()
+
+    @staticmethod
+    def _host(symbol: str) -> str:
+        """
+        Circuit-breaker key for a symbol
+
+        yahooquery reaches every exchange through the same Yahoo endpoint, so
+        breakers are kept per exchange feed (the part that fails on its own
+        and that the fallback routes around).
+        """
+        suffix = symbol[symbol.rfind('.'):] if '.' in symbol else ""
+        return f"yahoo{suffix}"
+
+    @staticmethod
+    def _fallback_symbol(symbol: str) -> Optional[str]:
+        """Same stock on the fallback exchange ('RELIANCE.NS' -> 'RELIANCE.BO'), if any"""
+        for suffix, fallback in settings.FETCH_FALLBACK.items():
+            if symbol.endswith(suffix):
+                return symbol[:-len(suffix)] + fallback
+        return None
+
+    def _archive(self, frames: Dict[str, pd.DataFrame], interval: str):
+        """Merge fetched bars into the archive (a failed write never fails the fetch)"""
+        if self.archive is None or not frames:
+            return
+
+        try:
+            gained = self.archive.write(frames, interval)
+        except Exception as e:
+            self.logger.warning(f"Archive write failed: {str(e)}")
+            return
+
+        if gained:
+            self.logger.info(f"Archived {gained} new bars ({interval})")
+
+    def _record_fallback(self, ticker: str, fallback: str, reason: str, interval: str):
+        self.fallbacks.append((ticker, fallback, reason))
+        metrics.count("fetch.fallbacks", reason=reason, interval=interval)
+        self.logger.warning(f"{ticker}: using {fallback} ({reason})")
+
+    def _plan(self, ticker: str, period: str, interval: str) -> _FetchPlan:
+        """Decide between a full fetch and a delta fetch from the cache"""
+        window = period_to_timedelta(period)
+
+        cached, windows = (None, {})
+        if self.cache is not None:
+            cached, windows = self.cache.load(ticker, interval)
+
+        if cached is not None and not cached.empty and window is not None and period in windows:
+            # Cache knows how many sessions upstream returns for this period
+            # and is recent enough to extend: only ask for newer bars. The
+            # last cached bar is re-requested as well, since it may have
+            # been an incomplete (still forming) candle when it was stored.
+            if cached.index[-1] >= self._now_like(cached.index) - window:
+                return _FetchPlan(cached, windows, period, cached.index[-1].strftime('%Y-%m-%d'))
+
+        return _FetchPlan(cached, windows, period, None)
+
+    def _resolve(
+        self,
+        ticker: str,
+        interval: str,
+        plan: _FetchPlan,
+        fresh: Dict[str, pd.DataFrame],
+        sources: Dict[str, str]
+    ) -> Optional[pd.DataFrame]:
+        """Requested window for a ticker; fallback-exchange bars bypass the cache"""
+        if ticker in sources:
+            return fresh[ticker]
+
+        data = self._merge(ticker, interval, plan, fresh.get(ticker))
+        # Bars cached before lean mode was switched on still carry every column
+        if settings.MEMORY_LEAN and data is not None:
+            data = compact_ohlcv(data)
+        return data
+
+    def _merge(
+        self,
+        ticker: str,
+        interval: str,
+        plan: _FetchPlan,
+        fresh: Optional[pd.DataFrame]
+    ) -> Optional[pd.DataFrame]:
+        """
+        Combine freshly downloaded bars with the cache and return the requested window
+
+        A full fetch records how many sessions upstream returned for the
+        period; a cache hit is cut to that many sessions, so both paths
+        hand the same bars to the indicators.
+        """
+
+        if plan.start is None:
+            if fresh is None:
+                return None
+
+            if self.cache is not None and period_to_timedelta(plan.period) is not None:
+                sessions = count_sessions(fresh.index)
+                # The fresh bars replace the file: longer windows it no longer holds are forgotten
+                windows = {p: n for p, n in plan.windows.items() if n <= sessions}
+                windows[plan.period] = sessions
+                self.cache.save(ticker, interval, fresh, windows)
+
+            return fresh
+
+        if fresh is None:
+            # Upstream had nothing new (holiday, halt) - serve the cached bars
+            data = plan.cached
+        else:
+            data = pd.concat([plan.cached, fresh])
+            data = data[~data.index.duplicated(keep='last')].sort_index()
+            self.cache.save(ticker, interval, data, plan.windows)
+
+        return last_sessions(data, plan.windows[plan.period])
+
+    def _download(
+        self,
+        symbols: List[str],
+        period: str = "60d",
+        interval: str = "1d",
+        start: Optional[str] = None,
+        sent: Optional[threading.Event] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Download bars for one or more symbols in a single yahooquery request
+
+        Returns:
+            Dictionary {ticker: normalized dataframe}; symbols without usable
+            data are left out
+
+        Raises:
+            UpstreamError: The whole request was answered with an error message
+            FetchDeadlineError: No rate-limit token before the deadline
+        """
+        if not self.rate_limiter.acquire(deadline=deadline):
+            raise FetchDeadlineError(f"Fetch deadline passed waiting to request {symbols[0]}..{symbols[-1]}")
+        if sent is not None:
+            sent.set()
+
+        # Create ticker object
+        stock = self.ticker_factory(symbols if len(symbols) > 1 else symbols[0], timeout=settings.FETCH_TIMEOUT)
+
+        # Fetch data (an explicit start overrides the period)
+        request_start = time.perf_counter()
+        with metrics.span("fetch.request", interval=interval):
+            if start is not None:
+                data = stock.history(start=start, interval=interval)
+            else:
+                data = stock.history(period=period, interval=interval)
+        latency = time.perf_counter() - request_start
+
+        # Check if data is valid
+        if isinstance(data, str):
+            # Error message returned (retried by _request)
+            raise UpstreamError(data)
+
+        # Only primary requests (the ones tracking `sent`) set the hedge threshold
+        if sent is not None:
+            self.latency.record(latency)
+
+        # Partial failures come back as {symbol: dataframe or error message}
+        if isinstance(data, dict):
+            frames = data
+        elif isinstance(data, pd.DataFrame) and isinstance(data.index, pd.MultiIndex):
+            frames = {symbol: frame for symbol, frame in data.groupby(level=0, sort=False)}
+        else:
+            frames = {symbols[0]: data}
+
+        results = {}
+        for symbol in symbols:
+            frame = frames.get(symbol)
+
+            if isinstance(frame, str):
+                self.logger.warning(f"Error for {symbol}: {frame}")
+                continue
+
+            if not isinstance(frame, pd.DataFrame) or frame.empty:
+                self.logger.warning(f"No data for {symbol}")
+                continue
+
+            results[symbol] = self._normalize(frame)
+
+            # A ticker's latency is that of the (batch) request that delivered it
+            metrics.observe("fetch.ticker", latency, interval=interval)
+            metrics.count("fetch.bars", len(frame), interval=interval)
+
+        return results
+
+    @staticmethod
+    def _normalize(data: pd.DataFrame) -> pd.DataFrame:
+        """Flatten a yahooquery frame into a DatetimeIndex with capitalized columns"""
+
+        # Handle multi-index (symbol, date)
+        if isinstance(data.index, pd.MultiIndex):
+            # Remove the symbol level, keep only date
+            data = data.reset_index(level=0, drop=True)
+
+        # Daily bars come back as datetime.date objects, intraday as datetimes
+        try:
+            data.index = pd.DatetimeIndex(pd.to_datetime(data.index))
+        except (ValueError, TypeError):
+            data.index = pd.DatetimeIndex(pd.to_datetime(data.index, utc=True))
+
+        # Standardize column names (yahooquery uses lowercase)
+        data.columns = [col.capitalize() for col in data.columns]
+
+        # Rename 'Adjclose' to match our indicators
+        if 'Adjclose' in data.columns:
+            data = data.rename(columns={'Adjclose': 'Adj Close'})
+
+        if settings.MEMORY_LEAN:
+            data = compact_ohlcv(data)
+
+        return data
+
+    @staticmethod
+    def _now_like(index: pd.DatetimeIndex) -> pd.Timestamp:
+        """Current time, tz-aware only if the index is"""
+        return pd.Timestamp.now(tz=index.tz)
@@ -0,0 +1,40 @@
+"""OHLCV frame layout and the memory-lean (compact) form"""
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+PRICE_COLUMNS = ('Open', 'High', 'Low', 'Close')
+
+
+def compact_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only the OHLCV columns, in the smallest dtypes that hold them
+
+    Prices become float32 (about 7 significant digits, sub-paisa at NSE
+    price levels). Volume becomes int64 when every value is a whole number,
+    and otherwise stays float64 so missing or fractional volumes survive.
+    Adj Close, dividends, splits and any other columns are dropped.
+
+    Args:
+        df: OHLCV dataframe as returned by DataFetcher
+
+    Returns:
+        New dataframe on the same index (df itself if already compact)
+    """
+    if tuple(df.columns) == OHLCV_COLUMNS and all(df[col].dtype == np.float32 for col in PRICE_COLUMNS):
+        return df
+
+    columns = {col: df[col].to_numpy(dtype=np.float32) for col in PRICE_COLUMNS}
+
+    volume = df['Volume'].to_numpy()
+    if volume.dtype.kind == 'f' and np.isfinite(volume).all() and (volume == np.round(volume)).all():
+        volume = volume.astype(np.int64)
+    columns['Volume'] = volume
+
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def frames_nbytes(frames) -> int:
+    """Memory held by a dictionary of dataframes (data and index)"""
+    return sum(int(df.memory_usage(index=True, deep=True).sum()) for df in frames.values())
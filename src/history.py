@@ -0,0 +1,356 @@
+"""Indexed scan history (SQLite) kept alongside the text reports"""
+
+import argparse
+import glob
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+import config.settings as settings
+from config.universes import DEFAULT_SUFFIX
+from src.snapshot import SNAPSHOT_FIELDS
+from src.utils.logger import Logger
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_at TEXT NOT NULL,
+    report TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS picks (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    run_at TEXT NOT NULL,
+    scanner TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    ticker TEXT NOT NULL,
+    score REAL,
+    status TEXT,
+    {", ".join(f"{field} REAL" for field in SNAPSHOT_FIELDS)}
+);
+CREATE INDEX IF NOT EXISTS picks_ticker_time ON picks (ticker, run_at);
+CREATE INDEX IF NOT EXISTS picks_scanner_time ON picks (scanner, run_at);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (run_at);
+"""
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Report line patterns (see main.open_report)
+_GENERATED = re.compile(r"^Generated: (.+)$")
+_PICK = re.compile(r"^(\d+)\. (\S+) - (.+)$")
+_NUMBER = r"([-\d.]+|nan)"
+_REPORT_FIELDS = {
+    'score': re.compile(rf"Score: {_NUMBER}/100"),
+    'close': re.compile(rf"Close: ₹{_NUMBER}", re.IGNORECASE),
+    'ema20': re.compile(rf"EMA20: ₹{_NUMBER}"),
+    'ema50': re.compile(rf"EMA50: ₹{_NUMBER}"),
+    'vwap': re.compile(rf"VWAP: ₹{_NUMBER}"),
+    'rsi': re.compile(rf"RSI: {_NUMBER}"),
+    'volume_ratio': re.compile(rf"Vol Ratio: {_NUMBER}x"),
+}
+
+
+def normalize_ticker(ticker: str) -> str:
+    """Report-style symbols ('ONGC') get the exchange suffix used by scans"""
+    ticker = ticker.strip().upper()
+    return ticker if "." in ticker else ticker + DEFAULT_SUFFIX
+
+
+class HistoryStore:
+    """
+    Appends every scan's picks to a SQLite database
+
+    One row per pick holds the run time, scanner, rank, ticker, score,
+    status and the full indicator snapshot. Rows are indexed by
+    (ticker, time) and (scanner, time), so per-ticker and date-range
+    lookups stay in the milliseconds over years of runs.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Database file (defaults to settings.HISTORY_DB)
+        """
+        self.path = path or settings.HISTORY_DB
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(
+        self,
+        swing_picks: List[Dict],
+        intraday_picks: List[Dict],
+        run_at: Optional[datetime] = None,
+        report: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Append one run's picks
+
+        Args:
+            swing_picks: Swing scanner picks
+            intraday_picks: Intraday scanner picks
+            run_at: Run time (defaults to now)
+            report: Text report written for the run; a report already
+                    recorded is skipped
+
+        Returns:
+            Run id, or None if the report was already recorded
+        """
+        run_at = (run_at or datetime.now()).strftime(TIME_FORMAT)
+
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO runs (run_at, report) VALUES (?, ?)",
+                (run_at, os.path.abspath(report) if report else None)
+            )
+            if cursor.rowcount == 0:
+                return None
+
+            run_id = cursor.lastrowid
+            rows = [
+                self._row(run_id, run_at, scanner, rank, pick)
+                for scanner, picks in (('swing', swing_picks), ('intraday', intraday_picks))
+                for rank, pick in enumerate(picks, 1)
+            ]
+
+            columns = ("run_id", "run_at", "scanner", "rank", "ticker", "score", "status") + SNAPSHOT_FIELDS
+            self.conn.executemany(
+                f"INSERT INTO picks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+
+        return run_id
+
+    @staticmethod
+    def _row(run_id: int, run_at: str, scanner: str, rank: int, pick: Dict) -> tuple:
+        indicators = pick.get('indicators') or {}
+        return (
+            run_id, run_at, scanner, rank, pick['ticker'], pick.get('score'), pick.get('status'),
+            *(indicators.get(field) for field in SNAPSHOT_FIELDS)
+        )
+
+    def query(
+        self,
+        ticker: Optional[str] = None,
+        scanner: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[sqlite3.Row]:
+        """
+        Picks matching the filters, newest first
+
+        Args:
+            ticker: Symbol ('ONGC' or 'ONGC.NS')
+            scanner: 'swing' or 'intraday'
+            since: Earliest run time ('YYYY-MM-DD[ HH:MM:SS]', inclusive)
+            until: Latest run time (a bare date includes that whole day)
+            limit: Maximum rows
+        """
+        where, params = self._filters(ticker, scanner, since, until)
+        sql = f"SELECT * FROM picks {where} ORDER BY run_at DESC, scanner, rank"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return self.conn.execute(sql, params).fetchall()
+
+    def counts(
+        self,
+        scanner: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        ticker: Optional[str] = None
+    ) -> List[sqlite3.Row]:
+        """How often each ticker was picked, most frequent first"""
+        where, params = self._filters(ticker, scanner, since, until)
+        return self.conn.execute(
+            f"""SELECT ticker, scanner, COUNT(*) AS picks, COUNT(DISTINCT run_id) AS runs,
+                       ROUND(AVG(score), 2) AS avg_score, MIN(run_at) AS first_seen, MAX(run_at) AS last_seen
+                FROM picks {where}
+                GROUP BY ticker, scanner
+                ORDER BY picks DESC, ticker""",
+            params
+        ).fetchall()
+
+    def latest_picks(self, scanner: str) -> List[Dict]:
+        """
+        Picks of the most recent run that recorded this scanner
+
+        Returns:
+            Picks in scanner output form ({'ticker', 'score', 'status',
+            'indicators'}), best first
+        """
+        rows = self.conn.execute(
+            """SELECT * FROM picks
+               WHERE scanner = ? AND run_id = (SELECT run_id FROM picks WHERE scanner = ? ORDER BY run_at DESC, run_id DESC LIMIT 1)
+               ORDER BY rank""",
+            (scanner, scanner)
+        ).fetchall()
+
+        return [
+            {
+                'ticker': row['ticker'],
+                'score': row['score'],
+                'status': row['status'],
+                'indicators': {field: row[field] for field in SNAPSHOT_FIELDS},
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _filters(ticker, scanner, since, until):
+        clauses, params = [], []
+
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(normalize_ticker(ticker))
+        if scanner:
+            clauses.append("scanner = ?")
+            params.append(scanner)
+        if since:
+            clauses.append("run_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("run_at <= ?")
+            params.append(until + " 23:59:59" if len(until) == 10 else until)
+
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def import_reports(self, paths: Iterable[str]) -> int:
+        """
+        One-time import of text reports written before the store existed
+
+        Reports only hold the printed fields, so the rest of the snapshot is
+        left empty. Reports already recorded are skipped.
+
+        Returns:
+            Number of reports imported
+        """
+        imported = 0
+
+        for path in sorted(paths):
+            try:
+                run_at, swing, intraday = parse_report(path)
+            except (OSError, ValueError) as e:
+                Logger.warning(f"Skipping {path}: {str(e)}")
+                continue
+
+            if self.record_run(swing, intraday, run_at=run_at, report=path) is not None:
+                imported += 1
+
+        return imported
+
+
+def parse_report(path: str):
+    """
+    Read picks back from a text report
+
+    Returns:
+        Tuple of (run time, swing picks, intraday picks)
+    """
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    run_at = None
+    picks = {'swing': [], 'intraday': []}
+    section = None
+    current = None
+
+    for line in lines:
+        match = _GENERATED.match(line)
+        if match:
+            run_at = datetime.strptime(match.group(1).strip(), TIME_FORMAT)
+            continue
+
+        if line.startswith("🟦 SWING PICKS"):
+            section = 'swing'
+            continue
+        if line.startswith("🟥 INTRADAY PICKS"):
+            section = 'intraday'
+            continue
+        if line.startswith("🤖 AI ANALYSIS"):
+            break
+
+        if section is None:
+            continue
+
+        match = _PICK.match(line)
+        if match:
+            current = {'ticker': normalize_ticker(match.group(2)), 'status': match.group(3).strip(), 'indicators': {}}
+            picks[section].append(current)
+            continue
+
+        if current is not None:
+            for field, pattern in _REPORT_FIELDS.items():
+                found = pattern.search(line)
+                if found:
+                    value = float(found.group(1))
+                    if field == 'score':
+                        current['score'] = value
+                    else:
+                        current['indicators'][field] = value
+
+    if run_at is None:
+        raise ValueError("no 'Generated:' line")
+
+    return run_at, picks['swing'], picks['intraday']
+
+
+def _print_rows(rows: List[sqlite3.Row], columns: List[str]):
+    if not rows:
+        print("No matching picks")
+        return
+
+    table = [[("" if row[c] is None else str(row[c])) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in table)) for i, c in enumerate(columns)]
+
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in table:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def main():
+    """Command-line entry point: python -m src.history"""
+    parser = argparse.ArgumentParser(description="Query the scan history store")
+    parser.add_argument("--db", default=None, help="Database file (defaults to settings.HISTORY_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("picks", "List recorded picks"), ("counts", "Count picks per ticker")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--ticker")
+        command.add_argument("--scanner", choices=["swing", "intraday"])
+        command.add_argument("--since", help="YYYY-MM-DD[ HH:MM:SS]")
+        command.add_argument("--until", help="YYYY-MM-DD[ HH:MM:SS]")
+        if name == "picks":
+            command.add_argument("--limit", type=int, default=50)
+
+    importer = commands.add_parser("import", help="Import existing text reports")
+    importer.add_argument("paths", nargs="*", help=f"Report files (defaults to {settings.OUTPUT_DIR}/scan_*.txt)")
+
+    args = parser.parse_args()
+
+    with HistoryStore(args.db) as store:
+        if args.command == "picks":
+            rows = store.query(args.ticker, args.scanner, args.since, args.until, args.limit)
+            _print_rows(rows, ["run_at", "scanner", "rank", "ticker", "score", "status", "close", "rsi", "volume_ratio"])
+        elif args.command == "counts":
+            rows = store.counts(args.scanner, args.since, args.until, args.ticker)
+            _print_rows(rows, ["ticker", "scanner", "picks", "runs", "avg_score", "first_seen", "last_seen"])
+        else:
+            paths = args.paths or glob.glob(os.path.join(settings.OUTPUT_DIR, "scan_*.txt"))
+            Logger.success(f"Imported {store.import_reports(paths)} of {len(paths)} reports into {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Universe-wide indicator engine on time x ticker panels"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from src.snapshot import IndicatorSnapshot
+
+MIN_BARS = 50   # Same history requirement as IndicatorCalculator.get_latest_values
+
+# Panel field -> snapshot key (IndicatorCalculator.get_latest_values format)
+SNAPSHOT_KEYS = {
+    'Close': 'close', 'EMA20': 'ema20', 'EMA50': 'ema50', 'RSI': 'rsi',
+    'Volume': 'volume', 'Volume_MA': 'volume_ma', 'Volume_Ratio': 'volume_ratio',
+    'ATR': 'atr', 'VWAP': 'vwap', 'prev_close': 'prev_close'
+}
+
+
+class IndicatorPanel:
+    """
+    Indicators for a whole universe computed in one vectorized pass
+
+    Every field is a 2-D array of shape (bars, tickers). Rows are aligned on
+    the most recent bar: the last row holds each ticker's latest bar and a
+    ticker with a shorter history is padded with NaN at the top. Because the
+    EMA/RSI/rolling/cumulative calculations skip leading NaNs, each column
+    matches what IndicatorCalculator.calculate_all produces for that ticker
+    on its own.
+    """
+
+    def __init__(self, tickers: List[str], values: Dict[str, np.ndarray], lengths: np.ndarray):
+        self.tickers = tickers
+        self.values = values
+        self.lengths = lengths
+
+    @classmethod
+    def from_frames(
+        cls,
+        frames: Dict[str, pd.DataFrame],
+        ema_short: int = 20,
+        ema_long: int = 50
+    ) -> 'IndicatorPanel':
+        """
+        Build the panel and calculate all indicators
+
+        Args:
+            frames: Dictionary {ticker: OHLCV dataframe}
+            ema_short: Short EMA period
+            ema_long: Long EMA period
+
+        Returns:
+            IndicatorPanel with OHLCV and indicator fields
+        """
+        tickers = list(frames)
+        if not tickers:
+            return cls([], {}, np.zeros(0, dtype=np.int64))
+
+        lengths = np.array([len(frames[t]) for t in tickers], dtype=np.int64)
+        n_bars = int(lengths.max())
+
+        values = {}
+        for field in ['Open', 'High', 'Low', 'Close', 'Volume']:
+            panel = np.full((n_bars, len(tickers)), np.nan)
+            for j, ticker in enumerate(tickers):
+                if lengths[j]:
+                    panel[n_bars - lengths[j]:, j] = frames[ticker][field].to_numpy(dtype=np.float64)
+            values[field] = panel
+
+        panel = cls(tickers, values, lengths)
+        panel._calculate(ema_short, ema_long)
+
+        return panel
+
+    def _calculate(self, ema_short: int, ema_long: int):
+        """Vectorized equivalents of the per-ticker calculate_all"""
+        close = pd.DataFrame(self.values['Close'])
+        high = pd.DataFrame(self.values['High'])
+        low = pd.DataFrame(self.values['Low'])
+        volume = pd.DataFrame(self.values['Volume'])
+        padding = np.arange(len(close))[:, None] < (len(close) - self.lengths)
+
+        # EMAs
+        self.values['EMA20'] = close.ewm(span=ema_short, min_periods=ema_short, adjust=False).mean().to_numpy()
+        self.values['EMA50'] = close.ewm(span=ema_long, min_periods=ema_long, adjust=False).mean().to_numpy()
+
+        # RSI (Wilder smoothing, as in ta.momentum.rsi)
+        self.values['RSI'] = self._rsi(close, padding, window=14)
+
+        # Volume analysis
+        volume_ma = volume.rolling(window=20).mean()
+        self.values['Volume_MA'] = volume_ma.to_numpy()
+        self.values['Volume_Ratio'] = (volume / volume_ma).to_numpy()
+
+        # ATR (for risk assessment)
+        self.values['ATR'] = self._atr(high, low, close, window=14)
+
+        # VWAP (for intraday)
+        typical_pv = volume * (high + low + close) / 3
+        self.values['VWAP'] = (typical_pv.cumsum() / volume.cumsum()).to_numpy()
+
+    @staticmethod
+    def _rsi(close: pd.DataFrame, padding: np.ndarray, window: int) -> np.ndarray:
+        diff = close.diff(1)
+        up_direction = diff.where(diff > 0, 0.0).mask(padding)
+        down_direction = -diff.where(diff < 0, 0.0).mask(padding)
+
+        emaup = up_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+        emadn = down_direction.ewm(alpha=1 / window, min_periods=window, adjust=False).mean()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative_strength = emaup / emadn
+            rsi = np.where(emadn == 0, 100, 100 - (100 / (1 + relative_strength)))
+
+        return np.where(padding, np.nan, rsi)
+
+    def _atr(self, high: pd.DataFrame, low: pd.DataFrame, close: pd.DataFrame, window: int) -> np.ndarray:
+        prev_close = close.shift(1)
+        true_range = np.fmax(
+            (high - low).to_numpy(),
+            np.fmax((high - prev_close).abs().to_numpy(), (low - prev_close).abs().to_numpy())
+        )
+
+        n_bars = true_range.shape[0]
+        rows = np.arange(n_bars)[:, None]
+        first = n_bars - self.lengths
+        seed_row = first + window - 1
+
+        # Zeros until the seed bar, then Wilder smoothing seeded with the mean TR
+        atr = np.where(rows >= first, 0.0, np.nan)
+
+        seed_window = (rows >= first) & (rows <= seed_row)
+        seed_tr = np.where(seed_window, true_range, np.nan)
+        with np.errstate(invalid='ignore'):
+            seed = np.nansum(seed_tr, axis=0) / np.sum(~np.isnan(seed_tr), axis=0)
+
+        has_seed = seed_row < n_bars
+        atr[seed_row[has_seed], np.flatnonzero(has_seed)] = seed[has_seed]
+        atr[:, ~has_seed] = np.nan
+
+        start = int(seed_row[has_seed].min()) + 1 if has_seed.any() else n_bars
+        for r in range(start, n_bars):
+            active = r > seed_row
+            atr[r, active] = (atr[r - 1, active] * (window - 1) + true_range[r, active]) / float(window)
+
+        return atr
+
+    def field(self, name: str) -> pd.DataFrame:
+        """Return one field as a (bars x tickers) DataFrame"""
+        return pd.DataFrame(self.values[name], columns=self.tickers)
+
+    def latest_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Latest row of every field as struct-of-arrays
+
+        Returns:
+            Dictionary {field: 1-D array over tickers}, plus 'prev_close'
+        """
+        columns = {name: values[-1] for name, values in self.values.items()}
+        close = self.values['Close']
+        columns['prev_close'] = close[-2] if len(close) > 1 else close[-1]
+        return columns
+
+    def snapshot_columns(self) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+        """
+        Latest snapshot for every ticker as struct-of-arrays
+
+        Returns:
+            Tuple of (tickers, {snapshot field: 1-D array}, valid mask), where
+            valid marks tickers with at least MIN_BARS bars of history
+        """
+        if not self.tickers:
+            empty = np.zeros(0)
+            return [], {field: empty for field in SNAPSHOT_KEYS.values()}, np.zeros(0, dtype=bool)
+
+        columns = self.latest_columns()
+        snapshot = {key: columns[field] for field, key in SNAPSHOT_KEYS.items()}
+
+        return self.tickers, snapshot, self.lengths >= MIN_BARS
+
+    def latest_values(self) -> Dict[str, Optional[IndicatorSnapshot]]:
+        """
+        Per-ticker snapshot in the IndicatorCalculator.get_latest_values format
+
+        Returns:
+            Dictionary {ticker: indicator values or None if too little history}
+        """
+        if not self.tickers:
+            return {}
+
+        _, columns, valid = self.snapshot_columns()
+        results = {}
+
+        for j, ticker in enumerate(self.tickers):
+            results[ticker] = IndicatorSnapshot.from_columns(columns, j) if valid[j] else None
+
+        return results
@@ -1,8 +1,18 @@
 """Technical indicators calculation module"""
 
+import math
+import numpy as np
 import pandas as pd
 import ta
-from typing import Dict
+from collections import deque
+from typing import Optional
+import config.settings as settings
+from src import kernels
+from src.snapshot import IndicatorSnapshot
+from src.utils.metrics import metrics
+
+# Columns calculate_all adds, in order
+INDICATOR_COLUMNS = ['EMA20', 'EMA50', 'RSI', 'Volume_MA', 'Volume_Ratio', 'ATR', 'VWAP']
 
 class IndicatorCalculator:
     """Calculates technical indicators for stock data"""
@@ -18,9 +28,63 @@ class IndicatorCalculator:
             ema_long: Long EMA period
         
         Returns:
-            DataFrame with added indicator columns
+            DataFrame with added indicator columns (the input is not modified)
+        """
+        with metrics.span("indicators.calculate_all"):
+            if settings.MEMORY_LEAN:
+                return IndicatorCalculator._calculate_all_lean(df, ema_short, ema_long)
+            return IndicatorCalculator._calculate_all(df, ema_short, ema_long)
+    
+    @staticmethod
+    def calculate_from_archive(
+        archive,
+        ticker: str,
+        interval: str,
+        start=None,
+        end=None,
+        warmup: int = 0,
+        ema_short: int = 20,
+        ema_long: int = 50
+    ) -> Optional[pd.DataFrame]:
+        """
+        calculate_all over bars read straight from a BarArchive
+        
+        The OHLCV columns are the archive's memory maps, so no per-ticker
+        copy of the history is made before the indicators run.
+        
+        Args:
+            archive: src.bar_archive.BarArchive to read from
+            ticker: Stock symbol
+            interval: Data interval
+            start: First bar returned (None = from the first archived bar)
+            end: Last bar returned (None = up to the last archived bar)
+            warmup: Bars before `start` the indicators run over but that are
+                    not returned (EMA/RSI/ATR depend on earlier history)
+            ema_short: Short EMA period
+            ema_long: Long EMA period
+        
+        Returns:
+            DataFrame with OHLCV and indicator columns, or None if the ticker
+            is not archived
         """
-        df = df.copy()
+        df = archive.read(ticker, interval, start, end, warmup=warmup)
+        if df is None:
+            return None
+        
+        first = len(df) - len(archive.columns(ticker, interval, start, end)['Timestamp'])
+        return IndicatorCalculator.calculate_all(df, ema_short, ema_long).iloc[first:]
+    
+    @staticmethod
+    def _calculate_all(df: pd.DataFrame, ema_short: int, ema_long: int) -> pd.DataFrame:
+        if settings.INDICATOR_BACKEND == "numpy":
+            # One concat instead of seven column inserts (the OHLCV data is
+            # only shared, not copied, under pandas copy-on-write)
+            columns = IndicatorCalculator._kernel_columns(df, ema_short, ema_long)
+            indicators = pd.DataFrame(dict(zip(INDICATOR_COLUMNS, columns)), index=df.index)
+            return pd.concat([df, indicators], axis=1)
+        
+        # New columns only go to the shallow copy; the OHLCV data is shared, not duplicated
+        df = df.copy(deep=False)
         
         # EMAs
         df['EMA20'] = ta.trend.ema_indicator(df['Close'], window=ema_short)
@@ -45,12 +109,64 @@ class IndicatorCalculator:
         return df
     
     @staticmethod
-    def get_latest_values(df: pd.DataFrame) -> Dict:
+    def _calculate_all_lean(df: pd.DataFrame, ema_short: int, ema_long: int) -> pd.DataFrame:
+        """
+        calculate_all written into one preallocated float32 block
+        
+        Its rows become float32 columns of a shallow copy of the input. Unlike
+        pd.concat, which copies the OHLCV data unless pandas copy-on-write is
+        on (the default only from pandas 3), this shares it on every version,
+        so a computed frame costs the input plus 4 bytes per indicator per bar.
+        """
+        close, volume = df['Close'], df['Volume']
+        out = np.empty((len(INDICATOR_COLUMNS), len(df)), dtype=np.float32)
+        
+        if settings.INDICATOR_BACKEND == "numpy":
+            for row, values in enumerate(IndicatorCalculator._kernel_columns(df, ema_short, ema_long)):
+                out[row] = values
+        else:
+            out[0] = ta.trend.ema_indicator(close, window=ema_short)
+            out[1] = ta.trend.ema_indicator(close, window=ema_long)
+            out[2] = ta.momentum.rsi(close, window=14)
+            
+            volume_ma = volume.rolling(window=20).mean()
+            out[3] = volume_ma
+            out[4] = volume / volume_ma
+            
+            out[5] = ta.volatility.average_true_range(df['High'], df['Low'], close, window=14)
+            out[6] = (volume * (df['High'] + df['Low'] + close) / 3).cumsum() / volume.cumsum()
+        
+        df = df.copy(deep=False)
+        for name, values in zip(INDICATOR_COLUMNS, out):
+            df[name] = values
+        return df
+    
+    @staticmethod
+    def _kernel_columns(df: pd.DataFrame, ema_short: int, ema_long: int) -> list:
+        """INDICATOR_COLUMNS as float64 arrays from the NumPy kernels (same values as the ta path)"""
+        high, low, close, volume = (df[col].to_numpy(dtype=np.float64) for col in ('High', 'Low', 'Close', 'Volume'))
+        
+        volume_ma = kernels.rolling_mean(volume, 20)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = volume / volume_ma
+        
+        return [
+            kernels.ema(close, ema_short),
+            kernels.ema(close, ema_long),
+            kernels.rsi(close, 14),
+            volume_ma,
+            volume_ratio,
+            kernels.atr(high, low, close, 14),
+            kernels.vwap(high, low, close, volume),
+        ]
+    
+    @staticmethod
+    def get_latest_values(df: pd.DataFrame) -> Optional[IndicatorSnapshot]:
         """
         Extract latest indicator values
         
         Returns:
-            Dictionary with current values
+            IndicatorSnapshot (dict-style access) with current values
         """
         if df.empty or len(df) < 50:
             return None
@@ -58,15 +174,175 @@ class IndicatorCalculator:
         latest = df.iloc[-1]
         prev = df.iloc[-2] if len(df) > 1 else latest
         
-        return {
-            'close': latest['Close'],
-            'ema20': latest['EMA20'],
-            'ema50': latest['EMA50'],
-            'rsi': latest['RSI'],
-            'volume': latest['Volume'],
-            'volume_ma': latest['Volume_MA'],
-            'volume_ratio': latest['Volume_Ratio'],
-            'atr': latest['ATR'],
-            'vwap': latest.get('VWAP', None),
-            'prev_close': prev['Close']
-        }
\ No newline at end of file
+        return IndicatorSnapshot(
+            close=latest['Close'],
+            ema20=latest['EMA20'],
+            ema50=latest['EMA50'],
+            rsi=latest['RSI'],
+            volume=latest['Volume'],
+            volume_ma=latest['Volume_MA'],
+            volume_ratio=latest['Volume_Ratio'],
+            atr=latest['ATR'],
+            vwap=latest.get('VWAP', None),
+            prev_close=prev['Close']
+        )
+
+class IncrementalIndicatorState:
+    """
+    Running indicator state for one ticker on one timeframe
+
+    Holds just enough state to advance EMA20/EMA50, Wilder RSI, ATR, the
+    20-bar volume MA and cumulative VWAP by one bar in O(1), following the
+    same recursions (and warm-up rules) as IndicatorCalculator.calculate_all.
+    """
+    
+    def __init__(
+        self,
+        ema_short: int = 20,
+        ema_long: int = 50,
+        rsi_period: int = 14,
+        atr_period: int = 14,
+        volume_period: int = 20
+    ):
+        self.ema_short = ema_short
+        self.ema_long = ema_long
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.volume_period = volume_period
+        
+        self.count = 0
+        self.last_timestamp = None
+        self.close = None
+        self.prev_close = None
+        self.volume = None
+        
+        self._ema = {ema_short: None, ema_long: None}
+        self._avg_up = None
+        self._avg_down = None
+        self._atr = 0.0
+        self._seed_tr = []
+        self._volumes = deque(maxlen=volume_period)
+        self._cum_pv = 0.0
+        self._cum_volume = 0.0
+        self._vwap_missing = False
+    
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, **kwargs) -> 'IncrementalIndicatorState':
+        """
+        Seed the state by replaying historical OHLCV bars
+        
+        Args:
+            df: DataFrame with OHLCV data
+            **kwargs: Indicator periods (see __init__)
+        
+        Returns:
+            State positioned after the last bar of df
+        """
+        state = cls(**kwargs)
+        
+        columns = [df[col].to_numpy(dtype=np.float64) for col in ('High', 'Low', 'Close', 'Volume')]
+        for timestamp, high, low, close, volume in zip(df.index, *columns):
+            state.update(high, low, close, volume, timestamp)
+        
+        return state
+    
+    @staticmethod
+    def _ewm_step(prev: Optional[float], value: float, alpha: float) -> float:
+        """One adjust=False EWM step, with the same arithmetic as pandas"""
+        if prev is None:
+            return value
+        old_weight = 1.0 - alpha
+        return (old_weight * prev + alpha * value) / (old_weight + alpha)
+    
+    def update(self, high: float, low: float, close: float, volume: float, timestamp=None):
+        """
+        Advance all indicators by one bar
+        
+        Args:
+            high, low, close, volume: Values of the new bar
+            timestamp: Bar timestamp (kept so callers can skip bars already seen)
+        """
+        prev_close = self.close
+        
+        # EMAs
+        for span in self._ema:
+            self._ema[span] = self._ewm_step(self._ema[span], close, 2.0 / (span + 1.0))
+        
+        # RSI (first bar has no change, which ta counts as a zero move)
+        diff = close - prev_close if prev_close is not None else math.nan
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        self._avg_up = self._ewm_step(self._avg_up, up, 1.0 / self.rsi_period)
+        self._avg_down = self._ewm_step(self._avg_down, down, 1.0 / self.rsi_period)
+        
+        # ATR: zeros until the window fills, seeded with the mean true range
+        if prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+        
+        if self.count < self.atr_period:
+            self._seed_tr.append(true_range)
+            if self.count == self.atr_period - 1:
+                self._atr = float(np.sum(self._seed_tr) / len(self._seed_tr))
+                self._seed_tr = []
+        else:
+            self._atr = (self._atr * (self.atr_period - 1) + true_range) / float(self.atr_period)
+        
+        # Volume MA and VWAP; like pandas cumsum, a NaN bar is skipped by the
+        # running sums and only its own VWAP is NaN
+        self._volumes.append(volume)
+        typical_pv = volume * (high + low + close) / 3
+        if not math.isnan(typical_pv):
+            self._cum_pv += typical_pv
+        if not math.isnan(volume):
+            self._cum_volume += volume
+        self._vwap_missing = math.isnan(typical_pv) or math.isnan(volume)
+        
+        self.prev_close = prev_close if prev_close is not None else close
+        self.close = close
+        self.volume = volume
+        self.last_timestamp = timestamp
+        self.count += 1
+    
+    def _ema_value(self, span: int) -> float:
+        return self._ema[span] if self.count >= span else math.nan
+    
+    def _rsi_value(self) -> float:
+        if self.count < self.rsi_period:
+            return math.nan
+        if self._avg_down == 0:
+            return 100.0
+        return 100 - (100 / (1 + self._avg_up / self._avg_down))
+    
+    def get_latest_values(self) -> Optional[IndicatorSnapshot]:
+        """
+        Current snapshot, in the IndicatorCalculator.get_latest_values format
+        
+        Returns:
+            IndicatorSnapshot with current values, or None with fewer than 50 bars
+        """
+        if self.count < 50:
+            return None
+        
+        if len(self._volumes) == self.volume_period:
+            volume_ma = float(np.sum(self._volumes) / self.volume_period)
+        else:
+            volume_ma = math.nan
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = float(np.float64(self.volume) / np.float64(volume_ma))
+            vwap = math.nan if self._vwap_missing else float(np.float64(self._cum_pv) / np.float64(self._cum_volume))
+        
+        return IndicatorSnapshot(
+            close=self.close,
+            ema20=self._ema_value(self.ema_short),
+            ema50=self._ema_value(self.ema_long),
+            rsi=self._rsi_value(),
+            volume=self.volume,
+            volume_ma=volume_ma,
+            volume_ratio=volume_ratio,
+            atr=self._atr if self.count >= self.atr_period else 0.0,
+            vwap=vwap,
+            prev_close=self.prev_close
+        )
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""Pure-NumPy indicator kernels with the warm-up and NaN rules of the ta library"""
+
+import math
+import numpy as np
+import pandas as pd
+
+# Largest weight growth inside one block of the linear filter; bounds the
+# rounding error of the block's scaled cumulative sum to ~1e-10 relative
+_BLOCK_GAIN = 1e6
+
+
+def _as_float(x) -> np.ndarray:
+    return np.asarray(x, dtype=np.float64)
+
+
+def linear_filter(x: np.ndarray, decay: float, initial: float = 0.0) -> np.ndarray:
+    """
+    First-order linear filter y[t] = decay * y[t-1] + x[t], with y[-1] = initial
+
+    Evaluated without a per-element loop: inside a block of L bars the filter
+    is a cumulative sum of x weighted by decay**-k, scaled back by decay**k.
+    L is chosen so the weights grow by at most _BLOCK_GAIN, and the blocks
+    are chained by their last values (one scalar step per block, so
+    ~len(x) / L steps).
+
+    Args:
+        x: Input (1-D)
+        decay: Weight of the previous output, in [0, 1)
+        initial: Output before the first element
+
+    Returns:
+        Filtered array (float64, same length as x)
+    """
+    x = _as_float(x)
+    n = len(x)
+    if n == 0:
+        return x.copy()
+    if decay == 0.0:
+        return x.copy()
+
+    block = max(1, min(n, int(math.log(_BLOCK_GAIN) / -math.log(decay))))
+    n_blocks = -(-n // block)
+
+    padded = np.zeros(n_blocks * block)
+    padded[:n] = x
+    blocks = padded.reshape(n_blocks, block)
+
+    steps = np.arange(1, block + 1)
+    grow = decay ** -steps.astype(np.float64)
+    shrink = decay ** steps.astype(np.float64)
+
+    # Each block's response from a zero start, all blocks at once
+    response = np.cumsum(blocks * grow, axis=1) * shrink
+
+    # Output carried into each block
+    carry = np.empty(n_blocks)
+    carried = initial
+    block_decay = decay ** block
+    for b, last in enumerate(response[:, -1].tolist()):
+        carry[b] = carried
+        carried = block_decay * carried + last
+
+    return (response + carry[:, None] * shrink).ravel()[:n]
+
+
+def ewm_mean(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """
+    pandas ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean()
+
+    Leading NaNs are skipped like pandas does. A NaN after the first value
+    changes the weights pandas applies in a way that is not a linear filter,
+    so such input is handed to pandas itself.
+    """
+    x = _as_float(x)
+    out = np.full(len(x), np.nan)
+
+    valid = ~np.isnan(x)
+    first = int(np.argmax(valid)) if valid.any() else len(x)
+    if first == len(x):
+        return out
+    if not valid[first:].all():
+        return pd.Series(x).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+
+    # y[first] = x[first]; afterwards y[t] = (1 - alpha) * y[t-1] + alpha * x[t]
+    out[first] = x[first]
+    out[first + 1:] = linear_filter(alpha * x[first + 1:], 1.0 - alpha, x[first])
+    out[:first + max(min_periods, 1) - 1] = np.nan
+    return out
+
+
+def ema(close: np.ndarray, window: int) -> np.ndarray:
+    """ta.trend.ema_indicator(close, window)"""
+    return ewm_mean(close, 2.0 / (window + 1.0), window)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    ta.momentum.rsi(close, window)
+
+    Like ta, a missing change (first bar, NaN closes) counts as a zero move,
+    so the Wilder averages always start at the first bar.
+    """
+    close = _as_float(close)
+    diff = np.empty(len(close))
+    diff[:1] = np.nan
+    diff[1:] = close[1:] - close[:-1]
+
+    with np.errstate(invalid='ignore'):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+
+    avg_up = ewm_mean(up, 1.0 / window, window)
+    avg_down = ewm_mean(down, 1.0 / window, window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(avg_down == 0, 100.0, 100 - (100 / (1 + avg_up / avg_down)))
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Largest of high-low, |high-prev_close|, |low-prev_close| (NaNs skipped, as in ta)"""
+    high, low, close = _as_float(high), _as_float(low), _as_float(close)
+    prev_close = np.empty(len(close))
+    prev_close[:1] = np.nan
+    prev_close[1:] = close[:-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    ta.volatility.average_true_range(high, low, close, window)
+
+    Zeros until bar window-1, which holds the mean true range of the first
+    `window` bars; Wilder smoothing from there. ta raises IndexError on
+    fewer than `window` bars; this returns all NaN instead.
+    """
+    tr = true_range(high, low, close)
+    n = len(tr)
+    if n < window:
+        return np.full(n, np.nan)
+
+    seed_tr = tr[:window]
+    with np.errstate(invalid='ignore'):
+        seed = np.nansum(seed_tr) / np.count_nonzero(~np.isnan(seed_tr))
+
+    out = np.zeros(n)
+    out[window - 1] = seed
+    out[window:] = linear_filter(tr[window:] / window, (window - 1) / window, seed)
+    return out
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    pandas rolling(window).mean(): NaN until the window is full or while it holds a NaN
+
+    Windowed sums are differences of one cumulative sum.
+    """
+    x = _as_float(x)
+    out = np.full(len(x), np.nan)
+    if len(x) < window:
+        return out
+
+    missing = np.isnan(x)
+    sums = np.cumsum(np.where(missing, 0.0, x))
+    gaps = np.cumsum(missing)
+
+    window_sum = sums[window - 1:].copy()
+    window_sum[1:] -= sums[:-window]
+    window_gaps = gaps[window - 1:].copy()
+    window_gaps[1:] -= gaps[:-window]
+
+    out[window - 1:] = np.where(window_gaps == 0, window_sum / window, np.nan)
+    return out
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """
+    Cumulative VWAP of the typical price, (H + L + C) / 3
+
+    Cumulative sums skip NaNs and stay NaN at NaN bars, as pandas cumsum does.
+    """
+    high, low, close, volume = _as_float(high), _as_float(low), _as_float(close), _as_float(volume)
+    typical_pv = volume * (high + low + close) / 3
+
+    cum_pv = np.where(np.isnan(typical_pv), np.nan, np.nancumsum(typical_pv))
+    cum_volume = np.where(np.isnan(volume), np.nan, np.nancumsum(volume))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return cum_pv / cum_volume
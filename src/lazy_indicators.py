@@ -0,0 +1,217 @@
+"""Lazy, tail-only indicator calculation driven by scanner requirements"""
+
+import math
+import numpy as np
+import pandas as pd
+import ta
+from typing import Dict, Iterable, List, Optional, Set
+import config.settings as settings
+from src import kernels
+from src.snapshot import SNAPSHOT_FIELDS, IndicatorSnapshot
+
+MIN_BARS = 50   # Same history requirement as IndicatorCalculator.get_latest_values
+
+# Snapshot field -> indicator it is read from (None = raw OHLCV)
+FIELD_SOURCES = {
+    'close': None,
+    'prev_close': None,
+    'volume': None,
+    'ema20': 'EMA20',
+    'ema50': 'EMA50',
+    'rsi': 'RSI',
+    'volume_ma': 'Volume_MA',
+    'volume_ratio': 'Volume_Ratio',
+    'atr': 'ATR',
+    'vwap': 'VWAP',
+}
+
+# Indicator -> indicators it is derived from
+INDICATOR_DEPENDENCIES = {
+    'EMA20': [],
+    'EMA50': [],
+    'RSI': [],
+    'Volume_MA': [],
+    'Volume_Ratio': ['Volume_MA'],
+    'ATR': [],
+    'VWAP': [],
+}
+
+
+def ewm_warmup(alpha: float, tolerance: float) -> int:
+    """
+    Bars after which an EWM has forgotten its starting value to within tolerance
+
+    The weight left on the seed after n steps is (1 - alpha) ** n.
+    """
+    return int(math.ceil(math.log(tolerance) / math.log(1.0 - alpha)))
+
+
+def resolve_indicators(fields: Iterable[str]) -> List[str]:
+    """Indicators needed for a set of snapshot fields, dependencies first"""
+    needed: List[str] = []
+
+    def visit(name: str):
+        if name in needed:
+            return
+        for dependency in INDICATOR_DEPENDENCIES[name]:
+            visit(dependency)
+        needed.append(name)
+
+    fields = set(fields)
+    for field in (f for f in SNAPSHOT_FIELDS if f in fields):
+        source = FIELD_SOURCES[field]
+        if source is not None:
+            visit(source)
+
+    return needed
+
+
+class LazyIndicatorCalculator:
+    """
+    Computes only the indicators a scanner reads, over a minimal tail
+
+    Each indicator runs on the last N bars, where N is the warm-up needed for
+    its recursion to forget the dropped history to within `tolerance`
+    (EMA/RSI/ATR; RSI's ratio can amplify that a few times), or exactly its
+    window (volume MA). VWAP is cumulative over the whole frame, so it is
+    reduced with two sums instead. Fields nobody asked for come back as NaN.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] = SNAPSHOT_FIELDS,
+        tolerance: float = settings.LAZY_TOLERANCE,
+        ema_short: int = 20,
+        ema_long: int = 50
+    ):
+        """
+        Args:
+            fields: Snapshot fields that must be filled in
+            tolerance: Allowed relative influence of the truncated history
+            ema_short: Short EMA period
+            ema_long: Long EMA period
+        """
+        self.fields: Set[str] = set(fields)
+        self.tolerance = tolerance
+        self.ema_short = ema_short
+        self.ema_long = ema_long
+        self.indicators = resolve_indicators(self.fields)
+
+        self.warmup = {
+            'EMA20': max(ema_short, ewm_warmup(2.0 / (ema_short + 1), tolerance)),
+            'EMA50': max(ema_long, ewm_warmup(2.0 / (ema_long + 1), tolerance)),
+            'RSI': max(14, ewm_warmup(1.0 / 14, tolerance)) + 1,
+            'ATR': 14 + ewm_warmup(1.0 / 14, tolerance),
+            'Volume_MA': 20,
+            'Volume_Ratio': 20,
+            'VWAP': 0,
+        }
+
+        self.stats = {
+            'tickers': 0,
+            'bars_available': 0,
+            'bars_processed': 0,
+            'indicators_computed': 0,
+            'indicators_skipped': 0,
+        }
+
+    @classmethod
+    def for_scanners(cls, *scanners, **kwargs) -> 'LazyIndicatorCalculator':
+        """Build a calculator for the union of the scanners' REQUIRED_FIELDS"""
+        fields = set()
+        for scanner in scanners:
+            fields.update(scanner.REQUIRED_FIELDS)
+        return cls(fields, **kwargs)
+
+    def get_latest_values(self, df: pd.DataFrame) -> Optional[IndicatorSnapshot]:
+        """
+        Latest values of the requested fields
+
+        Returns:
+            IndicatorSnapshot (unrequested fields are NaN) or None with too
+            little history
+        """
+        if df.empty or len(df) < MIN_BARS:
+            return None
+
+        n_bars = len(df)
+        values = {
+            'close': df['Close'].iloc[-1],
+            'prev_close': df['Close'].iloc[-2],
+            'volume': df['Volume'].iloc[-1],
+        }
+
+        processed = 0
+        for name in self.indicators:
+            tail = df.iloc[-min(self.warmup[name], n_bars):] if self.warmup[name] else df
+            processed += len(tail) if self.warmup[name] else 0
+            values[name] = self._latest(name, tail, values)
+
+        # VWAP touches every bar, but only through two reductions
+        if 'VWAP' in self.indicators:
+            processed += n_bars
+
+        self.stats['tickers'] += 1
+        self.stats['bars_available'] += n_bars * len(INDICATOR_DEPENDENCIES)
+        self.stats['bars_processed'] += processed
+        self.stats['indicators_computed'] += len(self.indicators)
+        self.stats['indicators_skipped'] += len(INDICATOR_DEPENDENCIES) - len(self.indicators)
+
+        snapshot = {}
+        for field in SNAPSHOT_FIELDS:
+            source = FIELD_SOURCES[field]
+            key = field if source is None else source
+            snapshot[field] = values.get(key, math.nan)
+
+        return IndicatorSnapshot(**snapshot)
+
+    def _latest(self, name: str, tail: pd.DataFrame, values: Dict) -> float:
+        """Last value of one indicator over a tail window"""
+        if settings.INDICATOR_BACKEND == "numpy" and name in ('EMA20', 'EMA50', 'RSI', 'ATR'):
+            close = tail['Close'].to_numpy(dtype=np.float64)
+            if name == 'EMA20':
+                return kernels.ema(close, self.ema_short)[-1]
+            if name == 'EMA50':
+                return kernels.ema(close, self.ema_long)[-1]
+            if name == 'RSI':
+                return kernels.rsi(close, 14)[-1]
+            return kernels.atr(tail['High'].to_numpy(dtype=np.float64), tail['Low'].to_numpy(dtype=np.float64), close, 14)[-1]
+        if name == 'EMA20':
+            return ta.trend.ema_indicator(tail['Close'], window=self.ema_short).iloc[-1]
+        if name == 'EMA50':
+            return ta.trend.ema_indicator(tail['Close'], window=self.ema_long).iloc[-1]
+        if name == 'RSI':
+            return ta.momentum.rsi(tail['Close'], window=14).iloc[-1]
+        if name == 'ATR':
+            return ta.volatility.average_true_range(
+                tail['High'], tail['Low'], tail['Close'], window=14
+            ).iloc[-1]
+        if name == 'Volume_MA':
+            return tail['Volume'].to_numpy(dtype=np.float64)[-20:].mean()
+        if name == 'Volume_Ratio':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.float64(values['volume']) / np.float64(values['Volume_MA'])
+        if name == 'VWAP':
+            high, low, close, volume = (
+                tail[col].to_numpy(dtype=np.float64) for col in ('High', 'Low', 'Close', 'Volume')
+            )
+            typical_pv = volume * (high + low + close) / 3
+            # Like the cumulative sums, NaN bars are skipped but a NaN last bar has no VWAP
+            if np.isnan(typical_pv[-1]) or np.isnan(volume[-1]):
+                return math.nan
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.nansum(typical_pv) / np.nansum(volume)
+
+        raise KeyError(name)
+
+    def summary(self) -> str:
+        """Human-readable account of the work skipped so far"""
+        available = self.stats['bars_available']
+        processed = self.stats['bars_processed']
+        skipped_pct = (1 - processed / available) * 100 if available else 0.0
+
+        return (
+            f"Lazy indicators: {self.stats['indicators_computed']} computed, "
+            f"{self.stats['indicators_skipped']} skipped across {self.stats['tickers']} stocks; "
+            f"{processed}/{available} indicator-bars processed ({skipped_pct:.1f}% skipped)"
+        )
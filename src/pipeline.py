@@ -0,0 +1,442 @@
+"""Sharded scan pipeline: fetch -> indicators -> snapshots, merged for global ranking"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+import config.settings as settings
+from src.data_cache import OHLCVCache
+from src.indicator_panel import IndicatorPanel
+from src.rescoring import SnapshotMemo, diff_picks
+from src.resample import can_resample, longest_period, resample_frames
+from src.snapshot import SNAPSHOT_DTYPE, SNAPSHOT_FIELDS, to_array
+from src.utils.logger import Logger
+from src.utils.metrics import metrics
+from src.utils.rate_limiter import TokenBucket
+
+
+def compute_snapshots(
+    frames: Dict[str, pd.DataFrame],
+    required_fields: Iterable[str] = SNAPSHOT_FIELDS,
+    engine: Optional[str] = None,
+    memo: Optional[SnapshotMemo] = None
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Latest indicator snapshot for every ticker with enough history
+
+    Args:
+        frames: Dictionary {ticker: OHLCV dataframe}
+        required_fields: Snapshot fields the scanners read (used by 'lazy')
+        engine: 'panel', 'lazy' or 'per_ticker' (defaults to settings.INDICATOR_ENGINE)
+        memo: Snapshots of the previous scan; only tickers whose bars
+              changed are recomputed, and the memo is updated
+
+    Returns:
+        Tuple of (tickers, structured array of snapshots in SNAPSHOT_DTYPE)
+    """
+    engine = engine or settings.INDICATOR_ENGINE
+
+    with metrics.span("indicators.snapshots", engine=engine):
+        if memo is None:
+            return _compute_snapshots(frames, required_fields, engine)
+        return _compute_changed_snapshots(frames, required_fields, engine, memo)
+
+
+def _rescore_config(engine: str) -> str:
+    """Settings a memoized snapshot depends on besides the bars"""
+    return f"{engine}|{settings.INDICATOR_BACKEND}|lean={settings.MEMORY_LEAN}|tolerance={settings.LAZY_TOLERANCE}"
+
+
+def _compute_changed_snapshots(frames, required_fields, engine, memo: SnapshotMemo) -> Tuple[List[str], np.ndarray]:
+    # The lazy engine leaves unrequested fields empty; the others fill them all
+    memo.prepare(_rescore_config(engine), required_fields if engine == "lazy" else SNAPSHOT_FIELDS)
+
+    changed, digests = memo.changed(frames)
+    if changed:
+        tickers, records = _compute_snapshots({ticker: frames[ticker] for ticker in changed}, memo.fields, engine)
+        memo.update(digests, changed, tickers, records)
+
+    metrics.count("indicators.recomputed", len(changed), engine=engine)
+    metrics.count("indicators.reused", len(frames) - len(changed), engine=engine)
+
+    return memo.snapshots(frames)
+
+
+def _compute_snapshots(frames, required_fields, engine) -> Tuple[List[str], np.ndarray]:
+    if engine == "panel":
+        tickers, columns, valid = IndicatorPanel.from_frames(frames).snapshot_columns()
+        keep = np.flatnonzero(valid)
+
+        records = np.empty(len(keep), dtype=SNAPSHOT_DTYPE)
+        for field in SNAPSHOT_FIELDS:
+            records[field] = columns[field][keep]
+
+        return [tickers[j] for j in keep], records
+
+    # ta (and the per-ticker engines) only load when one of them is selected
+    if engine == "lazy":
+        from src.lazy_indicators import LazyIndicatorCalculator
+
+        lazy = LazyIndicatorCalculator(required_fields)
+        snapshots = {ticker: lazy.get_latest_values(df) for ticker, df in frames.items()}
+        Logger.info(lazy.summary())
+    else:
+        from src.indicators import IndicatorCalculator
+
+        snapshots = {
+            ticker: IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))
+            for ticker, df in frames.items()
+        }
+
+    snapshots = {ticker: snapshot for ticker, snapshot in snapshots.items() if snapshot is not None}
+    return list(snapshots), to_array(snapshots.values())
+
+
+def compute_timeframe_snapshots(
+    frames: Dict[str, pd.DataFrame],
+    base_interval: str,
+    timeframes: List[Tuple[str, str]],
+    required_fields: Iterable[str] = SNAPSHOT_FIELDS,
+    memos: Optional[Dict[Tuple[str, str], SnapshotMemo]] = None
+) -> Dict[Tuple[str, str], Tuple[List[str], np.ndarray]]:
+    """
+    Snapshots for several timeframes built from the same fine-grained bars
+
+    Args:
+        frames: Dictionary {ticker: OHLCV dataframe at base_interval}
+        base_interval: Interval of the frames
+        timeframes: (period, interval) pairs to build
+        required_fields: Snapshot fields the scanners read
+        memos: Previous snapshots per timeframe (see compute_snapshots)
+
+    Returns:
+        Dictionary {(period, interval): (tickers, snapshot records)}
+    """
+    memos = memos or {}
+    return {
+        (period, interval): compute_snapshots(
+            resample_frames(frames, interval, period, base_interval), required_fields,
+            memo=memos.get((period, interval))
+        )
+        for period, interval in timeframes
+    }
+
+
+def _scan_shard(
+    tickers: List[str],
+    period: str,
+    interval: str,
+    required_fields: List[str],
+    rate_limit: Optional[float],
+    rate_burst: float,
+    collect_metrics: bool = False,
+    memo: Optional[SnapshotMemo] = None
+) -> Tuple[List[str], np.ndarray, Optional[SnapshotMemo], Optional[Dict]]:
+    """
+    Process-pool worker: fetch one shard and reduce it to snapshots
+
+    Only the compact snapshot records travel back to the parent, so the
+    shard's OHLCV frames are freed as soon as the worker moves on. With
+    collect_metrics, the worker's own metrics come back too for merging.
+    The shard's part of the memo comes back updated.
+    """
+    from src.data_fetcher import DataFetcher
+
+    if collect_metrics:
+        metrics.reset()
+
+    rate_limiter = TokenBucket(rate_limit, rate_burst)
+    fetcher = DataFetcher(rate_limiter=rate_limiter)
+
+    try:
+        frames = fetcher.fetch_multiple_stocks(tickers, period=period, interval=interval)
+    finally:
+        fetcher.close()
+    tickers, records = compute_snapshots(frames, required_fields, memo=memo)
+
+    return tickers, records, memo, metrics.state() if collect_metrics else None
+
+
+def _scan_shard_timeframes(
+    tickers: List[str],
+    base_interval: str,
+    timeframes: List[Tuple[str, str]],
+    required_fields: List[str],
+    rate_limit: Optional[float],
+    rate_burst: float,
+    collect_metrics: bool = False,
+    memo: Optional[Dict[Tuple[str, str], SnapshotMemo]] = None
+) -> Tuple[Dict[Tuple[str, str], Tuple[List[str], np.ndarray]], Optional[Dict], Optional[Dict]]:
+    """
+    Process-pool worker: one fetch at base_interval, snapshots for every timeframe
+
+    The base bars cover the longest requested period; each timeframe is
+    resampled from them locally.
+    """
+    from src.data_fetcher import DataFetcher
+
+    if collect_metrics:
+        metrics.reset()
+
+    rate_limiter = TokenBucket(rate_limit, rate_burst)
+    fetcher = DataFetcher(rate_limiter=rate_limiter)
+
+    period = longest_period(period for period, _ in timeframes)
+    try:
+        frames = fetcher.fetch_multiple_stocks(tickers, period=period, interval=base_interval)
+    finally:
+        fetcher.close()
+    results = compute_timeframe_snapshots(frames, base_interval, timeframes, required_fields, memo)
+
+    return results, memo, metrics.state() if collect_metrics else None
+
+
+# Timeframes main.py scans; with resampling, those the base can supply come out of one fetch
+SCAN_TIMEFRAMES = [
+    (settings.DATA_PERIOD_SWING, "1d"),
+    (settings.DATA_PERIOD_INTRADAY, settings.INTRADAY_INTERVAL),
+]
+
+
+class ScanPipeline:
+    """
+    Runs a scan over a universe split into shards across a process pool
+
+    Peak memory per worker is one shard of OHLCV history; the parent only
+    keeps the merged snapshot records (~80 bytes per ticker) it ranks at the end.
+
+    With settings.RESAMPLE_BASE_INTERVAL set, the first scan fetches that
+    interval once and builds every timeframe in `timeframes` it can supply
+    (see can_resample) from it, so later scans of those timeframes cost no
+    further network requests.
+
+    With rescoring on, each timeframe keeps a SnapshotMemo in
+    settings.RESCORE_DIR: indicators are recomputed only for stocks whose
+    bars changed since the last scan, and `changes` holds each scanner's
+    pick diff against its previous run.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        shard_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        from_cache: bool = False,
+        timeframes: Optional[List[Tuple[str, str]]] = None,
+        base_interval: Optional[str] = None,
+        rescore: Optional[bool] = None
+    ):
+        """
+        Args:
+            tickers: Universe to scan
+            shard_size: Tickers per shard (defaults to settings.PIPELINE_SHARD_SIZE)
+            workers: Process pool size (defaults to settings.PIPELINE_WORKERS or CPU count)
+            from_cache: Scan the cached bars only (no network, no worker processes)
+            timeframes: (period, interval) pairs built together when resampling
+                        (defaults to SCAN_TIMEFRAMES)
+            base_interval: Interval fetched for resampling (defaults to
+                           settings.RESAMPLE_BASE_INTERVAL; '' fetches each interval)
+            rescore: Reuse the previous scan's snapshots for unchanged stocks
+                     (defaults to settings.RESCORE_ENABLED)
+        """
+        self.logger = Logger()
+        self.tickers = tickers
+        self.shard_size = shard_size or settings.PIPELINE_SHARD_SIZE
+        self.workers = workers or settings.PIPELINE_WORKERS or os.cpu_count() or 1
+        self.from_cache = from_cache
+        self.timeframes = list(timeframes or SCAN_TIMEFRAMES)
+        self.base_interval = settings.RESAMPLE_BASE_INTERVAL if base_interval is None else base_interval
+        self.rescore = settings.RESCORE_ENABLED if rescore is None else rescore
+        self._resampled: Dict[Tuple[str, str], Tuple[List[str], np.ndarray]] = {}
+        self._memos: Dict[Tuple[str, str], SnapshotMemo] = {}
+        # scanner class name -> diff_picks() of its last scan
+        self.changes: Dict[str, Dict] = {}
+
+    def shards(self) -> List[List[str]]:
+        """Split the universe into shards"""
+        return [self.tickers[i:i+self.shard_size] for i in range(0, len(self.tickers), self.shard_size)]
+
+    def snapshots(
+        self,
+        period: str,
+        interval: str,
+        required_fields: Iterable[str] = SNAPSHOT_FIELDS
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Fetch and reduce every shard, then merge (or read the cache only)
+
+        Returns:
+            Tuple of (tickers, structured array of snapshots) for the whole universe
+        """
+        required_fields = list(required_fields)
+
+        if self.base_interval and can_resample(self.base_interval, interval, period):
+            return self._resampled_snapshots(period, interval, required_fields)
+
+        memo = self._memo(period, interval)
+
+        if self.from_cache:
+            frames = OHLCVCache(settings.CACHE_DIR).load_window(self.tickers, interval, period)
+            self.logger.info(f"Loaded cached {interval} bars for {len(frames)}/{len(self.tickers)} stocks")
+            tickers, records = compute_snapshots(frames, required_fields, memo=memo)
+        else:
+            results = self._run_shards(_scan_shard, period, interval, required_fields, memo=memo)
+
+            tickers = [ticker for shard_tickers, _, _ in results for ticker in shard_tickers]
+            records = np.concatenate([shard_records for _, shard_records, _ in results]) if results else np.empty(0, dtype=SNAPSHOT_DTYPE)
+            if memo is not None:
+                for _, _, shard_memo in results:
+                    memo.merge(shard_memo)
+
+        self._save_memo(period, interval)
+        return tickers, records
+
+    def _resampled_snapshots(self, period: str, interval: str, required_fields: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Snapshots for one timeframe, building every pending timeframe from one base fetch"""
+        key = (period, interval)
+
+        if key not in self._resampled:
+            timeframes = [tf for tf in self.timeframes if can_resample(self.base_interval, tf[1], tf[0])]
+            if key not in timeframes:
+                timeframes.append(key)
+
+            # Every timeframe is built at once, so the fields of all scanners are needed
+            required_fields = list(SNAPSHOT_FIELDS)
+            memos = {tf: self._memo(*tf) for tf in timeframes} if self.rescore else None
+
+            if self.from_cache:
+                frames = OHLCVCache(settings.CACHE_DIR).load_window(
+                    self.tickers, self.base_interval, longest_period(p for p, _ in timeframes)
+                )
+                self.logger.info(f"Loaded cached {self.base_interval} bars for {len(frames)}/{len(self.tickers)} stocks")
+                self._resampled = compute_timeframe_snapshots(frames, self.base_interval, timeframes, required_fields, memos)
+            else:
+                results = self._run_shards(_scan_shard_timeframes, self.base_interval, timeframes, required_fields, memo=memos)
+                shards = [result for result, _ in results]
+                if memos is not None:
+                    for _, shard_memos in results:
+                        for tf, shard_memo in shard_memos.items():
+                            memos[tf].merge(shard_memo)
+                self._resampled = {
+                    tf: (
+                        [ticker for shard in shards for ticker in shard[tf][0]],
+                        np.concatenate([shard[tf][1] for shard in shards]) if shards else np.empty(0, dtype=SNAPSHOT_DTYPE)
+                    )
+                    for tf in timeframes
+                }
+
+            for tf in timeframes:
+                self._save_memo(*tf)
+
+        # Each timeframe is handed out once; scanning it again refetches
+        return self._resampled.pop(key)
+
+    def _memo(self, period: str, interval: str) -> Optional[SnapshotMemo]:
+        """The timeframe's memo, loaded from settings.RESCORE_DIR on first use (None when rescoring is off)"""
+        if not self.rescore:
+            return None
+
+        key = (period, interval)
+        if key not in self._memos:
+            self._memos[key] = SnapshotMemo.load(self._memo_path(period, interval))
+            self._memos[key].retain(self.tickers)
+        return self._memos[key]
+
+    def _memo_path(self, period: str, interval: str) -> str:
+        return os.path.join(settings.RESCORE_DIR, f"{period}_{interval}.npz")
+
+    def _save_memo(self, period: str, interval: str):
+        memo = self._memos.get((period, interval))
+        if memo is None:
+            return
+
+        try:
+            memo.save(self._memo_path(period, interval))
+        except OSError as e:
+            self.logger.warning(f"Could not save rescoring state for {period}/{interval}: {str(e)}")
+
+    def _run_shards(self, worker, *args, memo=None) -> List[tuple]:
+        """
+        Run a shard worker over the universe (in a process pool when there
+        are several shards) and merge the workers' metrics
+
+        Args:
+            worker: Shard worker function
+            memo: SnapshotMemo (or {timeframe: SnapshotMemo}) split into one
+                  part per shard and passed to the worker
+
+        Returns:
+            Each shard's result without the trailing metrics state, in shard order
+        """
+        shards = self.shards()
+        if not shards:
+            return []
+
+        workers = min(self.workers, len(shards))
+
+        # The upstream rate limit and burst are shared between worker processes
+        rate_limit = settings.FETCH_RATE_LIMIT / workers if settings.FETCH_RATE_LIMIT else None
+        rate_burst = settings.FETCH_RATE_BURST / workers
+
+        def shard_memo(shard):
+            if isinstance(memo, dict):
+                return {tf: tf_memo.subset(shard) for tf, tf_memo in memo.items()}
+            return memo.subset(shard) if memo is not None else None
+
+        if workers <= 1:
+            results = [worker(shard, *args, rate_limit, rate_burst, memo=shard_memo(shard)) for shard in shards]
+        else:
+            self.logger.info(f"Scanning {len(self.tickers)} stocks in {len(shards)} shards on {workers} processes")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(worker, shard, *args, rate_limit, rate_burst, metrics.enabled, memo=shard_memo(shard))
+                    for shard in shards
+                ]
+                results = [future.result() for future in futures]
+
+        for result in results:
+            metrics.merge(result[-1])
+
+        return [result[:-1] for result in results]
+
+    def scan(self, scanner, period: str, interval: str) -> List:
+        """
+        Global top-N picks for one scanner
+
+        Args:
+            scanner: SwingScanner or IntradayScanner instance
+            period: Data period
+            interval: Data interval
+
+        Returns:
+            Scanner picks ranked across all shards
+        """
+        tickers, records = self.snapshots(period, interval, scanner.REQUIRED_FIELDS)
+        picks = scanner.scan_columns(tickers, records)
+
+        memo = self._memo(period, interval)
+        if memo is not None:
+            name = type(scanner).__name__
+            qualified = scanner.qualifying(tickers, records)
+            self.changes[name] = diff_picks(memo.picks.get(name), picks, memo.qualified.get(name), qualified)
+            memo.picks[name] = [(pick['ticker'], pick['status']) for pick in picks]
+            memo.qualified[name] = qualified
+            self._save_memo(period, interval)
+
+        return picks
+
+    def scan_strategies(self, strategies, period: str, interval: str) -> Dict[str, List]:
+        """
+        Global top-N picks of several strategies from one shared snapshot
+
+        Args:
+            strategies: StrategySet (e.g. src.scanners.rules.registered())
+            period: Data period
+            interval: Data interval
+
+        Returns:
+            Dictionary {strategy name: picks ranked across all shards}
+        """
+        tickers, records = self.snapshots(period, interval, strategies.fields)
+        return strategies.scan_columns(tickers, records)
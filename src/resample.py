@@ -0,0 +1,154 @@
+"""Session-aligned OHLCV resampling: coarser timeframes from one fine-grained download"""
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional
+import config.settings as settings
+from src.data_cache import interval_to_timedelta, period_to_timedelta
+from src.indicator_panel import MIN_BARS
+from src.utils.metrics import metrics
+
+_DAY_NS = 24 * 3600 * 10**9
+
+
+def _session_offsets():
+    """Session open and close as nanoseconds after local midnight"""
+    open_h, open_m = map(int, settings.MARKET_OPEN.split(':'))
+    close_h, close_m = map(int, settings.MARKET_CLOSE.split(':'))
+    return (open_h * 60 + open_m) * 60 * 10**9, (close_h * 60 + close_m) * 60 * 10**9
+
+
+def _sessions(period: Optional[str]) -> float:
+    """Approximate trading sessions in a period (inf for 'max')"""
+    window = period_to_timedelta(period) if period else None
+    return math.inf if window is None else window.days * 5 // 7
+
+
+def can_resample(base_interval: str, interval: str, period: Optional[str] = None) -> bool:
+    """
+    Whether bars of `interval` can be built from `base_interval` bars
+
+    The target has to be at least as long as the base and a whole number of
+    base bars. Daily bars are built from intraday ones only when `period`,
+    capped at the base's upstream history (settings.RESAMPLE_BASE_HISTORY),
+    holds the MIN_BARS sessions the daily indicators need; otherwise they
+    have to be fetched directly.
+    """
+    base, target = interval_to_timedelta(base_interval), interval_to_timedelta(interval)
+    if target >= pd.Timedelta(days=1):
+        if interval != "1d" or base > target:
+            return False
+        return base == target or min(_sessions(period), _sessions(settings.RESAMPLE_BASE_HISTORY)) >= MIN_BARS
+    return target >= base and target % base == pd.Timedelta(0)
+
+
+def longest_period(periods: Iterable[str]) -> str:
+    """The period covering all the others ('max' wins)"""
+    periods = list(periods)
+    if "max" in periods:
+        return "max"
+    return max(periods, key=period_to_timedelta)
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate fine bars into `interval` bars aligned to the NSE session
+
+    Intraday bins start at MARKET_OPEN (09:15, 10:15, ... for 1h) and the
+    last bin of the day is cut short at MARKET_CLOSE, which is how the
+    exchange's own intraday bars are laid out. Daily bars are one per
+    session date, stamped at midnight without a timezone like downloaded
+    daily bars. Bars outside the session and rows without a close are
+    dropped.
+
+    Args:
+        df: OHLCV frame (DatetimeIndex, tz-aware or in exchange time)
+        interval: Target interval ('15m', '1h', '1d', ...)
+
+    Returns:
+        Frame with the same columns and dtypes (Open first, High max,
+        Low min, Close/Adj Close last, Volume summed)
+    """
+    df = df[df['Close'].notna()]
+
+    tz = df.index.tz
+    local = df.index.tz_convert(settings.MARKET_TIMEZONE).tz_localize(None) if tz is not None else df.index
+    stamps = local.as_unit('ns').asi8
+
+    session_open, session_close = _session_offsets()
+    days = stamps - stamps % _DAY_NS
+    offsets = stamps - days - session_open
+
+    in_session = (offsets >= 0) & (offsets < session_close - session_open)
+    days, offsets = days[in_session], offsets[in_session]
+
+    daily = interval_to_timedelta(interval) >= pd.Timedelta(days=1)
+    if daily:
+        keys = days
+    else:
+        bar = pd.Timedelta(interval_to_timedelta(interval)).value
+        keys = days + session_open + offsets // bar * bar
+
+    if len(keys) == 0:
+        return df.iloc[:0]
+
+    starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+    ends = np.concatenate([starts[1:], [len(keys)]]) - 1
+
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy(dtype=np.float64)[in_session]
+        if col == 'Open':
+            result = values[starts]
+        elif col == 'High':
+            result = np.fmax.reduceat(values, starts)
+        elif col == 'Low':
+            result = np.fmin.reduceat(values, starts)
+        elif col == 'Volume':
+            result = np.add.reduceat(np.nan_to_num(values), starts)
+        else:
+            result = values[ends]
+        # Keep compact (float32 / int64) frames compact
+        columns[col] = result.astype(df[col].dtype, copy=False)
+
+    index = pd.DatetimeIndex(keys[starts].astype('datetime64[ns]'))
+    if not daily and tz is not None:
+        index = index.tz_localize(settings.MARKET_TIMEZONE).tz_convert(tz)
+
+    return pd.DataFrame(columns, index=index)
+
+
+def resample_frames(
+    frames: Dict[str, pd.DataFrame],
+    interval: str,
+    period: Optional[str] = None,
+    base_interval: Optional[str] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Resample every ticker and keep the last `period` of bars
+
+    Args:
+        frames: Dictionary {ticker: fine-grained OHLCV dataframe}
+        interval: Target interval
+        period: Window kept, measured back from each ticker's last bar (None = all)
+        base_interval: Interval of `frames`; when it equals `interval` the
+                       frames are only windowed
+
+    Returns:
+        Dictionary {ticker: resampled dataframe} (tickers without bars left out)
+    """
+    window = period_to_timedelta(period) if period else None
+    results = {}
+
+    with metrics.span("resample", interval=interval):
+        for ticker, df in frames.items():
+            if interval != base_interval:
+                df = resample_ohlcv(df, interval)
+            if df.empty:
+                continue
+            if window is not None and df.index[0] < df.index[-1] - window:
+                df = df[df.index >= df.index[-1] - window]
+            results[ticker] = df
+
+    return results
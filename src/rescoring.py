@@ -0,0 +1,249 @@
+"""Change-driven rescoring: per-ticker bar fingerprints, reused snapshots and pick diffs"""
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.snapshot import SNAPSHOT_DTYPE, SNAPSHOT_FIELDS
+from src.utils.logger import Logger
+
+DIGEST_SIZE = 16
+
+
+def fingerprint(df: pd.DataFrame) -> bytes:
+    """
+    Digest of every bar a snapshot is computed from
+
+    The whole window is hashed, not only the last bar: EMA/RSI/ATR are
+    seeded at the first bar, so a window that slid forward (or a revised
+    bar) changes the indicators as surely as a new candle does.
+
+    The frame is hashed as one column-major array, which for single-dtype
+    frames is pandas' own block with no copy; going column by column costs
+    ~25x more in pandas indexing than in hashing.
+    """
+    columns = np.ascontiguousarray(df.to_numpy().T)
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    digest.update(f"{df.index.dtype}|{'|'.join(map(str, df.columns))}|{columns.dtype.str}".encode())
+    digest.update(np.ascontiguousarray(df.index.asi8))
+    digest.update(columns)
+    return digest.digest()
+
+
+class SnapshotMemo:
+    """
+    Last snapshot of every ticker on one timeframe, keyed by its bar fingerprint
+
+    compute_snapshots() recomputes only tickers whose fingerprint changed
+    and takes the rest from here. Tickers with too little history are
+    remembered too (without a record), so they are not retried until their
+    bars change. `config` identifies the settings the snapshots were
+    computed with; a memo built under other settings starts empty. The
+    memo also keeps the previous scan's qualifying stocks and picks for
+    diff_picks().
+    """
+
+    def __init__(self, config: str = "", fields: Iterable[str] = SNAPSHOT_FIELDS):
+        """
+        Args:
+            config: Indicator settings the snapshots depend on
+            fields: Snapshot fields the stored records have filled in
+        """
+        self.config = config
+        self.fields = tuple(fields)
+        # ticker -> (fingerprint, snapshot record or None)
+        self.entries: Dict[str, Tuple[bytes, Optional[np.void]]] = {}
+        # scanner -> (ticker, status) of its previous picks, best first
+        self.picks: Dict[str, List[Tuple[str, str]]] = {}
+        # scanner -> {ticker: status} of every stock that qualified in its previous scan
+        self.qualified: Dict[str, Dict[str, str]] = {}
+
+    def prepare(self, config: str, fields: Iterable[str]):
+        """Drop everything if the snapshots were computed under other settings or lack fields"""
+        fields = tuple(fields)
+        if config != self.config or not set(fields) <= set(self.fields):
+            self.entries.clear()
+            self.config = config
+            self.fields = fields
+
+    def changed(self, frames: Dict[str, pd.DataFrame]) -> Tuple[List[str], Dict[str, bytes]]:
+        """
+        Tickers whose bars differ from the last computed ones
+
+        Returns:
+            Tuple of (changed tickers, {ticker: fingerprint} for all frames)
+        """
+        digests = {ticker: fingerprint(df) for ticker, df in frames.items()}
+        changed = [
+            ticker for ticker, digest in digests.items()
+            if ticker not in self.entries or self.entries[ticker][0] != digest
+        ]
+        return changed, digests
+
+    def update(self, digests: Dict[str, bytes], changed: List[str], tickers: List[str], records: np.ndarray):
+        """Store freshly computed snapshots for the changed tickers"""
+        computed = dict(zip(tickers, records))
+        for ticker in changed:
+            record = computed.get(ticker)
+            self.entries[ticker] = (digests[ticker], record.copy() if record is not None else None)
+
+    def snapshots(self, tickers: Iterable[str]) -> Tuple[List[str], np.ndarray]:
+        """Stored snapshots for the tickers that have one, in the given order"""
+        kept = [ticker for ticker in tickers if ticker in self.entries and self.entries[ticker][1] is not None]
+
+        records = np.empty(len(kept), dtype=SNAPSHOT_DTYPE)
+        for i, ticker in enumerate(kept):
+            records[i] = self.entries[ticker][1]
+
+        return kept, records
+
+    def subset(self, tickers: Iterable[str]) -> 'SnapshotMemo':
+        """Memo holding only these tickers (what one shard worker needs)"""
+        memo = SnapshotMemo(self.config, self.fields)
+        memo.entries = {ticker: self.entries[ticker] for ticker in tickers if ticker in self.entries}
+        return memo
+
+    def merge(self, other: 'SnapshotMemo'):
+        """Take over a shard worker's updated entries"""
+        if other.config != self.config or other.fields != self.fields:
+            self.entries.clear()
+            self.config, self.fields = other.config, other.fields
+        self.entries.update(other.entries)
+
+    def retain(self, tickers: Iterable[str]):
+        """Forget tickers no longer scanned"""
+        tickers = set(tickers)
+        self.entries = {ticker: entry for ticker, entry in self.entries.items() if ticker in tickers}
+
+    def save(self, path: str):
+        """Write the memo to an NPZ file"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        tickers = list(self.entries)
+        records = np.zeros(len(tickers), dtype=SNAPSHOT_DTYPE)
+        has_record = np.zeros(len(tickers), dtype=bool)
+        for i, ticker in enumerate(tickers):
+            record = self.entries[ticker][1]
+            if record is not None:
+                records[i] = record
+                has_record[i] = True
+
+        picks = [(scanner, ticker, status) for scanner, entries in self.picks.items() for ticker, status in entries]
+        qualified = [
+            (scanner, ticker, status) for scanner, entries in self.qualified.items() for ticker, status in entries.items()
+        ]
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                config=np.array(self.config),
+                fields=np.array(self.fields),
+                tickers=np.array(tickers, dtype=str),
+                digests=np.array([self.entries[t][0] for t in tickers], dtype=f"S{DIGEST_SIZE}"),
+                records=records,
+                has_record=has_record,
+                scanners=np.array(list(self.picks), dtype=str),
+                picks=np.array(picks, dtype=str).reshape(-1, 3),
+                qualified_scanners=np.array(list(self.qualified), dtype=str),
+                qualified=np.array(qualified, dtype=str).reshape(-1, 3),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SnapshotMemo':
+        """Read a memo written by save() (an empty memo if missing or unreadable)"""
+        if not os.path.exists(path):
+            return cls()
+
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                memo = cls(str(archive['config']), [str(field) for field in archive['fields']])
+                records, has_record = archive['records'], archive['has_record']
+                memo.entries = {
+                    str(ticker): (bytes(digest), records[i].copy() if has_record[i] else None)
+                    for i, (ticker, digest) in enumerate(zip(archive['tickers'], archive['digests']))
+                }
+                # A scanner that picked nothing still has a previous scan
+                memo.picks = {str(scanner): [] for scanner in archive['scanners']}
+                for scanner, ticker, status in archive['picks']:
+                    memo.picks.setdefault(str(scanner), []).append((str(ticker), str(status)))
+                # Memos saved before qualification was kept have none (diffed as a first scan)
+                if 'qualified' in archive.files:
+                    memo.qualified = {str(scanner): {} for scanner in archive['qualified_scanners']}
+                    for scanner, ticker, status in archive['qualified']:
+                        memo.qualified.setdefault(str(scanner), {})[str(ticker)] = str(status)
+            return memo
+
+        except Exception as e:
+            Logger.warning(f"Ignoring unreadable rescoring state {path}: {str(e)}")
+            return cls()
+
+
+def diff_picks(
+    previous: Optional[List[Tuple[str, str]]],
+    picks: List[Dict],
+    previous_qualified: Optional[Dict[str, str]],
+    qualified: Dict[str, str]
+) -> Dict[str, List]:
+    """
+    What changed between two consecutive scans
+
+    Qualification and status are compared over every qualifying stock, so a
+    stock pushed out of the top N by higher scores elsewhere has not
+    "dropped out"; movement in and out of the top N is reported separately.
+
+    Args:
+        previous: (ticker, status) of the previous scan's picks
+        picks: Current scanner picks
+        previous_qualified: {ticker: status} of every stock that qualified
+                            in the previous scan (None = no previous scan)
+        qualified: {ticker: status} of every stock that qualifies now
+
+    Returns:
+        Dictionary with
+            'qualified': tickers that qualify now but did not before
+            'dropped': tickers that qualified before but no longer do
+            'status_changed': (ticker, old status, new status) for tickers qualifying in both
+            'ready': picks that are READY now and were not READY before
+            'entered_top': tickers picked now but not before
+            'left_top': tickers picked before but not now
+            'first_scan': True when there was nothing to compare with
+    """
+    before = previous_qualified or {}
+    top_before = [ticker for ticker, _ in previous or []]
+    top_now = [pick['ticker'] for pick in picks]
+
+    return {
+        'qualified': [ticker for ticker in qualified if ticker not in before],
+        'dropped': [ticker for ticker in before if ticker not in qualified],
+        'status_changed': [(ticker, before[ticker], status) for ticker, status in qualified.items()
+                           if ticker in before and before[ticker] != status],
+        'ready': [pick['ticker'] for pick in picks if pick['status'] == "READY" and before.get(pick['ticker']) != "READY"],
+        'entered_top': [ticker for ticker in top_now if ticker not in top_before],
+        'left_top': [ticker for ticker in top_before if ticker not in top_now],
+        'first_scan': previous_qualified is None,
+    }
+
+
+def format_diff(diff: Dict[str, List]) -> str:
+    """One-line summary of diff_picks() output"""
+    if diff['first_scan']:
+        return "No previous scan to compare with"
+
+    parts = []
+    if diff['ready']:
+        parts.append(f"new READY: {', '.join(diff['ready'])}")
+    if diff['entered_top']:
+        parts.append(f"entered top picks: {', '.join(diff['entered_top'])}")
+    if diff['left_top']:
+        parts.append(f"left top picks: {', '.join(diff['left_top'])}")
+    if diff['qualified']:
+        parts.append(f"newly qualifying: {', '.join(diff['qualified'])}")
+    if diff['dropped']:
+        parts.append(f"dropped out: {', '.join(diff['dropped'])}")
+    for ticker, old, new in diff['status_changed']:
+        parts.append(f"{ticker}: {old} -> {new}")
+
+    return "; ".join(parts) if parts else "No changes since the previous scan"
@@ -0,0 +1,87 @@
+"""Helpers for scanning struct-of-arrays indicator snapshots"""
+
+import numpy as np
+from typing import Dict, List, Mapping
+from src.snapshot import IndicatorSnapshot
+
+# Raw score distance beyond which rounding cannot change a ranking (2 x 0.005 plus slack)
+ROUNDING_MARGIN = 0.02
+
+
+def top_n_indices(scores: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n highest scores among masked entries
+
+    Uses argpartition to avoid sorting everything, then orders the survivors
+    by score (descending) and original position, which is the order a stable
+    sort of the qualified list produces.
+
+    Args:
+        scores: 1-D scores
+        mask: 1-D boolean mask of qualified entries
+        n: Number of entries to keep
+
+    Returns:
+        Array of selected indices, best first
+    """
+    candidates = np.flatnonzero(mask)
+
+    if len(candidates) > n > 0:
+        candidate_scores = scores[candidates]
+        kth = np.argpartition(-candidate_scores, n - 1)[n - 1]
+        # Keep every tie with the n-th score so ordering can match a stable
+        # sort (a NaN n-th score means fewer than n real scores: keep all)
+        if not np.isnan(candidate_scores[kth]):
+            candidates = candidates[candidate_scores >= candidate_scores[kth]]
+
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:n]
+
+
+def round_scores(raw_scores: np.ndarray) -> np.ndarray:
+    """Round like the dict path does (Python round, not np.round)"""
+    return np.array([round(score, 2) for score in raw_scores.tolist()], dtype=np.float64)
+
+
+def round_top_scores(raw_scores: np.ndarray, mask: np.ndarray, n: int) -> np.ndarray:
+    """
+    Rounded scores of the masked entries that can still reach the top n
+
+    Rounding to 2 places is monotonic and moves a score by at most 0.005,
+    so an entry more than ROUNDING_MARGIN below the n-th best raw score
+    can neither beat nor tie it once rounded; only the rest are rounded
+    (in Python, see round_scores). NaN scores are kept, as they rank last.
+
+    Returns:
+        1-D scores with -inf for entries not masked or out of reach
+    """
+    scores = np.full(len(mask), -np.inf)
+    candidates = np.flatnonzero(mask)
+
+    raw = raw_scores[candidates]
+    finite = ~np.isnan(raw)
+    if np.count_nonzero(finite) > n > 0:
+        kth = np.partition(raw[finite], -n)[-n]
+        candidates = candidates[~finite | (raw >= kth - ROUNDING_MARGIN)]
+
+    scores[candidates] = round_scores(raw_scores[candidates])
+    return scores
+
+
+def build_picks(
+    tickers: List[str],
+    columns: Mapping[str, np.ndarray],
+    indices: np.ndarray,
+    scores: np.ndarray,
+    statuses: List[str]
+) -> List[Dict]:
+    """Assemble pick dicts in the same shape as the dict-based scan"""
+    return [
+        {
+            'ticker': tickers[j],
+            'score': float(scores[j]),
+            'indicators': IndicatorSnapshot.from_columns(columns, j),
+            'status': status
+        }
+        for j, status in zip(indices, statuses)
+    ]
@@ -1,14 +1,30 @@
 """Intraday trading scanner (15-minute timeframe)"""
 
-from typing import Dict, List
+import numpy as np
+from typing import Dict, List, Mapping, Optional
 import config.settings as settings
+from src.scanners import rules
+from src.snapshot import to_array
+from src.utils.metrics import metrics
+
+STRATEGY = rules.REGISTRY['intraday']
+RULES = rules.StrategySet([STRATEGY])
 
 class IntradayScanner:
-    """Identifies intraday trading opportunities"""
+    """
+    Identifies intraday trading opportunities
+    
+    The rules, score and status are config.strategies['intraday'],
+    evaluated by the rule engine in src.scanners.rules.
+    """
+    
+    # Snapshot fields read by the rules, scores and status
+    REQUIRED_FIELDS = list(STRATEGY.fields)
     
     def __init__(self):
         self.qualified_stocks = []
     
+    @metrics.timed("scan", scanner="intraday", path="dict")
     def scan(self, stock_data: Dict) -> List[Dict]:
         """
         Scan stocks for intraday setups
@@ -16,80 +32,99 @@ class IntradayScanner:
         Args:
             stock_data: Dict of {ticker: indicator_values}
         
+        Every qualifying stock is kept in self.qualified_stocks, best first.
+        
         Returns:
-            List of qualified stocks with scores
+            Top N qualified stocks with scores
         """
-        self.qualified_stocks = []
-        
-        for ticker, indicators in stock_data.items():
-            if indicators is None:
-                continue
-            
-            if self._qualifies_for_intraday(indicators):
-                score = self._calculate_intraday_score(indicators)
-                
-                self.qualified_stocks.append({
-                    'ticker': ticker,
-                    'score': score,
-                    'indicators': indicators,
-                    'status': self._get_status(indicators)
-                })
-        
-        # Sort by score
-        self.qualified_stocks.sort(key=lambda x: x['score'], reverse=True)
-        
-        return self.qualified_stocks[:settings.TOP_N_STOCKS]
+        tickers = [ticker for ticker, indicators in stock_data.items() if indicators is not None]
+        
+        records = to_array(stock_data[ticker] for ticker in tickers)
+        (indices, scores, statuses), = RULES.select(records, top_n=len(tickers))
+        
+        self.qualified_stocks = [
+            {
+                'ticker': tickers[j],
+                'score': float(scores[j]),
+                'indicators': stock_data[tickers[j]],
+                'status': status
+            }
+            for j, status in zip(indices, statuses)
+        ]
+        
+        return self.qualified_stocks[:STRATEGY.top_n or settings.TOP_N_STOCKS]
     
-    def _qualifies_for_intraday(self, ind: Dict) -> bool:
-        """Check if stock meets intraday criteria"""
-        
-        # Must have VWAP
-        if ind['vwap'] is None:
-            return False
-        
-        # Price above VWAP (bullish bias)
-        if ind['close'] <= ind['vwap']:
-            return False
+    @metrics.timed("scan", scanner="intraday", path="columnar")
+    def scan_columns(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        Columnar equivalent of scan() for struct-of-arrays snapshots
         
-        # EMA20 > EMA50 (momentum)
-        if ind['ema20'] <= ind['ema50']:
-            return False
+        Args:
+            tickers: Ticker for each array position
+            columns: Mapping {indicator field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
         
-        # RSI not extreme
-        if not (settings.INTRADAY_RSI_MIN <= ind['rsi'] <= settings.INTRADAY_RSI_MAX):
-            return False
+        Returns:
+            Same picks, in the same order, as scan() on the per-ticker dicts
+        """
+        self.qualified_stocks = RULES.scan_columns(tickers, columns, valid)[STRATEGY.name]
         
-        return True
+        return self.qualified_stocks
     
-    def _calculate_intraday_score(self, ind: Dict) -> float:
-        """Calculate intraday score (0-100)"""
+    def qualifying(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, str]:
+        """
+        Every stock that qualifies, with its status (scan_columns() keeps the top N)
         
-        score = 0
+        Args:
+            tickers: Ticker for each array position
+            columns: Mapping {indicator field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
         
-        # Distance from VWAP (30 points)
-        vwap_distance = ((ind['close'] - ind['vwap']) / ind['vwap']) * 100
-        score += min(vwap_distance * 30, 30)
+        Returns:
+            Dictionary {ticker: status}
+        """
+        return RULES.qualifying(tickers, columns, valid)[STRATEGY.name]
+    
+    @staticmethod
+    def qualify_mask(
+        cols: Mapping[str, np.ndarray],
+        rsi_min=None,
+        rsi_max=None,
+        volume_spike=None
+    ) -> np.ndarray:
+        """
+        Vectorized qualifying rules of config.strategies['intraday'] (arrays of any shape)
         
-        # Volume spike (40 points)
-        volume_score = min((ind['volume_ratio'] - 1) * 20, 40)
-        score += volume_score
+        RSI thresholds default to config.settings; passing arrays shaped to
+        broadcast against the columns evaluates many threshold sets at once.
+        volume_spike is an optional extra volume_ratio floor used by
+        parameter sweeps; the live rules do not apply one.
+        """
+        mask, = RULES.evaluate(
+            cols, ('mask',),
+            INTRADAY_RSI_MIN=rsi_min,
+            INTRADAY_RSI_MAX=rsi_max
+        )[STRATEGY.name]
         
-        # RSI momentum (30 points)
-        rsi_score = (ind['rsi'] - 50) * 0.6
-        score += max(rsi_score, 0)
+        if volume_spike is not None:
+            mask = mask & (cols['volume_ratio'] >= volume_spike)
         
-        return round(score, 2)
+        return mask
     
-    def _get_status(self, ind: Dict) -> str:
-        """Determine entry status"""
-        
-        # Volume dried up
-        if ind['volume_ratio'] < 0.8:
-            return "WAIT (Low volume)"
+    @staticmethod
+    def raw_score_array(cols: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Vectorized score terms of config.strategies['intraday'], before rounding"""
         
-        # Too far from VWAP
-        vwap_dist = abs(ind['close'] - ind['vwap']) / ind['vwap']
-        if vwap_dist > 0.02:
-            return "WAIT (Far from VWAP)"
+        score, = RULES.evaluate(cols, ('score',))[STRATEGY.name]
         
-        return "READY"
\ No newline at end of file
+        return score
@@ -0,0 +1,375 @@
+"""Declarative scan strategies compiled to single-pass NumPy evaluation"""
+
+import ast
+import numpy as np
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import config.settings as settings
+from config.strategies import STRATEGIES
+from src.scanners import columnar
+from src.snapshot import SNAPSHOT_FIELDS
+
+# Rule function name -> (NumPy function, number of arguments)
+_FUNCTIONS = {
+    'min': ('np.minimum', 2),
+    'max': ('np.maximum', 2),
+    'abs': ('np.abs', 1),
+    'isnan': ('np.isnan', 1),
+}
+# What StrategySet.evaluate can compute for each strategy
+PARTS = ('mask', 'score', 'status')
+_OPERATORS = {
+    ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/',
+    ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>=', ast.Eq: '==', ast.NotEq: '!=',
+}
+
+
+def _names(node: ast.expr) -> set:
+    """Fields and settings an expression reads (function names excluded)"""
+    functions = {id(call.func) for call in ast.walk(node) if isinstance(call, ast.Call)}
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name) and id(child) not in functions}
+
+
+def parse(text: str) -> ast.expr:
+    """
+    Parse one rule expression (see config.strategies for the syntax)
+
+    Raises:
+        ValueError: On syntax outside the rule language, unknown fields or
+                    settings, or an expression that reads no snapshot field
+    """
+    try:
+        node = ast.parse(text.strip(), mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule {text!r}: {e.msg}") from None
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            if not isinstance(child.func, ast.Name) or child.func.id not in _FUNCTIONS:
+                raise ValueError(f"Unknown function in rule {text!r} (use {', '.join(_FUNCTIONS)})")
+            if len(child.args) != _FUNCTIONS[child.func.id][1] or child.keywords:
+                raise ValueError(f"{child.func.id}() takes {_FUNCTIONS[child.func.id][1]} argument(s) in rule {text!r}")
+        elif isinstance(child, ast.Constant):
+            if isinstance(child.value, bool) or not isinstance(child.value, (int, float)):
+                raise ValueError(f"Only numbers are allowed as constants in rule {text!r}")
+        elif not isinstance(child, (ast.Name, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.Load,
+                                    ast.And, ast.Or, ast.Not, ast.USub, ast.UAdd)) \
+                and type(child) not in _OPERATORS:
+            raise ValueError(f"Unsupported syntax ({type(child).__name__}) in rule {text!r}")
+
+    names = _names(node)
+    for name in names:
+        if name not in SNAPSHOT_FIELDS and not (name.isupper() and hasattr(settings, name)):
+            raise ValueError(f"Unknown field or setting {name!r} in rule {text!r}")
+        value = getattr(settings, name, None)
+        if name not in SNAPSHOT_FIELDS and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise ValueError(f"Setting {name!r} in rule {text!r} is not a number")
+    if not names & set(SNAPSHOT_FIELDS):
+        raise ValueError(f"Rule {text!r} reads no snapshot field")
+
+    return node
+
+
+class Strategy:
+    """
+    One scan strategy: qualifying rules, score terms and entry status labels
+
+    Expressions are parsed and checked when the strategy is built; see
+    config.strategies for the rule language.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rules: Sequence[str],
+        score: Sequence[str],
+        status: Sequence[Tuple[str, str]] = (),
+        default_status: str = "READY",
+        top_n: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Strategy name
+            rules: Expressions that must all hold for a stock to qualify
+            score: Expressions summed, in order, into the score
+            status: (condition, label) pairs; the first condition that holds
+                    gives the pick's status
+            default_status: Status when no condition holds
+            top_n: Picks to keep (defaults to settings.TOP_N_STOCKS)
+        """
+        if not rules or not score:
+            raise ValueError(f"Strategy {name!r} needs at least one rule and one score term")
+
+        self.name = name
+        self.rules = [parse(text) for text in rules]
+        self.score = [parse(text) for text in score]
+        self.status = [(parse(text), label) for text, label in status]
+        self.default_status = default_status
+        self.top_n = top_n
+
+        names = set().union(*(_names(expr) for expr in self.expressions()))
+        # Snapshot fields the strategy reads, and settings it takes thresholds from
+        self.fields = tuple(field for field in SNAPSHOT_FIELDS if field in names)
+        self.parameters = tuple(sorted(names - set(SNAPSHOT_FIELDS)))
+
+    def expressions(self) -> List[ast.expr]:
+        return self.rules + self.score + [condition for condition, _ in self.status]
+
+    def statuses(self, conditions: Sequence[np.ndarray], indices: Iterable[int]) -> List[str]:
+        """Status label of each selected entry, from its evaluated status conditions"""
+        labels = []
+        for j in indices:
+            labels.append(next(
+                (label for condition, (_, label) in zip(conditions, self.status) if condition[j]),
+                self.default_status
+            ))
+        return labels
+
+    def __repr__(self) -> str:
+        return f"Strategy({self.name!r}, fields={self.fields}, parameters={self.parameters})"
+
+
+class _Compiler:
+    """
+    Emits NumPy statements for rule expressions, one temporary per distinct
+    subexpression
+
+    Each statement is keyed by its own source text over earlier temporaries,
+    so an expression shared by several strategies (a field, an EMA gap, a
+    comparison with the same threshold) is computed once.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.temps: Dict[str, str] = {}
+
+    def emit(self, code: str) -> str:
+        name = self.temps.get(code)
+        if name is None:
+            name = f"t{len(self.temps)}"
+            self.temps[code] = name
+            self.lines.append(f"    {name} = {code}")
+        return name
+
+    def fold(self, function: str, names: List[str]) -> str:
+        result = names[0]
+        for name in names[1:]:
+            result = self.emit(function.format(result, name))
+        return result
+
+    def expr(self, node: ast.expr) -> str:
+        if isinstance(node, ast.Constant):
+            return repr(node.value)
+
+        if isinstance(node, ast.Name):
+            source = 'c' if node.id in SNAPSHOT_FIELDS else 'p'
+            return self.emit(f"{source}[{node.id!r}]")
+
+        if isinstance(node, ast.BinOp):
+            return self.emit(f"{self.expr(node.left)} {_OPERATORS[type(node.op)]} {self.expr(node.right)}")
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self.expr(node.operand)
+            if isinstance(node.op, ast.Not):
+                return self.emit(f"np.logical_not({operand})")
+            return self.emit(f"-{operand}") if isinstance(node.op, ast.USub) else operand
+
+        if isinstance(node, ast.BoolOp):
+            function = "np.logical_and({}, {})" if isinstance(node.op, ast.And) else "np.logical_or({}, {})"
+            return self.fold(function, [self.expr(value) for value in node.values])
+
+        if isinstance(node, ast.Compare):
+            # a < b < c is (a < b) and (b < c), with b evaluated once
+            operands = [self.expr(node.left)] + [self.expr(value) for value in node.comparators]
+            pairs = [
+                self.emit(f"{left} {_OPERATORS[type(op)]} {right}")
+                for left, op, right in zip(operands, node.ops, operands[1:])
+            ]
+            return self.fold("np.logical_and({}, {})", pairs)
+
+        if isinstance(node, ast.Call):
+            function = _FUNCTIONS[node.func.id][0]
+            return self.emit(f"{function}({', '.join(self.expr(arg) for arg in node.args)})")
+
+        raise ValueError(f"Unsupported syntax: {ast.unparse(node)}")
+
+
+class StrategySet:
+    """
+    Several strategies compiled into one NumPy function
+
+    The function reads every snapshot field once, computes every distinct
+    subexpression once, and returns each strategy's qualifying mask, raw
+    score and status conditions over all stocks. Strategies on the same
+    timeframe therefore cost one pass over the snapshot plus their own
+    ranking, not one scan each.
+    """
+
+    def __init__(self, strategies: Iterable[Strategy]):
+        """
+        Args:
+            strategies: Strategies to evaluate together (names must be unique)
+        """
+        self.strategies = list(strategies)
+        self.names = [strategy.name for strategy in self.strategies]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"Duplicate strategy names: {self.names}")
+
+        self.fields = tuple(field for field in SNAPSHOT_FIELDS if any(field in s.fields for s in self.strategies))
+        self.parameters = tuple(sorted({name for s in self.strategies for name in s.parameters}))
+
+        self._functions: Dict[Tuple[str, ...], object] = {}
+        # Kept for inspection: print(StrategySet(...).source)
+        self.source = self._compile(PARTS)
+
+    def _compile(self, parts: Tuple[str, ...]) -> str:
+        """Build (once per parts tuple) the function returning those parts of every strategy"""
+        compiler = _Compiler()
+        outputs = []
+
+        for strategy in self.strategies:
+            values = []
+            if 'mask' in parts:
+                values.append(compiler.fold("np.logical_and({}, {})", [compiler.expr(rule) for rule in strategy.rules]))
+            if 'score' in parts:
+                values.append(compiler.fold("{} + {}", [compiler.expr(term) for term in strategy.score]))
+            if 'status' in parts:
+                values.append("(" + "".join(f"{compiler.expr(condition)}, " for condition, _ in strategy.status) + ")")
+            outputs.append("(" + "".join(f"{value}, " for value in values) + ")")
+
+        source = "def evaluate(c, p):\n" + "\n".join(compiler.lines) + f"\n    return [{', '.join(outputs)}]\n"
+        namespace = {'np': np}
+        exec(compile(source, f"<strategies {', '.join(self.names)}: {', '.join(parts)}>", 'exec'), namespace)
+        self._functions[parts] = namespace['evaluate']
+        return source
+
+    def evaluate(
+        self,
+        columns: Mapping[str, np.ndarray],
+        parts: Tuple[str, ...] = PARTS,
+        **overrides
+    ) -> Dict[str, tuple]:
+        """
+        Masks, raw (unrounded) scores and status conditions of every strategy
+
+        Args:
+            columns: Mapping {snapshot field: array}; arrays of any shape
+                     work (e.g. dates x tickers panels)
+            parts: Which of 'mask', 'score' and 'status' to compute
+            **overrides: Values for settings the rules read (None = the
+                         setting); arrays shaped to broadcast against the
+                         columns evaluate many threshold sets at once
+
+        Returns:
+            Dictionary {strategy name: tuple of the parts, in PARTS order};
+            'status' is a tuple of condition masks
+        """
+        parts = tuple(part for part in PARTS if part in parts)
+        if parts not in self._functions:
+            self._compile(parts)
+
+        unknown = set(overrides) - set(self.parameters)
+        if unknown:
+            raise ValueError(f"Strategies {self.names} read no setting {', '.join(sorted(unknown))}")
+
+        params = {
+            name: getattr(settings, name) if overrides.get(name) is None else overrides[name]
+            for name in self.parameters
+        }
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return dict(zip(self.names, self._functions[parts](columns, params)))
+
+    def scan_columns(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Top-N picks of every strategy from one snapshot batch
+
+        Args:
+            tickers: Ticker for each array position
+            columns: Mapping {snapshot field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
+
+        Returns:
+            Dictionary {strategy name: picks, best first}
+        """
+        return {
+            strategy.name: columnar.build_picks(tickers, columns, indices, scores, statuses)
+            for strategy, (indices, scores, statuses) in zip(self.strategies, self.select(columns, valid))
+        }
+
+    def qualifying(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Every qualifying stock of every strategy with its status, not only the top N
+
+        Returns:
+            Dictionary {strategy name: {ticker: status}}, in ticker order
+        """
+        qualifying = {}
+
+        for strategy, (mask, conditions) in zip(self.strategies, self.evaluate(columns, ('mask', 'status')).values()):
+            if valid is not None:
+                mask = mask & valid
+
+            indices = np.flatnonzero(mask)
+            qualifying[strategy.name] = dict(zip([tickers[j] for j in indices], strategy.statuses(conditions, indices)))
+
+        return qualifying
+
+    def select(
+        self,
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None,
+        top_n: Optional[int] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray, List[str]]]:
+        """
+        Each strategy's top-N positions, rounded scores and statuses
+
+        Args:
+            columns: Mapping {snapshot field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
+            top_n: Positions to keep for every strategy (None = each strategy's own)
+
+        Returns:
+            One (indices best first, rounded scores by position, status per
+            index) tuple per strategy, in strategy order
+        """
+        selections = []
+
+        for strategy, (mask, raw_scores, conditions) in zip(self.strategies, self.evaluate(columns).values()):
+            if valid is not None:
+                mask = mask & valid
+
+            n = top_n if top_n is not None else strategy.top_n or settings.TOP_N_STOCKS
+            scores = columnar.round_top_scores(raw_scores, mask, n)
+            indices = columnar.top_n_indices(scores, mask, n)
+            selections.append((indices, scores, strategy.statuses(conditions, indices)))
+
+        return selections
+
+
+# Strategy name -> strategy; config.strategies is registered on import
+REGISTRY: Dict[str, Strategy] = {}
+
+
+def register(strategy: Strategy) -> Strategy:
+    """Add (or replace) a strategy in the registry"""
+    REGISTRY[strategy.name] = strategy
+    return strategy
+
+
+def registered(names: Optional[Iterable[str]] = None) -> StrategySet:
+    """StrategySet of the named registered strategies (all by default)"""
+    return StrategySet(REGISTRY[name] for name in (REGISTRY if names is None else names))
+
+
+for _name, _spec in STRATEGIES.items():
+    register(Strategy(_name, **_spec))
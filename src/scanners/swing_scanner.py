@@ -1,14 +1,30 @@
 """Swing trading scanner (Daily timeframe)"""
 
-from typing import Dict, List
+import numpy as np
+from typing import Dict, List, Mapping, Optional
 import config.settings as settings
+from src.scanners import rules
+from src.snapshot import to_array
+from src.utils.metrics import metrics
+
+STRATEGY = rules.REGISTRY['swing']
+RULES = rules.StrategySet([STRATEGY])
 
 class SwingScanner:
-    """Identifies swing trading opportunities"""
+    """
+    Identifies swing trading opportunities
+    
+    The rules, score and status are config.strategies['swing'], evaluated
+    by the rule engine in src.scanners.rules.
+    """
+    
+    # Snapshot fields read by the rules, scores and status
+    REQUIRED_FIELDS = list(STRATEGY.fields)
     
     def __init__(self):
         self.qualified_stocks = []
     
+    @metrics.timed("scan", scanner="swing", path="dict")
     def scan(self, stock_data: Dict) -> List[Dict]:
         """
         Scan stocks for swing trading setups
@@ -16,76 +32,95 @@ class SwingScanner:
         Args:
             stock_data: Dict of {ticker: indicator_values}
         
+        Every qualifying stock is kept in self.qualified_stocks, best first.
+        
         Returns:
-            List of qualified stocks with scores
+            Top N qualified stocks with scores
         """
-        self.qualified_stocks = []
-        
-        for ticker, indicators in stock_data.items():
-            if indicators is None:
-                continue
-            
-            if self._qualifies_for_swing(indicators):
-                score = self._calculate_swing_score(indicators)
-                
-                self.qualified_stocks.append({
-                    'ticker': ticker,
-                    'score': score,
-                    'indicators': indicators,
-                    'status': self._get_status(indicators)
-                })
-        
-        # Sort by score
-        self.qualified_stocks.sort(key=lambda x: x['score'], reverse=True)
-        
-        return self.qualified_stocks[:settings.TOP_N_STOCKS]
+        tickers = [ticker for ticker, indicators in stock_data.items() if indicators is not None]
+        
+        records = to_array(stock_data[ticker] for ticker in tickers)
+        (indices, scores, statuses), = RULES.select(records, top_n=len(tickers))
+        
+        self.qualified_stocks = [
+            {
+                'ticker': tickers[j],
+                'score': float(scores[j]),
+                'indicators': stock_data[tickers[j]],
+                'status': status
+            }
+            for j, status in zip(indices, statuses)
+        ]
+        
+        return self.qualified_stocks[:STRATEGY.top_n or settings.TOP_N_STOCKS]
     
-    def _qualifies_for_swing(self, ind: Dict) -> bool:
-        """Check if stock meets swing criteria"""
-        
-        # Price > EMA20 > EMA50 (uptrend)
-        if not (ind['close'] > ind['ema20'] > ind['ema50']):
-            return False
+    @metrics.timed("scan", scanner="swing", path="columnar")
+    def scan_columns(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        Columnar equivalent of scan() for struct-of-arrays snapshots
         
-        # RSI in healthy range
-        if not (settings.SWING_RSI_MIN <= ind['rsi'] <= settings.SWING_RSI_MAX):
-            return False
+        Args:
+            tickers: Ticker for each array position
+            columns: Mapping {indicator field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
         
-        # Volume not too weak
-        if ind['volume_ratio'] < settings.SWING_MIN_VOLUME_RATIO:
-            return False
+        Returns:
+            Same picks, in the same order, as scan() on the per-ticker dicts
+        """
+        self.qualified_stocks = RULES.scan_columns(tickers, columns, valid)[STRATEGY.name]
         
-        return True
+        return self.qualified_stocks
     
-    def _calculate_swing_score(self, ind: Dict) -> float:
-        """Calculate swing trading score (0-100)"""
-        
-        score = 0
-        
-        # Trend strength (40 points)
-        ema_gap = ((ind['ema20'] - ind['ema50']) / ind['ema50']) * 100
-        score += min(ema_gap * 10, 40)
-        
-        # RSI positioning (30 points)
-        # Best around 50-60
-        rsi_score = 30 - abs(ind['rsi'] - 55) * 0.5
-        score += max(rsi_score, 0)
+    def qualifying(
+        self,
+        tickers: List[str],
+        columns: Mapping[str, np.ndarray],
+        valid: Optional[np.ndarray] = None
+    ) -> Dict[str, str]:
+        """
+        Every stock that qualifies, with its status (scan_columns() keeps the top N)
         
-        # Volume (30 points)
-        volume_score = min(ind['volume_ratio'] * 15, 30)
-        score += volume_score
+        Args:
+            tickers: Ticker for each array position
+            columns: Mapping {indicator field: 1-D array over tickers}
+            valid: Boolean array of tickers with enough history (None = all)
         
-        return round(score, 2)
+        Returns:
+            Dictionary {ticker: status}
+        """
+        return RULES.qualifying(tickers, columns, valid)[STRATEGY.name]
     
-    def _get_status(self, ind: Dict) -> str:
-        """Determine entry status"""
+    @staticmethod
+    def qualify_mask(
+        cols: Mapping[str, np.ndarray],
+        rsi_min=None,
+        rsi_max=None,
+        min_volume_ratio=None
+    ) -> np.ndarray:
+        """
+        Vectorized qualifying rules of config.strategies['swing'] (arrays of any shape)
         
-        # Price pulled back to EMA20
-        if abs(ind['close'] - ind['ema20']) / ind['ema20'] < 0.01:
-            return "READY"
+        Thresholds default to config.settings; passing arrays shaped to
+        broadcast against the columns evaluates many threshold sets at once.
+        """
+        mask, = RULES.evaluate(
+            cols, ('mask',),
+            SWING_RSI_MIN=rsi_min,
+            SWING_RSI_MAX=rsi_max,
+            SWING_MIN_VOLUME_RATIO=min_volume_ratio
+        )[STRATEGY.name]
+        
+        return mask
+    
+    @staticmethod
+    def raw_score_array(cols: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Vectorized score terms of config.strategies['swing'], before rounding"""
         
-        # RSI overextended
-        if ind['rsi'] > 68:
-            return "WAIT (RSI high)"
+        score, = RULES.evaluate(cols, ('score',))[STRATEGY.name]
         
-        return "READY"
\ No newline at end of file
+        return score
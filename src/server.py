@@ -0,0 +1,352 @@
+"""Scan server: one refresh loop, latest picks and indicators served from memory"""
+
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+import pandas as pd
+import config.settings as settings
+from config.universes import DEFAULT_SUFFIX
+from src.pipeline import compute_snapshots
+from src.rescoring import SnapshotMemo, diff_picks
+from src.resample import can_resample, longest_period, resample_frames
+from src.scanners.intraday_scanner import IntradayScanner
+from src.scanners.swing_scanner import SwingScanner
+from src.snapshot import SNAPSHOT_FIELDS
+from src.utils.logger import Logger
+from src.utils.metrics import metrics
+
+# Timeframe name -> (period, interval, scanner class)
+TIMEFRAMES = {
+    'swing': (settings.DATA_PERIOD_SWING, "1d", SwingScanner),
+    'intraday': (settings.DATA_PERIOD_INTRADAY, settings.INTRADAY_INTERVAL, IntradayScanner),
+}
+
+
+def _clean(value):
+    """JSON-safe float (None/NaN/inf become null)"""
+    if value is None:
+        return None
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+class ScanState:
+    """
+    Everything one refresh produced, never modified after it is built
+
+    Responses are rendered to JSON bytes when the state is built, so a read
+    is a dictionary lookup. The service swaps in a new state as a whole, so
+    readers never see half of a refresh.
+    """
+
+    def __init__(
+        self,
+        frames: Dict[str, Dict[str, pd.DataFrame]],
+        snapshots: Dict[str, Dict[str, Dict]],
+        picks: Dict[str, List[Dict]],
+        refreshed_at: float,
+        duration: float,
+        changes: Optional[Dict[str, Dict]] = None
+    ):
+        """
+        Args:
+            frames: {timeframe: {ticker: OHLCV dataframe}}
+            snapshots: {timeframe: {ticker: latest indicator values}}
+            picks: {timeframe: scanner picks}
+            refreshed_at: Epoch time the refresh finished
+            duration: Seconds the refresh took
+            changes: {timeframe: diff_picks() against the previous refresh}
+        """
+        self.frames = frames
+        self.snapshots = snapshots
+        self.picks = picks
+        self.changes = changes or {}
+        self.refreshed_at = refreshed_at
+        self.duration = duration
+
+        generated = datetime.fromtimestamp(refreshed_at).strftime('%Y-%m-%d %H:%M:%S')
+        self.responses: Dict[str, bytes] = {}
+
+        for timeframe, timeframe_picks in picks.items():
+            self.responses[f"/picks/{timeframe}"] = _encode({
+                'generated': generated,
+                'picks': [
+                    {
+                        'rank': rank,
+                        'ticker': pick['ticker'],
+                        'score': _clean(pick['score']),
+                        'status': pick['status'],
+                        'indicators': {field: _clean(pick['indicators'][field]) for field in SNAPSHOT_FIELDS},
+                    }
+                    for rank, pick in enumerate(timeframe_picks, 1)
+                ],
+            })
+
+        for timeframe, diff in self.changes.items():
+            self.responses[f"/changes/{timeframe}"] = _encode({'generated': generated, **diff})
+
+        tickers = {ticker for timeframe_snapshots in snapshots.values() for ticker in timeframe_snapshots}
+        for ticker in tickers:
+            body = {'ticker': ticker, 'generated': generated}
+            for timeframe, timeframe_snapshots in snapshots.items():
+                df = frames[timeframe].get(ticker)
+                body[timeframe] = {
+                    'last_bar': str(df.index[-1]) if df is not None and len(df) else None,
+                    'indicators': timeframe_snapshots.get(ticker),
+                }
+            self.responses[f"/indicators/{ticker}"] = _encode(body)
+
+    def lookup(self, path: str) -> Optional[bytes]:
+        """Rendered response for a path ('/indicators/ONGC' also finds 'ONGC.NS')"""
+        path = urllib.parse.unquote(path)
+        body = self.responses.get(path)
+        if body is None and path.startswith("/indicators/"):
+            ticker = path[len("/indicators/"):].upper()
+            body = self.responses.get(f"/indicators/{ticker if '.' in ticker else ticker + DEFAULT_SUFFIX}")
+        return body
+
+
+class ScanService:
+    """
+    Keeps the latest OHLCV, indicator snapshots and picks resident
+
+    One refresh loop fetches for every reader: each refresh pulls the
+    resampling base interval once (or each timeframe, without resampling)
+    through a single data source whose delta cache keeps repeat fetches
+    small, builds both timeframes, recomputes snapshots and rescans, then
+    publishes a new ScanState. A failed refresh keeps the previous state
+    and is reported by /health.
+
+    Each timeframe keeps a SnapshotMemo in memory, so a refresh recomputes
+    indicators only for stocks with new or revised bars, and
+    /changes/{timeframe} reports how the picks moved since the last refresh.
+    """
+
+    def __init__(self, tickers: List[str], data_source=None, refresh_seconds: Optional[float] = None):
+        """
+        Args:
+            tickers: Universe to keep fresh
+            data_source: Object with fetch_multiple_stocks (a DataFetcher by default)
+            refresh_seconds: Delay between refreshes (defaults to settings.SERVER_REFRESH_SECONDS)
+        """
+        # A fetcher the service created is closed by stop()
+        self._owned_source = data_source is None
+        if data_source is None:
+            from src.data_fetcher import DataFetcher
+            data_source = DataFetcher()
+
+        self.logger = Logger()
+        self.tickers = tickers
+        self.data_source = data_source
+        self.refresh_seconds = refresh_seconds or settings.SERVER_REFRESH_SECONDS
+        self.base_interval = settings.RESAMPLE_BASE_INTERVAL
+        self.memos = {timeframe: SnapshotMemo() for timeframe in TIMEFRAMES} if settings.RESCORE_ENABLED else {}
+
+        self.state: Optional[ScanState] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+        self.started = time.time()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # The service runs indefinitely, so /metrics reports a sliding window
+        metrics.set_window(settings.METRICS_SERVER_WINDOW)
+
+    def refresh(self) -> ScanState:
+        """Fetch, compute and scan both timeframes, then publish the new state"""
+        start = time.perf_counter()
+        frames, snapshots, picks, changes = {}, {}, {}, {}
+
+        with metrics.span("server.refresh"):
+            base = self.base_interval
+            resampled = {
+                timeframe for timeframe, (period, interval, _) in TIMEFRAMES.items()
+                if base and can_resample(base, interval, period)
+            }
+            if resampled:
+                period = longest_period(TIMEFRAMES[timeframe][0] for timeframe in resampled)
+                base_frames = self.data_source.fetch_multiple_stocks(self.tickers, period=period, interval=base)
+
+            for timeframe, (period, interval, scanner_class) in TIMEFRAMES.items():
+                if timeframe in resampled:
+                    frames[timeframe] = resample_frames(base_frames, interval, period, base)
+                else:
+                    frames[timeframe] = self.data_source.fetch_multiple_stocks(self.tickers, period=period, interval=interval)
+                memo = self.memos.get(timeframe)
+                tickers, records = compute_snapshots(frames[timeframe], memo=memo)
+
+                scanner = scanner_class()
+                picks[timeframe] = scanner.scan_columns(tickers, records)
+                if memo is not None:
+                    qualified = scanner.qualifying(tickers, records)
+                    changes[timeframe] = diff_picks(
+                        memo.picks.get(timeframe), picks[timeframe], memo.qualified.get(timeframe), qualified
+                    )
+                    memo.picks[timeframe] = [(pick['ticker'], pick['status']) for pick in picks[timeframe]]
+                    memo.qualified[timeframe] = qualified
+                snapshots[timeframe] = {
+                    ticker: {field: _clean(records[field][i]) for field in SNAPSHOT_FIELDS}
+                    for i, ticker in enumerate(tickers)
+                }
+
+            state = ScanState(frames, snapshots, picks, time.time(), time.perf_counter() - start, changes)
+
+        self.state = state
+        self.refreshes += 1
+        self.last_error = None
+        return state
+
+    def run(self):
+        """Refresh until stop(); errors are logged and retried on the next cycle"""
+        while not self._stop.is_set():
+            try:
+                state = self.refresh()
+                self.logger.info(
+                    f"Refreshed {len(self.tickers)} stocks in {state.duration:.2f}s - "
+                    f"{len(state.picks['swing'])} swing / {len(state.picks['intraday'])} intraday picks"
+                )
+            except Exception as e:
+                self.last_error = str(e)
+                metrics.count("server.refresh_failures")
+                self.logger.error(f"Refresh failed: {str(e)}")
+
+            self._stop.wait(self.refresh_seconds)
+
+    def start(self):
+        """Run the refresh loop on a background thread"""
+        self._thread = threading.Thread(target=self.run, name="scan-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._owned_source:
+            self.data_source.close()
+
+    def health(self) -> Dict:
+        state = self.state
+        return {
+            'status': "ok" if state is not None and self.last_error is None else ("starting" if state is None else "stale"),
+            'tickers': len(self.tickers),
+            'refreshes': self.refreshes,
+            'refreshed_at': datetime.fromtimestamp(state.refreshed_at).strftime('%Y-%m-%d %H:%M:%S') if state else None,
+            'age_seconds': round(time.time() - state.refreshed_at, 3) if state else None,
+            'refresh_seconds': round(state.duration, 3) if state else None,
+            'last_error': self.last_error,
+            'uptime_seconds': round(time.time() - self.started, 3),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET /picks/swing, /picks/intraday, /changes/{timeframe}, /indicators/{ticker}, /health, /metrics"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as two writes; without this, keep-alive reads stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        service: ScanService = self.server.service
+        path = self.path.split("?", 1)[0].rstrip("/") or "/"
+
+        if path == "/health":
+            self._send(200, _encode(service.health()))
+            return
+        if path == "/metrics":
+            self._send(200, metrics.to_prometheus().encode('utf-8'), "text/plain; version=0.0.4")
+            return
+
+        state = service.state
+        if state is None:
+            self._send(503, _encode({'error': "first refresh still running"}))
+            return
+
+        body = state.lookup(path)
+        if body is None:
+            self._send(404, _encode({'error': f"not found: {path}"}))
+            return
+
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request would drown the refresh log
+        pass
+
+
+class _UnixHandler(_Handler):
+    disable_nagle_algorithm = False     # TCP_NODELAY does not apply to Unix sockets
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        # Unix sockets have no peer address; the handler expects a (host, port) pair
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def make_server(service: ScanService, host: Optional[str] = None, port: Optional[int] = None,
+                socket_path: Optional[str] = None):
+    """
+    HTTP server over TCP, or over a Unix socket when socket_path is given
+
+    Args:
+        service: Service whose state is served
+        host: Bind address (defaults to settings.SERVER_HOST)
+        port: TCP port (defaults to settings.SERVER_PORT; 0 picks a free port)
+        socket_path: Unix socket path (replaces TCP)
+    """
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = _UnixHTTPServer(socket_path, _UnixHandler)
+    else:
+        server = ThreadingHTTPServer(
+            (host or settings.SERVER_HOST, settings.SERVER_PORT if port is None else port),
+            _Handler
+        )
+        server.daemon_threads = True
+
+    server.service = service
+    return server
+
+
+def serve(tickers: List[str], host: Optional[str] = None, port: Optional[int] = None,
+          socket_path: Optional[str] = None, refresh_seconds: Optional[float] = None, data_source=None):
+    """Start the refresh loop and serve until interrupted"""
+    logger = Logger()
+    service = ScanService(tickers, data_source, refresh_seconds)
+    server = make_server(service, host, port, socket_path)
+
+    address = socket_path or "http://{}:{}".format(*server.server_address[:2])
+    logger.info(f"Serving {len(tickers)} stocks on {address} (refresh every {service.refresh_seconds:g}s)")
+
+    service.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,100 @@
+"""Compact indicator snapshot types"""
+
+import math
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional
+
+# Snapshot fields, in the IndicatorCalculator.get_latest_values order
+SNAPSHOT_FIELDS = ('close', 'ema20', 'ema50', 'rsi', 'volume', 'volume_ma',
+                   'volume_ratio', 'atr', 'vwap', 'prev_close')
+
+# One record per ticker for batches (vwap None is stored as NaN)
+SNAPSHOT_DTYPE = np.dtype([(field, np.float64) for field in SNAPSHOT_FIELDS])
+
+
+class IndicatorSnapshot(Mapping):
+    """
+    Latest indicator values for one ticker, stored as plain floats
+
+    Uses __slots__ instead of a per-instance dict, but still behaves like the
+    old read-only dict (snapshot['rsi'], .get(), .items(), == dict), so
+    scanners, prompts and reports keep working unchanged.
+    """
+
+    __slots__ = SNAPSHOT_FIELDS
+
+    def __init__(
+        self,
+        close: float,
+        ema20: float,
+        ema50: float,
+        rsi: float,
+        volume: float,
+        volume_ma: float,
+        volume_ratio: float,
+        atr: float,
+        vwap: Optional[float],
+        prev_close: float
+    ):
+        self.close = float(close)
+        self.ema20 = float(ema20)
+        self.ema50 = float(ema50)
+        self.rsi = float(rsi)
+        self.volume = float(volume)
+        self.volume_ma = float(volume_ma)
+        self.volume_ratio = float(volume_ratio)
+        self.atr = float(atr)
+        self.vwap = float(vwap) if vwap is not None else None
+        self.prev_close = float(prev_close)
+
+    @classmethod
+    def from_columns(cls, columns, index: int) -> 'IndicatorSnapshot':
+        """Build a snapshot from one position of a struct-of-arrays batch"""
+        return cls(*(columns[field][index] for field in SNAPSHOT_FIELDS))
+
+    def __getitem__(self, key: str):
+        if key not in SNAPSHOT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(SNAPSHOT_FIELDS)
+
+    def __len__(self) -> int:
+        return len(SNAPSHOT_FIELDS)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """Plain dict copy (e.g. for JSON)"""
+        return {field: getattr(self, field) for field in SNAPSHOT_FIELDS}
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{field}={getattr(self, field)!r}" for field in SNAPSHOT_FIELDS)
+        return f"IndicatorSnapshot({values})"
+
+
+def _values(snapshot: Mapping) -> Iterable[Optional[float]]:
+    if isinstance(snapshot, IndicatorSnapshot):
+        return (getattr(snapshot, field) for field in SNAPSHOT_FIELDS)
+    return (snapshot.get(field) for field in SNAPSHOT_FIELDS)
+
+
+def to_array(snapshots: Iterable[Mapping]) -> np.ndarray:
+    """
+    Pack snapshots into a NumPy structured array (one record per snapshot)
+
+    Snapshots can be IndicatorSnapshots or plain dicts of the same fields
+    (a missing or None value is stored as NaN). The array supports
+    columns['close']-style field access, so it can be passed straight to
+    the scanners' scan_columns().
+    """
+    rows = [
+        tuple(math.nan if value is None else value for value in _values(snapshot))
+        for snapshot in snapshots
+    ]
+    return np.array(rows, dtype=SNAPSHOT_DTYPE)
+
+
+def from_array(records: np.ndarray) -> List[IndicatorSnapshot]:
+    """Unpack a structured array back into snapshots"""
+    return [IndicatorSnapshot.from_columns(records, i) for i in range(len(records))]
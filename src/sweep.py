@@ -0,0 +1,208 @@
+"""Threshold parameter sweep over cached indicator history"""
+
+import argparse
+import itertools
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import config.settings as settings
+from src.backtest import SCANNERS, HistoryPanel, load_history_panel
+from src.utils.logger import Logger
+
+# settings name -> qualify_mask keyword, per scanner
+SWEEP_PARAMETERS = {
+    'swing': {
+        'SWING_RSI_MIN': 'rsi_min',
+        'SWING_RSI_MAX': 'rsi_max',
+        'SWING_MIN_VOLUME_RATIO': 'min_volume_ratio',
+    },
+    'intraday': {
+        'INTRADAY_RSI_MIN': 'rsi_min',
+        'INTRADAY_RSI_MAX': 'rsi_max',
+        'INTRADAY_VOLUME_SPIKE': 'volume_spike',
+    },
+}
+
+DEFAULT_GRIDS = {
+    'swing': {
+        'SWING_RSI_MIN': [30, 35, 40, 45, 50],
+        'SWING_RSI_MAX': [60, 65, 70, 75, 80],
+        'SWING_MIN_VOLUME_RATIO': [0.5, 0.8, 1.0, 1.2, 1.5],
+    },
+    'intraday': {
+        'INTRADAY_RSI_MIN': [35, 40, 45, 50],
+        'INTRADAY_RSI_MAX': [60, 65, 70, 75],
+        'INTRADAY_VOLUME_SPIKE': [0.0, 0.8, 1.0, 1.5, 2.0],
+    },
+}
+
+
+def parse_grid(specs: Sequence[str]) -> Dict[str, List[float]]:
+    """
+    Parse NAME=values grid specs
+
+    Values are either a comma list ('0.5,0.8,1.0') or an inclusive
+    start:stop:step range ('30:50:5').
+    """
+    grid = {}
+
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if ":" in values:
+            start, stop, step = (float(v) for v in values.split(":"))
+            grid[name] = list(np.round(np.arange(start, stop + step / 2, step), 10))
+        else:
+            grid[name] = [float(v) for v in values.split(",")]
+
+    return grid
+
+
+class ParameterSweep:
+    """
+    Evaluates many threshold sets against one HistoryPanel
+
+    Scores do not depend on the thresholds, so every bar's tickers are
+    sorted by score once. Each threshold set then only changes the
+    qualification mask: masks for a whole chunk of parameter sets are built
+    by broadcasting thresholds along a leading parameter axis, and the top N
+    per bar are the first N qualified entries in score order (a cumulative
+    count), with no per-combination Python loop.
+    """
+
+    def __init__(
+        self,
+        panel: HistoryPanel,
+        scanner_name: str = 'swing',
+        horizon: Optional[int] = None,
+        top_n: Optional[int] = None
+    ):
+        self.logger = Logger()
+        self.panel = panel
+        self.scanner_name = scanner_name
+        self.scanner = SCANNERS[scanner_name]()
+        self.horizon = horizon or settings.SWEEP_HORIZON
+        self.top_n = top_n or settings.TOP_N_STOCKS
+
+        cols = panel.fields
+        scores = np.round(self.scanner.raw_score_array(cols), 2)
+        scores = np.where(panel.valid & ~np.isnan(scores), scores, -np.inf)
+
+        # Best-first order of tickers at every bar (stable, like the live sort)
+        order = np.argsort(-scores, axis=1, kind='stable')
+
+        self.sorted_cols = {
+            field: np.take_along_axis(values, order, axis=1)
+            for field, values in cols.items() if field in self.scanner.REQUIRED_FIELDS
+        }
+        self.sorted_valid = np.take_along_axis(np.isfinite(scores), order, axis=1)
+        self.sorted_returns = np.take_along_axis(panel.forward_returns(self.horizon), order, axis=1)
+
+    def run(self, grid: Dict[str, List[float]]) -> pd.DataFrame:
+        """
+        Evaluate every combination in the grid
+
+        Args:
+            grid: {settings name: candidate values}; parameters left out keep
+                  the live rules (settings values, no intraday volume filter)
+
+        Returns:
+            DataFrame with one row per parameter set, best mean return first
+        """
+        parameters = SWEEP_PARAMETERS[self.scanner_name]
+        for name in grid:
+            if name not in parameters:
+                raise ValueError(f"{name} is not a {self.scanner_name} sweep parameter ({', '.join(parameters)})")
+
+        names = [name for name in parameters if name in grid]
+        combos = np.array(list(itertools.product(*(grid[name] for name in names))), dtype=np.float64)
+
+        n_bars, n_tickers = self.sorted_valid.shape
+        chunk = max(1, settings.SWEEP_MAX_CELLS // max(1, n_bars * n_tickers))
+
+        self.logger.info(f"Sweeping {len(combos)} parameter sets in chunks of {chunk}")
+
+        metrics = [self._evaluate(combos[i:i+chunk], names) for i in range(0, len(combos), chunk)]
+        metrics = {key: np.concatenate([m[key] for m in metrics]) for key in metrics[0]}
+
+        table = pd.DataFrame(combos, columns=names)
+        for key, values in metrics.items():
+            table[key] = values
+
+        return table.sort_values(['mean_return', 'picks'], ascending=[False, False]).reset_index(drop=True)
+
+    def _evaluate(self, combos: np.ndarray, names: List[str]) -> Dict[str, np.ndarray]:
+        """Metrics for a chunk of parameter sets (leading axis = parameter set)"""
+        thresholds = {
+            SWEEP_PARAMETERS[self.scanner_name][name]: combos[:, i].reshape(-1, 1, 1)
+            for i, name in enumerate(names)
+        }
+
+        with np.errstate(invalid='ignore'):
+            mask = self.scanner.qualify_mask(self.sorted_cols, **thresholds) & self.sorted_valid
+        mask = np.broadcast_to(mask, (len(combos),) + self.sorted_valid.shape)
+
+        # First top_n qualified tickers in score order, per bar and parameter set
+        selected = mask & (np.cumsum(mask, axis=2) <= self.top_n)
+
+        returns = self.sorted_returns
+        has_return = selected & ~np.isnan(returns)
+        picked_returns = np.where(has_return, returns, 0.0)
+
+        picks = has_return.sum(axis=(1, 2))
+        total = picked_returns.sum(axis=(1, 2))
+        wins = (has_return & (returns > 0)).sum(axis=(1, 2))
+
+        # Equal-weight portfolio return per bar, over bars that had picks
+        per_bar_picks = has_return.sum(axis=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_bar = picked_returns.sum(axis=2) / per_bar_picks
+            per_bar = np.where(per_bar_picks > 0, per_bar, np.nan)
+
+            mean_return = total / picks
+            bar_mean = np.nanmean(per_bar, axis=1)
+            bar_std = np.nanstd(per_bar, axis=1)
+
+            return {
+                'picks': picks,
+                'bars_with_picks': (per_bar_picks > 0).sum(axis=1),
+                'mean_return': mean_return,
+                'hit_rate': wins / picks,
+                'bar_return_mean': bar_mean,
+                'bar_return_std': bar_std,
+                'return_to_risk': bar_mean / bar_std,
+            }
+
+
+def main():
+    """Command-line entry point: python -m src.sweep"""
+    parser = argparse.ArgumentParser(description="Sweep scanner thresholds over historical bars")
+    parser.add_argument("--scanner", choices=sorted(SCANNERS), default="swing")
+    parser.add_argument("--universe", default=settings.UNIVERSE)
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--interval", default="1d")
+    parser.add_argument("--horizon", type=int, default=None)
+    parser.add_argument("--grid", nargs="*", default=None,
+                        help="NAME=v1,v2,... or NAME=start:stop:step (defaults to a built-in grid)")
+    parser.add_argument("--top", type=int, default=20, help="Rows of the ranked table to print")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the cached indicator panel")
+    args = parser.parse_args()
+
+    logger = Logger()
+    logger.header(f"🔧 PARAMETER SWEEP - {args.scanner} on {args.period} of {args.interval} bars")
+
+    panel = load_history_panel(args.universe, args.period, args.interval, args.refresh)
+    grid = parse_grid(args.grid) if args.grid else DEFAULT_GRIDS[args.scanner]
+
+    table = ParameterSweep(panel, args.scanner, args.horizon).run(grid)
+    print(table.head(args.top).to_string(float_format=lambda x: f"{x:.4f}"))
+
+    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    filename = f"{settings.OUTPUT_DIR}/sweep_{args.scanner}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    table.to_csv(filename, index=False)
+    logger.success(f"Ranked parameter sets saved: {filename}")
+
+
+if __name__ == "__main__":
+    main()
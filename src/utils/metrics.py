@@ -0,0 +1,239 @@
+"""Lightweight run instrumentation: timing spans and counters"""
+
+import functools
+import json
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+import config.settings as settings
+
+_NULL_SPAN = nullcontext()
+
+# (metric name, sorted label pairs)
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of a sorted list"""
+    if not values:
+        return math.nan
+    pos = (len(values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+class _Span:
+    __slots__ = ('metrics', 'key', 'start')
+
+    def __init__(self, metrics: 'Metrics', key: _Key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._observe(self.key, time.perf_counter() - self.start)
+        if exc_type is not None:
+            name, labels = self.key
+            self.metrics._count((f"{name}.errors", labels), 1)
+        return False
+
+
+class Metrics:
+    """
+    Records timing samples (spans, observations) and counters for one run
+
+    Timings are in seconds. Metrics are named with dots ('fetch.request')
+    and can carry labels (scanner='swing'). When disabled, span() returns a
+    shared no-op context and the other calls return immediately, so
+    instrumented code pays one attribute check.
+
+    With a window, only the latest `window` samples per metric are kept
+    for the percentiles (count and sum still cover every sample), so a
+    long-running process records in bounded memory.
+    """
+
+    def __init__(self, enabled: bool = True, window: Optional[int] = None):
+        self.enabled = enabled
+        self.window = window
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        self.started = time.time()
+        self.samples: Dict[_Key, deque] = defaultdict(lambda: deque(maxlen=self.window))
+        self.totals: Dict[_Key, List[float]] = defaultdict(lambda: [0, 0.0])
+        self.counters: Dict[_Key, float] = defaultdict(float)
+
+    def set_window(self, window: Optional[int]):
+        """Keep only the latest `window` samples per metric from now on (None keeps all)"""
+        with self._lock:
+            self.window = window
+            samples = self.samples
+            self.samples = defaultdict(lambda: deque(maxlen=self.window))
+            for key, values in samples.items():
+                self.samples[key].extend(values)
+
+    def span(self, name: str, **labels):
+        """Context manager timing a block (seconds); exceptions also count '<name>.errors'"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, _key(name, labels))
+
+    def timed(self, name: str, **labels):
+        """Decorator form of span()"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.span(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def observe(self, name: str, value: float, **labels):
+        """Record one sample (e.g. a latency measured elsewhere)"""
+        if self.enabled:
+            self._observe(_key(name, labels), value)
+
+    def count(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if self.enabled:
+            self._count(_key(name, labels), value)
+
+    def _observe(self, key: _Key, value: float):
+        with self._lock:
+            self.samples[key].append(value)
+            totals = self.totals[key]
+            totals[0] += 1
+            totals[1] += value
+
+    def _count(self, key: _Key, value: float):
+        with self._lock:
+            self.counters[key] += value
+
+    def state(self) -> Dict:
+        """Raw samples and counters, picklable (e.g. to return from a worker process)"""
+        with self._lock:
+            return {
+                'samples': [(name, labels, list(values)) for (name, labels), values in self.samples.items()],
+                'counters': [(name, labels, value) for (name, labels), value in self.counters.items()],
+            }
+
+    def merge(self, state: Optional[Dict]):
+        """Add another registry's state() into this one"""
+        if not state or not self.enabled:
+            return
+        with self._lock:
+            for name, labels, values in state['samples']:
+                key = (name, tuple(map(tuple, labels)))
+                self.samples[key].extend(values)
+                totals = self.totals[key]
+                totals[0] += len(values)
+                totals[1] += sum(values)
+            for name, labels, value in state['counters']:
+                self.counters[(name, tuple(map(tuple, labels)))] += value
+
+    def export(self) -> Dict:
+        """Per-metric statistics, ready for JSON"""
+        # Copy under the lock, sort outside it so recording is not held up
+        with self._lock:
+            samples = {key: list(values) for key, values in self.samples.items()}
+            totals = {key: tuple(total) for key, total in self.totals.items()}
+            counters = dict(self.counters)
+        for values in samples.values():
+            values.sort()
+
+        return {
+            'started': self.started,
+            'duration': time.time() - self.started,
+            'timings': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': totals[(name, labels)][0],
+                    'sum': totals[(name, labels)][1],
+                    'p50': _percentile(values, 0.5),
+                    'p95': _percentile(values, 0.95),
+                    'max': values[-1],
+                }
+                for (name, labels), values in sorted(samples.items()) if values
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    def to_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.export(), f, indent=2)
+
+    def to_prometheus(self, prefix: str = "scanner") -> str:
+        """Prometheus text exposition (timings as *_seconds summaries, counters as *_total)"""
+        data = self.export()
+        lines = []
+        declared = set()
+
+        def metric_name(name: str) -> str:
+            return f"{prefix}_{name.replace('.', '_').replace('-', '_')}"
+
+        def label_text(labels: Dict, **extra) -> str:
+            pairs = {**labels, **extra}
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs.items()) + "}"
+
+        for timing in data['timings']:
+            name = metric_name(timing['name']) + "_seconds"
+            if name not in declared:
+                lines.append(f"# TYPE {name} summary")
+                declared.add(name)
+            lines.append(f"{name}{label_text(timing['labels'], quantile='0.5')} {timing['p50']:.6g}")
+            lines.append(f"{name}{label_text(timing['labels'], quantile='0.95')} {timing['p95']:.6g}")
+            lines.append(f"{name}_sum{label_text(timing['labels'])} {timing['sum']:.6g}")
+            lines.append(f"{name}_count{label_text(timing['labels'])} {timing['count']}")
+
+        for counter in data['counters']:
+            name = metric_name(counter['name']) + "_total"
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{label_text(counter['labels'])} {counter['value']:.6g}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable p50/p95 table"""
+        data = self.export()
+        lines = [f"{'metric':<40} {'count':>7} {'p50':>10} {'p95':>10} {'total':>10}"]
+
+        for timing in data['timings']:
+            label = ",".join(f"{k}={v}" for k, v in timing['labels'].items())
+            name = f"{timing['name']}[{label}]" if label else timing['name']
+            lines.append(
+                f"{name:<40} {timing['count']:>7} {timing['p50']:>9.3f}s {timing['p95']:>9.3f}s {timing['sum']:>9.3f}s"
+            )
+
+        for counter in data['counters']:
+            label = ",".join(f"{k}={v}" for k, v in counter['labels'].items())
+            name = f"{counter['name']}[{label}]" if label else counter['name']
+            lines.append(f"{name:<40} {counter['value']:>7g}")
+
+        return "\n".join(lines)
+
+
+# Process-wide registry used by the instrumented modules
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
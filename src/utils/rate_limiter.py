@@ -0,0 +1,70 @@
+"""Token-bucket rate limiter for upstream API calls"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    `acquire` blocks until enough tokens are available, so callers from
+    many threads are spread out at the configured rate instead of sleeping
+    for a fixed time between batches.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        capacity: float = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            rate: Tokens added per second (None or <= 0 disables limiting)
+            capacity: Maximum burst size
+            clock: Monotonic time source (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.rate = rate if rate and rate > 0 else None
+        self.capacity = max(capacity, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1, deadline: Optional[float] = None) -> bool:
+        """
+        Block until `tokens` are available and consume them
+
+        Args:
+            tokens: Tokens to consume
+            deadline: Time on the bucket's clock to give up at; the tokens
+                      are left for other callers when they would arrive later
+
+        Returns:
+            Whether the tokens were acquired
+        """
+        if self.rate is None:
+            return True
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+                if deadline is not None and self._last + wait > deadline:
+                    return False
+
+            self._sleep(wait)
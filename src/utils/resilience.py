@@ -0,0 +1,151 @@
+"""Retry, circuit-breaker and hedging helpers for upstream requests"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterator, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+def backoff_delays(
+    retries: int,
+    base: float,
+    cap: float,
+    rng: Optional[random.Random] = None
+) -> Iterator[float]:
+    """
+    Sleep before each retry: exponential backoff with full jitter
+
+    The n-th delay is uniform in [0, min(cap, base * 2**n)], so clients
+    that failed together do not retry together.
+
+    Args:
+        retries: Number of retries (delays yielded)
+        base: Upper bound of the first delay (seconds)
+        cap: Largest upper bound (seconds)
+        rng: Random source (injectable for tests)
+    """
+    rng = rng or random
+    for attempt in range(retries):
+        yield rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker for one upstream host
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    allow() refuses requests for `reset_timeout` seconds. Then one trial
+    request is let through (half-open): success closes the circuit, failure
+    opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial request
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may go out now (claims the half-open trial)"""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+            self._trial = False
+
+
+class LatencyTracker:
+    """
+    Rolling latency percentile used to decide when to hedge a request
+
+    Until `min_samples` latencies are recorded, threshold() returns the
+    configured default.
+    """
+
+    def __init__(self, percentile: float, min_samples: int, default: Optional[float], window: int = 200):
+        """
+        Args:
+            percentile: Quantile to hedge at (0.95 = p95)
+            min_samples: Samples needed before the percentile is used
+            default: Threshold until then (None = never hedge)
+            window: Most recent samples kept
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default = default
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which a request counts as slow"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.default
+            values = sorted(self._samples)
+
+        return values[min(int(len(values) * self.percentile), len(values) - 1)]
+
+
+# Process-wide breakers, so every fetcher in a process sees a host's failures
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(host: str, failure_threshold: int, reset_timeout: float) -> CircuitBreaker:
+    """The shared breaker for a host (created on first use)"""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(failure_threshold, reset_timeout)
+        return breaker
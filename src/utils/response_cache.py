@@ -0,0 +1,107 @@
+"""Disk-backed text cache with TTL and LRU eviction"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Stores text responses on disk, one JSON file per key
+
+    Entries older than `ttl` seconds are stale: get() skips them, but
+    get_stale() still returns them as a fallback. Reads bump the file's
+    mtime, so once more than `max_entries` are stored the least recently
+    used ones are deleted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl: float = 6 * 3600,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            cache_dir: Directory for the entry files
+            ttl: Seconds an entry stays fresh
+            max_entries: Entries kept before LRU eviction
+            clock: Wall-clock function (seconds)
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(text: str) -> str:
+        """Cache key for a prompt"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Fresh response for a key, or None"""
+        entry = self._read(key)
+        if entry is None or self.clock() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def get_stale(self, key: str) -> Optional[str]:
+        """Response for a key regardless of age, or None"""
+        entry = self._read(key)
+        return entry[1] if entry else None
+
+    def set(self, key: str, response: str):
+        """Store a response and evict least recently used entries"""
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+            path = self._path(key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'created': self.clock(), 'response': response}, f)
+            os.replace(tmp_path, path)
+
+            self._evict()
+
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            for path in self._entries():
+                os.remove(path)
+
+    def _read(self, key: str) -> Optional[Tuple[float, str]]:
+        path = self._path(key)
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return entry['created'], entry['response']
+
+    def _evict(self):
+        entries = self._entries()
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_entries]:
+            os.remove(path)
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+        return [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir) if name.endswith(".json")
+        ]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -0,0 +1,184 @@
+"""Live intraday watch mode: rescan on every candle close"""
+
+import time
+import pandas as pd
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+import config.settings as settings
+from src.data_cache import interval_to_timedelta
+from src.indicators import IncrementalIndicatorState
+from src.scanners.intraday_scanner import IntradayScanner
+from src.utils.logger import Logger
+
+
+class SystemClock:
+    """Wall clock in the exchange timezone"""
+
+    def now(self) -> pd.Timestamp:
+        return pd.Timestamp.now(tz=settings.MARKET_TIMEZONE)
+
+    def sleep(self, seconds: float):
+        time.sleep(max(seconds, 0))
+
+
+class IntradayWatcher:
+    """
+    Keeps per-ticker indicator state resident and rescans on each candle close
+
+    The data source only needs the DataFetcher methods used here
+    (fetch_multiple_stocks for seeding, fetch_latest_bars for each pass) and
+    the clock needs now()/sleep(), so both can be swapped for offline fakes.
+    """
+
+    def __init__(
+        self,
+        tickers: List[str],
+        data_source,
+        scanner: Optional[IntradayScanner] = None,
+        clock=None,
+        interval: str = settings.INTRADAY_INTERVAL,
+        on_change: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        """
+        Args:
+            tickers: Stock symbols to watch
+            data_source: Object with fetch_multiple_stocks / fetch_latest_bars
+            scanner: Intraday scanner (a new IntradayScanner by default)
+            clock: Object with now() and sleep(seconds) (SystemClock by default)
+            interval: Candle interval to follow
+            on_change: Called with the new top-N picks whenever they change
+        """
+        self.logger = Logger()
+        self.tickers = tickers
+        self.data_source = data_source
+        self.scanner = scanner or IntradayScanner()
+        self.clock = clock or SystemClock()
+        self.interval = interval
+        self.bar_length = interval_to_timedelta(interval)
+        self.on_change = on_change
+
+        self.states: Dict[str, IncrementalIndicatorState] = {}
+        self.picks: List[Dict] = []
+        self._last_key = None
+
+    def seed(self):
+        """Build indicator state from the usual intraday history"""
+        frames = self.data_source.fetch_multiple_stocks(
+            self.tickers,
+            period=settings.DATA_PERIOD_INTRADAY,
+            interval=self.interval
+        )
+
+        now = self.clock.now()
+        for ticker, df in frames.items():
+            self.states[ticker] = IncrementalIndicatorState.from_history(self._closed_bars(df, now))
+
+        self.logger.info(f"Watching {len(self.states)} stocks on {self.interval} candles")
+
+    def next_boundary(self, now: pd.Timestamp) -> pd.Timestamp:
+        """
+        Next candle close, with bars anchored to the session open
+
+        After the close, and on weekends or settings.WATCH_HOLIDAYS, the next
+        boundary is the first candle of the following trading day.
+        """
+        if not self._is_trading_day(now):
+            return self._next_session_open(now) + self.bar_length
+
+        close_h, close_m = map(int, settings.MARKET_CLOSE.split(':'))
+
+        session_open = self._session_open(now)
+        session_close = now.normalize() + timedelta(hours=close_h, minutes=close_m)
+
+        if now < session_open + self.bar_length:
+            return session_open + self.bar_length
+
+        bars_elapsed = (now - session_open) // self.bar_length
+        boundary = session_open + (bars_elapsed + 1) * self.bar_length
+
+        if boundary > session_close:
+            # The last (possibly shorter) candle closes with the session
+            if now < session_close:
+                return session_close
+            return self._next_session_open(now) + self.bar_length
+
+        return boundary
+
+    @staticmethod
+    def _session_open(day: pd.Timestamp) -> pd.Timestamp:
+        open_h, open_m = map(int, settings.MARKET_OPEN.split(':'))
+        return day.normalize() + timedelta(hours=open_h, minutes=open_m)
+
+    @staticmethod
+    def _is_trading_day(day: pd.Timestamp) -> bool:
+        return day.weekday() < 5 and day.strftime('%Y-%m-%d') not in settings.WATCH_HOLIDAYS
+
+    def _next_session_open(self, now: pd.Timestamp) -> pd.Timestamp:
+        """Session open of the first trading day after `now`'s date"""
+        day = now.normalize() + timedelta(days=1)
+        while not self._is_trading_day(day):
+            day += timedelta(days=1)
+        return self._session_open(day)
+
+    def tick(self) -> Optional[List[Dict]]:
+        """
+        Apply newly closed candles and rescan
+
+        Returns:
+            The new top-N picks if they changed, otherwise None
+        """
+        now = self.clock.now()
+        latest = self.data_source.fetch_latest_bars(list(self.states), interval=self.interval)
+
+        updated = 0
+        for ticker, df in latest.items():
+            state = self.states.get(ticker)
+            if state is None:
+                continue
+
+            bars = self._closed_bars(df, now)
+            if state.last_timestamp is not None:
+                bars = bars[bars.index > state.last_timestamp]
+
+            for timestamp, row in bars.iterrows():
+                state.update(row['High'], row['Low'], row['Close'], row['Volume'], timestamp)
+                updated += 1
+
+        snapshots = {ticker: state.get_latest_values() for ticker, state in self.states.items()}
+        picks = self.scanner.scan(snapshots)
+        key = [(pick['ticker'], pick['status']) for pick in picks]
+
+        self.logger.info(f"{now.strftime('%H:%M')} - applied {updated} new bars")
+
+        self.picks = picks
+        if key == self._last_key:
+            return None
+
+        self._last_key = key
+        if self.on_change is not None:
+            self.on_change(picks)
+
+        return picks
+
+    def run(self, max_cycles: Optional[int] = None):
+        """
+        Seed, then wake at every candle boundary until interrupted
+
+        Args:
+            max_cycles: Stop after this many rescans (None = run forever)
+        """
+        self.seed()
+        self.tick()
+
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            now = self.clock.now()
+            wake_at = self.next_boundary(now) + timedelta(seconds=settings.WATCH_GRACE_SECONDS)
+            self.clock.sleep((wake_at - now).total_seconds())
+
+            self.tick()
+            cycles += 1
+
+    def _closed_bars(self, df: pd.DataFrame, now: pd.Timestamp) -> pd.DataFrame:
+        """Drop the candle that is still forming"""
+        return df[df.index + self.bar_length <= now]
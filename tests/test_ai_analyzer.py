@@ -0,0 +1,229 @@
+"""AI analysis: response caching, the deadline fallback and streamed commentary"""
+
+import asyncio
+import io
+import time
+from types import SimpleNamespace
+import pytest
+import config.settings as settings
+from src.ai_analyzer import AIAnalyzer
+from src.utils.response_cache import ResponseCache
+
+
+def make_pick(ticker: str, score: int = 80) -> dict:
+    return {
+        'ticker': ticker, 'score': score, 'status': 'READY',
+        'indicators': {'close': 100.0, 'ema20': 98.0, 'ema50': 95.0, 'rsi': 58.0, 'volume_ratio': 1.6, 'vwap': 99.5},
+    }
+
+
+SWING = [make_pick("RELIANCE.NS"), make_pick("TCS.NS", 75)]
+INTRADAY = [make_pick("INFY.NS", 70)]
+
+
+class StubClient:
+    """Groq-compatible client: chat.completions.create returns canned text"""
+
+    def __init__(self, text: str = "Markets look firm.", delay: float = 0.0, error: Exception = None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content=f"{self.text} #{self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(str(tmp_path), ttl=60, clock=clock)
+
+
+@pytest.fixture(autouse=True)
+def no_api_key(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    monkeypatch.delenv("GROQ_BASE_URL", raising=False)
+
+
+def test_unchanged_picks_are_served_from_the_cache(cache):
+    client = StubClient()
+    analyzer = AIAnalyzer(client=client, cache=cache, timeout=5)
+
+    first = analyzer.analyze_results(SWING, INTRADAY)
+    second = analyzer.analyze_results(SWING, INTRADAY)
+
+    assert first == second == "Markets look firm. #1"
+    assert client.calls == 1
+
+
+def test_changed_picks_miss_the_cache(cache):
+    client = StubClient()
+    analyzer = AIAnalyzer(client=client, cache=cache, timeout=5)
+
+    analyzer.analyze_results(SWING, INTRADAY)
+    assert analyzer.analyze_results(SWING[:1], INTRADAY) == "Markets look firm. #2"
+
+
+def test_expired_analysis_is_requested_again(cache, clock):
+    client = StubClient()
+    analyzer = AIAnalyzer(client=client, cache=cache, timeout=5)
+    analyzer.analyze_results(SWING, INTRADAY)
+
+    clock.now += 61
+    assert analyzer.analyze_results(SWING, INTRADAY) == "Markets look firm. #2"
+    assert client.calls == 2
+
+
+def test_missed_deadline_falls_back_and_caches_the_late_answer(cache):
+    client = StubClient(delay=0.3)
+    analyzer = AIAnalyzer(client=client, cache=cache, timeout=0.05)
+
+    start = time.monotonic()
+    pending = analyzer.start_analysis(SWING, INTRADAY)
+    assert pending.result() == "⚠️ AI analysis unavailable: timed out"
+    assert time.monotonic() - start < 0.3
+
+    pending.future.result(timeout=2)    # The request thread caches before resolving
+    assert analyzer.analyze_results(SWING, INTRADAY) == "Markets look firm. #1"
+
+
+def test_missed_deadline_prefers_an_expired_analysis(cache, clock):
+    analyzer = AIAnalyzer(client=StubClient(), cache=cache, timeout=5)
+    analyzer.analyze_results(SWING, INTRADAY)
+    clock.now += 61
+
+    slow = AIAnalyzer(client=StubClient("Later.", delay=0.3), cache=cache, timeout=0.05)
+    assert slow.analyze_results(SWING, INTRADAY) == "Markets look firm. #1"
+
+
+def test_failed_request_falls_back(cache):
+    analyzer = AIAnalyzer(client=StubClient(error=ConnectionError("connection reset")), cache=cache, timeout=5)
+    assert analyzer.analyze_results(SWING, INTRADAY) == "⚠️ AI analysis unavailable: connection reset"
+
+
+def test_no_api_key_skips_the_request(cache):
+    analyzer = AIAnalyzer(cache=cache, timeout=5)
+    assert analyzer.client is None
+    assert analyzer.analyze_results(SWING, INTRADAY) == "⚠️ AI analysis unavailable: API key not configured"
+
+
+class StubAsyncClient:
+    """
+    AsyncGroq-compatible streaming client
+
+    Each answer streams as three chunks; `delays` sets the pause between
+    chunks per ticker and `errors` makes a ticker's request raise. Tracks
+    how many streams were open at once.
+    """
+
+    def __init__(self, delays=None, errors=()):
+        self.delays = delays or {}
+        self.errors = set(errors)
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        prompt = messages[0]['content']
+        ticker = "overview"
+        if "Do not discuss individual stocks" not in prompt:
+            ticker = next(t for t in (stock['ticker'] for stock in PICKS) if t.replace('.NS', '') in prompt)
+        if ticker in self.errors:
+            raise ConnectionError(f"{ticker} request failed")
+        return self._stream(ticker, self.delays.get(ticker, 0.01))
+
+    async def _stream(self, name: str, delay: float):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            for word in (name, " looks", " firm."):
+                await asyncio.sleep(delay)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+        finally:
+            self.active -= 1
+
+
+PICKS = [make_pick(f"SYN{i:04d}.NS") for i in range(6)]
+
+
+def _section_key(analyzer: AIAnalyzer, stock: dict) -> str:
+    return ResponseCache.key_for(f"{analyzer.model}\n{analyzer._build_pick_prompt(stock, 'swing')}")
+
+
+def test_streamed_sections_keep_pick_order(cache):
+    # Later picks finish first; the output still follows pick order
+    delays = {stock['ticker']: 0.05 - 0.008 * i for i, stock in enumerate(PICKS)}
+    analyzer = AIAnalyzer(async_client=StubAsyncClient(delays), cache=cache, timeout=5)
+    sink = io.StringIO()
+
+    text = analyzer.stream_commentary(PICKS, [], [sink])
+
+    assert sink.getvalue() == text
+    titles = [line for line in text.splitlines() if line.startswith(("📈", "🟦"))]
+    assert titles == ["📈 MARKET OVERVIEW"] + [f"🟦 SYN{i:04d} (swing)" for i in range(6)]
+    for stock in PICKS:
+        assert f"{stock['ticker']} looks firm." in text
+
+
+def test_concurrent_requests_are_capped(cache, monkeypatch):
+    monkeypatch.setattr(settings, "AI_MAX_CONCURRENCY", 2)
+    client = StubAsyncClient({stock['ticker']: 0.02 for stock in PICKS})
+    analyzer = AIAnalyzer(async_client=client, cache=cache, timeout=5)
+
+    analyzer.stream_commentary(PICKS, [], [])
+
+    assert client.peak == 2
+
+
+def test_failed_pick_does_not_affect_the_others(cache):
+    failing = PICKS[2]['ticker']
+    analyzer = AIAnalyzer(async_client=StubAsyncClient(errors=[failing]), cache=cache, timeout=5)
+
+    text = analyzer.stream_commentary(PICKS, [], [])
+
+    assert f"⚠️ AI analysis unavailable: {failing} request failed" in text
+    assert text.count("looks firm.") == len(PICKS)      # Overview plus the five other picks
+
+
+def test_failed_or_slow_pick_falls_back_to_an_expired_answer(cache, clock):
+    failing, slow = PICKS[1], PICKS[4]
+    analyzer = AIAnalyzer(
+        async_client=StubAsyncClient({slow['ticker']: 1.0}, errors=[failing['ticker']]), cache=cache, timeout=0.2
+    )
+    cache.set(_section_key(analyzer, failing), "Earlier take on the failing pick.")
+    cache.set(_section_key(analyzer, slow), "Earlier take on the slow pick.")
+    clock.now += 61
+
+    text = analyzer.stream_commentary(PICKS, [], [])
+
+    assert "Earlier take on the failing pick." in text
+    assert "Earlier take on the slow pick." in text
+    assert f"{PICKS[0]['ticker']} looks firm." in text
+
+
+def test_streamed_sections_are_cached(cache):
+    client = StubAsyncClient()
+    analyzer = AIAnalyzer(async_client=client, cache=cache, timeout=5)
+    first = analyzer.stream_commentary(PICKS[:2], [], [])
+
+    broken = AIAnalyzer(async_client=StubAsyncClient(errors=[p['ticker'] for p in PICKS]), cache=cache, timeout=5)
+    assert broken.stream_commentary(PICKS[:2], [], []) == first
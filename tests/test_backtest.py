@@ -0,0 +1,78 @@
+"""Backtest picks against the live columnar scan"""
+
+import os
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import config.settings as settings
+from src.backtest import MIN_BARS, Backtester, HistoryPanel, load_history_panel
+from src.data_fetcher import DataFetcher
+from src.scanners.intraday_scanner import IntradayScanner
+from src.scanners.swing_scanner import SwingScanner
+from src.snapshot import SNAPSHOT_FIELDS
+
+
+def make_panel(n_dates: int = 40, n_tickers: int = 30, seed: int = 0) -> HistoryPanel:
+    """Random snapshots with scores clustered so that many tie after rounding"""
+    rng = np.random.default_rng(seed)
+    shape = (n_dates, n_tickers)
+
+    close = rng.uniform(100, 110, shape)
+    ema20 = close / rng.uniform(1.0, 1.02, shape)
+    fields = {
+        'close': close,
+        'ema20': ema20,
+        'ema50': ema20 / rng.choice([1.001, 1.002, 1.004], shape),
+        'rsi': rng.choice([45.0, 55.0, 60.0, 65.0], shape),
+        'volume': rng.uniform(1e4, 1e5, shape),
+        'volume_ma': np.full(shape, 5e4),
+        'volume_ratio': rng.choice([0.9, 1.0, 1.2, 2.5], shape),
+        'atr': rng.uniform(1, 2, shape),
+        'vwap': close / rng.choice([1.001, 1.005, 1.03], shape),
+        'prev_close': close * 0.99,
+        'bars': rng.choice([MIN_BARS - 1, MIN_BARS, 200], shape, p=[0.1, 0.1, 0.8]).astype(np.float64),
+    }
+    fields['rsi'][rng.random(shape) < 0.05] = np.nan
+    fields['ema20'][:, 0] = fields['ema20'][:, 1]
+    fields['ema50'][:, 0] = fields['ema50'][:, 1]
+
+    index = pd.date_range("2024-01-01", periods=n_dates, freq="B")
+    return HistoryPanel(index, [f"T{j:02d}.NS" for j in range(n_tickers)], fields)
+
+
+@pytest.mark.parametrize("scanner_class", [SwingScanner, IntradayScanner])
+@pytest.mark.parametrize("top_n", [1, 3, 10])
+def test_select_matches_scan_columns(scanner_class, top_n, monkeypatch):
+    monkeypatch.setattr(settings, "TOP_N_STOCKS", top_n)
+    panel = make_panel(seed=top_n)
+
+    picks, scores = Backtester(scanner_class(), top_n=top_n).select(panel)
+
+    for t in range(len(panel.index)):
+        columns = {field: panel.fields[field][t] for field in SNAPSHOT_FIELDS}
+        live = scanner_class().scan_columns(panel.tickers, columns, panel.valid[t])
+
+        selected = [j for j in picks[t] if j >= 0]
+        assert [panel.tickers[j] for j in selected] == [pick['ticker'] for pick in live], f"bar {t}"
+        assert list(scores[t, :len(selected)]) == [pick['score'] for pick in live], f"bar {t}"
+
+
+@pytest.mark.parametrize("age_hours, rebuilt", [(1, False), (25, True)])
+def test_cached_panel_rebuilt_once_a_bar_old(age_hours, rebuilt, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path))
+    cached, fresh = make_panel(n_dates=5, seed=1), make_panel(n_dates=6, seed=2)
+    path = os.path.join(str(tmp_path), "panels", "nifty50_1y_1d.npz")
+    cached.save(path)
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+
+    fetched = []
+    monkeypatch.setattr(DataFetcher, "fetch_multiple_stocks", lambda self, tickers, **kwargs: fetched.append(tickers) or {})
+    monkeypatch.setattr(HistoryPanel, "from_frames", classmethod(lambda cls, frames, workers=None: fresh))
+
+    panel = load_history_panel("nifty50", "1y", "1d")
+
+    assert bool(fetched) == rebuilt
+    assert len(panel.index) == len((fresh if rebuilt else cached).index)
+    assert len(HistoryPanel.load(path).index) == len(panel.index)
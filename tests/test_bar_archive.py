@@ -0,0 +1,61 @@
+"""Memory-mapped bar archive"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import make_frame
+from src.bar_archive import FIELDS, BarArchive
+from src.frames import OHLCV_COLUMNS
+
+N_WRITERS = 4
+TICKERS_PER_WRITER = 50
+
+
+def frame(ticker_no: int, n_bars: int = 60) -> pd.DataFrame:
+    return make_frame(n_bars, "1d", seed=ticker_no)[list(OHLCV_COLUMNS)]
+
+
+def write_tickers(root: str, writer: int) -> int:
+    """One writer process: archive its own tickers, a few per call"""
+    archive = BarArchive(root)
+    numbers = range(writer * TICKERS_PER_WRITER, (writer + 1) * TICKERS_PER_WRITER)
+    gained = 0
+    for i in range(0, TICKERS_PER_WRITER, 5):
+        gained += archive.write({f"T{n:04d}.NS": frame(n) for n in numbers[i:i + 5]}, "1d")
+    return gained
+
+
+def assert_archived(archive: BarArchive, numbers):
+    for n in numbers:
+        df = archive.read(f"T{n:04d}.NS", "1d")
+        assert df is not None, n
+        pd.testing.assert_frame_equal(df, frame(n), check_freq=False, check_index_type=False)
+
+
+def test_concurrent_writer_processes(tmp_path):
+    root = str(tmp_path)
+    with ProcessPoolExecutor(max_workers=N_WRITERS) as pool:
+        gained = list(pool.map(write_tickers, [root] * N_WRITERS, range(N_WRITERS)))
+
+    archive = BarArchive(root)
+    assert sum(gained) == N_WRITERS * TICKERS_PER_WRITER * 60
+    assert len(archive.tickers("1d")) == N_WRITERS * TICKERS_PER_WRITER
+    assert_archived(archive, range(N_WRITERS * TICKERS_PER_WRITER))
+    assert not [name for name in os.listdir(os.path.join(root, "1d")) if name.endswith(".tmp")]
+
+
+def test_write_after_an_interrupted_append(tmp_path):
+    archive = BarArchive(str(tmp_path))
+    archive.write({f"T{n:04d}.NS": frame(n) for n in range(3)}, "1d")
+
+    # A writer that died after appending part of its blocks but before its index
+    for stem, dtype in FIELDS.values():
+        with open(os.path.join(str(tmp_path), "1d", f"{stem}.0.bin"), 'ab') as f:
+            np.full(37, 7, dtype).tofile(f)
+            f.write(b"\x01\x02\x03")
+
+    archive.write({f"T{n:04d}.NS": frame(n) for n in range(3, 6)}, "1d")
+
+    assert_archived(BarArchive(str(tmp_path)), range(6))
@@ -0,0 +1,80 @@
+"""Benchmark results files and the regression check"""
+
+import json
+import sys
+import time
+import pytest
+from benchmarks import __main__ as cli
+from benchmarks import suite
+
+DELAY = {'seconds': 0.02}   # What the test benchmark sleeps for
+
+
+@pytest.fixture(autouse=True)
+def sleep_benchmark(monkeypatch):
+    monkeypatch.setattr(suite, "BENCHMARKS", {"test.sleep": lambda n: lambda: time.sleep(DELAY['seconds'] * n)})
+    monkeypatch.setattr(suite, "MEMORY_BENCHMARKS", {})
+    monkeypatch.setitem(DELAY, 'seconds', 0.02)
+
+
+def run_cli(monkeypatch, *args) -> int:
+    monkeypatch.setattr(sys, "argv", ["benchmarks", *args])
+    try:
+        cli.main()
+    except SystemExit as e:
+        return e.code
+    return 0
+
+
+def results(min_time: float = 1.0, peak: int = 100 * 2**20) -> dict:
+    return {'results': {'a[50]': {'min': min_time, 'median': min_time}, 'memory.b[50]': {'peak_rss': peak}}}
+
+
+@pytest.mark.parametrize("current, ok", [
+    (results(), True),
+    (results(min_time=1.2), True),              # Within the 25% tolerance
+    (results(min_time=1.3), False),             # Slower than the baseline allows
+    (results(peak=130 * 2**20), False),         # Memory benchmarks compare peak RSS growth
+    (results(min_time=0.5, peak=50), True),
+])
+def test_compare_threshold(current, ok, capsys):
+    assert cli.compare(results(), current, tolerance=0.25) is ok
+    assert ("REGRESSION" in capsys.readouterr().out) is not ok
+
+
+def test_missing_benchmark_is_reported_but_not_a_regression(capsys):
+    current = {'results': {'a[50]': {'min': 1.0}}}
+    assert cli.compare(results(), current, tolerance=0.25)
+    assert "missing" in capsys.readouterr().out
+
+
+def test_run_writes_results_json(tmp_path, monkeypatch):
+    path = tmp_path / "results.json"
+    assert run_cli(monkeypatch, "run", "--tickers", "1", "2", "--repeat", "2", "--output", str(path)) == 0
+
+    written = json.loads(path.read_text(encoding='utf-8'))
+    assert written['sizes'] == [1, 2]
+    assert {'python', 'numpy', 'pandas', 'cpus'} <= set(written['environment'])
+    assert set(written['results']) == {"test.sleep[1]", "test.sleep[2]"}
+    assert written['results']["test.sleep[2]"]['min'] >= 0.04
+
+
+def test_check_fails_on_an_injected_slowdown(tmp_path, monkeypatch):
+    baseline = tmp_path / "baseline.json"
+    run_cli(monkeypatch, "run", "--tickers", "1", "--repeat", "3", "--output", str(baseline))
+
+    assert run_cli(monkeypatch, "check", "--baseline", str(baseline), "--repeat", "3") == 0
+
+    DELAY['seconds'] = 0.04
+    assert run_cli(monkeypatch, "check", "--baseline", str(baseline), "--repeat", "3") == 1
+    assert run_cli(monkeypatch, "check", "--baseline", str(baseline), "--repeat", "3", "--tolerance", "1.5") == 0
+
+
+def test_check_compares_saved_results(tmp_path, monkeypatch):
+    baseline, slow = tmp_path / "baseline.json", tmp_path / "slow.json"
+    run_cli(monkeypatch, "run", "--tickers", "1", "--repeat", "1", "--output", str(baseline))
+    DELAY['seconds'] = 0.04
+    run_cli(monkeypatch, "run", "--tickers", "1", "--repeat", "1", "--output", str(slow))
+
+    assert run_cli(monkeypatch, "check", "--baseline", str(baseline), "--results", str(baseline)) == 0
+    assert run_cli(monkeypatch, "check", "--baseline", str(baseline), "--results", str(slow)) == 1
@@ -0,0 +1,143 @@
+"""Incremental fetching through the OHLCV cache"""
+
+import zlib
+import numpy as np
+import pandas as pd
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import MockTicker, make_frame, make_tickers
+from src.data_cache import OHLCVCache, count_sessions
+from src.data_fetcher import DataFetcher
+from src.utils import resilience
+from src.utils.rate_limiter import TokenBucket
+
+SERIES_END = pd.Timestamp("2026-04-30")
+SESSIONS = {"5d": 5, "60d": 42}     # What the stand-in upstream returns per period
+
+
+class ClockTicker(MockTicker):
+    """
+    MockTicker with a settable clock
+
+    Bars follow one fixed series and stop at `now`; a full request returns
+    the last SESSIONS[period] sessions and a delta request everything from
+    `start`. The candle still forming at `now` comes back with half its
+    final volume, as a live upstream would report it.
+    """
+
+    now = None
+    starts = []
+
+    def history(self, period: str = "ytd", interval: str = "1d", start=None, end=None) -> pd.DataFrame:
+        self.starts.append(start)
+        frames = []
+        for symbol in self.symbols:
+            df = make_frame(100 * 25 if interval == "15m" else 400, interval, zlib.crc32(symbol.encode()), SERIES_END)
+            if interval == "15m":
+                now = self.now.tz_localize(settings.MARKET_TIMEZONE)
+                df = df[df.index <= now]
+                df.iloc[-1, df.columns.get_loc('Volume')] /= 2
+            else:
+                df = df[df.index <= self.now.normalize()]
+
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start, tz=df.index.tz)]
+            else:
+                dates = df.index.normalize()
+                df = df[dates >= np.unique(dates)[-SESSIONS[period]]]
+
+            df = df.drop(columns=['Adj Close']).rename(columns=str.lower)
+            df['adjclose'] = df['close']
+            df.index = pd.MultiIndex.from_product([[symbol], df.index], names=['symbol', 'date'])
+            frames.append(df)
+
+        return pd.concat(frames)
+
+
+@pytest.fixture
+def fetch(tmp_path, monkeypatch):
+    """fetch(clock, period, interval, cached) -> {ticker: bars} with a fixed clock"""
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(ClockTicker, "starts", [])
+    monkeypatch.setattr(DataFetcher, "_now_like", staticmethod(
+        lambda index: ClockTicker.now.tz_localize(index.tz) if index.tz is not None else ClockTicker.now
+    ))
+    tickers = make_tickers(3)
+
+    def run(clock, period, interval, cached=True):
+        monkeypatch.setattr(ClockTicker, "now", pd.Timestamp(clock))
+        fetcher = DataFetcher(
+            cache=OHLCVCache(str(tmp_path)) if cached else None,
+            use_cache=cached,
+            use_archive=False,
+            rate_limiter=TokenBucket(None),
+            ticker_factory=ClockTicker.factory()
+        )
+        try:
+            return fetcher.fetch_multiple_stocks(tickers, period=period, interval=interval)
+        finally:
+            fetcher.close()
+
+    return run
+
+
+def _assert_same(cached, fresh):
+    assert list(cached) == list(fresh)
+    for ticker in fresh:
+        # The cache stores ns timestamps without the index name or frequency
+        pd.testing.assert_frame_equal(
+            cached[ticker], fresh[ticker], check_index_type=False, check_names=False, check_freq=False
+        )
+
+
+@pytest.mark.parametrize("interval, period, first, later", [
+    ("15m", "5d", "2026-03-17 12:30", "2026-03-18 12:30"),
+    ("15m", "5d", "2026-03-17 12:30", "2026-03-17 14:00"),
+    ("1d", "60d", "2026-03-17", "2026-03-20"),
+])
+def test_cached_window_matches_a_fresh_fetch(fetch, interval, period, first, later):
+    fetch(first, period, interval)
+    cached = fetch(later, period, interval)
+    assert ClockTicker.starts == [None, first[:10]]
+
+    fresh = fetch(later, period, interval, cached=False)
+    _assert_same(cached, fresh)
+    assert all(count_sessions(df.index) == SESSIONS[period] for df in cached.values())
+
+
+def test_delta_fetch_replaces_the_forming_candle(fetch):
+    first = fetch("2026-03-17 12:30", "5d", "15m")
+    forming = {ticker: df.index[-1] for ticker, df in first.items()}
+
+    later = fetch("2026-03-17 15:15", "5d", "15m")
+
+    assert ClockTicker.starts == [None, "2026-03-17"]
+    for ticker, df in later.items():
+        assert df.index.is_unique and df.index.is_monotonic_increasing
+        # The half-volume 12:30 candle was overwritten by its completed version
+        assert df.loc[forming[ticker], 'Volume'] == 2 * first[ticker]['Volume'].iloc[-1]
+
+
+def test_cache_file_keeps_only_the_longest_window(fetch, tmp_path):
+    fetch("2026-03-02 12:30", "5d", "15m")
+    for day in pd.bdate_range("2026-03-03", "2026-03-20"):
+        fetch(day + pd.Timedelta(hours=12, minutes=30), "5d", "15m")
+
+    cache = OHLCVCache(str(tmp_path))
+    for ticker in make_tickers(3):
+        data, windows = cache.load(ticker, "15m")
+        assert windows == {"5d": 5}
+        assert count_sessions(data.index) == 5
+
+
+def test_stale_or_unknown_period_refetches_in_full(fetch):
+    fetch("2026-03-02", "60d", "1d")
+    fetch("2026-03-03", "5d", "1d")         # Period never fetched in full
+    fetch("2026-04-28", "5d", "1d")         # Cache older than the period
+    assert ClockTicker.starts == [None, None, None]
+
+
+def test_load_window_uses_the_recorded_sessions(fetch, tmp_path):
+    fresh = fetch("2026-03-18 12:30", "5d", "15m")
+    frames = OHLCVCache(str(tmp_path)).load_window(list(fresh), "15m", "5d")
+    _assert_same(frames, fresh)
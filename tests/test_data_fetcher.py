@@ -0,0 +1,76 @@
+"""Batched fetching: hedging, fallback and the stage deadline"""
+
+import threading
+import time
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import MockTicker, make_tickers
+from src.data_fetcher import DataFetcher
+from src.utils import resilience
+from src.utils.rate_limiter import TokenBucket
+
+
+class RecordingTicker(MockTicker):
+    """MockTicker that logs the symbols of every request"""
+
+    requests = []
+    lock = threading.Lock()
+
+    def history(self, *args, **kwargs):
+        with self.lock:
+            self.requests.append(list(self.symbols))
+        return super().history(*args, **kwargs)
+
+
+@pytest.fixture
+def make_fetcher(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(RecordingTicker, "requests", [])
+    monkeypatch.setattr(settings, "FETCH_BACKOFF_BASE", 0.01)
+    fetchers = []
+
+    def make(hang=()):
+        fetcher = DataFetcher(
+            use_cache=False,
+            use_archive=False,
+            rate_limiter=TokenBucket(None),
+            ticker_factory=RecordingTicker.factory(hang=hang)
+        )
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_hedge_moves_only_the_slow_symbol_to_the_fallback(make_fetcher, monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_TIMEOUT", 1)
+    monkeypatch.setattr(settings, "FETCH_DEADLINE", 0.5)
+    monkeypatch.setattr(settings, "FETCH_HEDGE_DELAY", 0.1)
+    tickers = make_tickers(10)
+    fetcher = make_fetcher(hang=tickers[3:4])
+
+    start = time.perf_counter()
+    frames = fetcher.fetch_multiple_stocks(tickers, period="1y", interval="1d", batch_size=10)
+
+    assert time.perf_counter() - start < settings.FETCH_TIMEOUT
+    assert list(frames) == tickers
+    assert fetcher.fallbacks == [(tickers[3], tickers[3].replace(".NS", ".BO"), "slow")]
+
+
+def test_nothing_requested_after_the_deadline(make_fetcher, monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_TIMEOUT", 0.5)
+    monkeypatch.setattr(settings, "FETCH_DEADLINE", 0.2)
+    monkeypatch.setattr(settings, "FETCH_HEDGE_DELAY", None)
+    tickers = make_tickers(4)
+    fetcher = make_fetcher(hang=tickers)
+
+    start = time.perf_counter()
+    frames = fetcher.fetch_multiple_stocks(tickers, period="1y", interval="1d", batch_size=2)
+    assert time.perf_counter() - start < settings.FETCH_TIMEOUT
+    assert frames == {}
+
+    # The hung requests time out after the deadline: no retry, isolation or fallback follows
+    time.sleep(2 * settings.FETCH_TIMEOUT)
+    assert sorted(RecordingTicker.requests) == [tickers[:2], tickers[2:]]
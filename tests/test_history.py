@@ -0,0 +1,94 @@
+"""Scan history store, report import and CLI"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime
+import pytest
+from src.history import HistoryStore, parse_report
+from src.snapshot import SNAPSHOT_FIELDS, IndicatorSnapshot
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT = os.path.join(ROOT, "outputs", "scan_20260215_023518.txt")
+
+
+def make_pick(ticker: str, score: float, status: str = "READY", close: float = 100.0) -> dict:
+    indicators = IndicatorSnapshot(
+        close=close, ema20=98.0, ema50=95.0, rsi=58.0, volume=2e5,
+        volume_ma=1e5, volume_ratio=2.0, atr=1.5, vwap=None, prev_close=99.0
+    )
+    return {'ticker': ticker, 'score': score, 'status': status, 'indicators': indicators}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        yield store
+
+
+def test_recorded_run_round_trips(store):
+    swing = [make_pick("ONGC.NS", 80.5), make_pick("LT.NS", 45.0, "WAIT (RSI high)")]
+    intraday = [make_pick("SBIN.NS", 15.5, "WAIT (Low volume)")]
+    store.record_run([make_pick("TCS.NS", 70.0)], [], run_at=datetime(2026, 3, 2, 10, 0))
+    store.record_run(swing, intraday, run_at=datetime(2026, 3, 3, 10, 0))
+
+    latest = store.latest_picks('swing')
+    assert [pick['ticker'] for pick in latest] == ["ONGC.NS", "LT.NS"]
+    assert [pick['status'] for pick in latest] == ["READY", "WAIT (RSI high)"]
+    assert latest[0]['score'] == 80.5
+    assert latest[0]['indicators'] == {field: swing[0]['indicators'][field] for field in SNAPSHOT_FIELDS}
+    assert store.latest_picks('intraday')[0]['ticker'] == "SBIN.NS"
+
+
+def test_query_filters(store):
+    store.record_run([make_pick("ONGC.NS", 70.0)], [], run_at=datetime(2026, 3, 2, 10, 0))
+    store.record_run([make_pick("ONGC.NS", 80.0)], [make_pick("ONGC.NS", 50.0)], run_at=datetime(2026, 3, 3, 15, 0))
+    store.record_run([make_pick("LT.NS", 60.0)], [], run_at=datetime(2026, 3, 4, 10, 0))
+
+    assert [row['score'] for row in store.query(ticker="ongc")] == [50.0, 80.0, 70.0]     # Newest first, then scanner
+    assert [row['score'] for row in store.query(ticker="ONGC", scanner="swing", until="2026-03-03")] == [80.0, 70.0]
+    assert [row['ticker'] for row in store.query(since="2026-03-03 12:00:00", scanner="swing")] == ["LT.NS", "ONGC.NS"]
+    assert len(store.query(limit=2)) == 2
+
+    counts = {(row['ticker'], row['scanner']): row['picks'] for row in store.counts()}
+    assert counts == {("ONGC.NS", "swing"): 2, ("ONGC.NS", "intraday"): 1, ("LT.NS", "swing"): 1}
+
+
+def test_sample_report_imports_once(store):
+    assert store.import_reports([REPORT]) == 1
+    assert store.import_reports([REPORT]) == 0
+
+    swing, intraday = store.latest_picks('swing'), store.latest_picks('intraday')
+    assert [pick['ticker'] for pick in swing] == ["ONGC.NS", "JSWSTEEL.NS", "LT.NS"]
+    assert [pick['ticker'] for pick in intraday] == ["EICHERMOT.NS", "SBILIFE.NS", "SBIN.NS"]
+    assert intraday[0]['status'] == "WAIT (Far from VWAP)"
+    assert intraday[0]['score'] == 60.87
+    assert intraday[0]['indicators']['vwap'] == 7760.49
+    assert swing[0]['indicators']['ema50'] == 252.56
+    assert swing[0]['indicators']['atr'] is None     # Not printed in reports
+
+    run_at, _, _ = parse_report(REPORT)
+    assert store.query(ticker="ONGC")[0]['run_at'] == run_at.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _cli(*args) -> str:
+    result = subprocess.run(
+        [sys.executable, "-m", "src.history", *args],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8", check=True
+    )
+    return result.stdout
+
+
+def test_cli_imports_and_queries(tmp_path):
+    db = str(tmp_path / "history.db")
+
+    assert "Imported 1 of 1 reports" in _cli("--db", db, "import", REPORT)
+
+    picks = _cli("--db", db, "picks", "--ticker", "ONGC").splitlines()
+    assert picks[0].split()[:4] == ["run_at", "scanner", "rank", "ticker"]
+    assert len(picks) == 2 and "ONGC.NS" in picks[1] and "80.69" in picks[1]
+
+    counts = _cli("--db", db, "counts", "--scanner", "intraday").splitlines()
+    assert [line.split()[0] for line in counts[1:]] == ["EICHERMOT.NS", "SBILIFE.NS", "SBIN.NS"]
+
+    assert _cli("--db", db, "picks", "--since", "2030-01-01").strip() == "No matching picks"
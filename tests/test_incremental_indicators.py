@@ -0,0 +1,75 @@
+"""Parity of IncrementalIndicatorState with IndicatorCalculator.calculate_all"""
+
+import math
+import numpy as np
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import make_frame
+from src.indicators import IncrementalIndicatorState, IndicatorCalculator
+from src.snapshot import SNAPSHOT_FIELDS
+
+RELATIVE_TOLERANCE = 1e-9
+
+
+def assert_snapshot_matches(actual, expected, bar):
+    assert (actual is None) == (expected is None), f"bar {bar}"
+    if expected is None:
+        return
+
+    for field in SNAPSHOT_FIELDS:
+        got, want = actual[field], expected[field]
+        want = math.nan if want is None else want
+        if math.isnan(want):
+            assert math.isnan(got), f"bar {bar}: {field} = {got}, expected NaN"
+        else:
+            assert got == pytest.approx(want, rel=RELATIVE_TOLERANCE, abs=1e-12), f"bar {bar}: {field}"
+
+
+def replay_and_compare(df, every: int = 7):
+    """Update bar by bar and compare with calculate_all on the same prefix"""
+    state = IncrementalIndicatorState()
+    columns = [df[col].to_numpy(dtype=np.float64) for col in ('High', 'Low', 'Close', 'Volume')]
+
+    for i, (timestamp, high, low, close, volume) in enumerate(zip(df.index, *columns)):
+        state.update(high, low, close, volume, timestamp)
+
+        bars = i + 1
+        if bars < 50:
+            # ta raises on fewer bars than its ATR window; no snapshot either way
+            assert state.get_latest_values() is None
+        elif bars % every == 0 or bars == len(df) or bars in (50, 51):
+            expected = IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df.iloc[:bars]))
+            assert_snapshot_matches(state.get_latest_values(), expected, bars)
+
+    return state
+
+
+@pytest.fixture(params=["numpy", "ta"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "INDICATOR_BACKEND", request.param)
+    monkeypatch.setattr(settings, "MEMORY_LEAN", False)
+    return request.param
+
+
+@pytest.mark.parametrize("interval, bars", [("1d", 60), ("1d", 250), ("15m", 300)])
+def test_update_matches_calculate_all(backend, interval, bars):
+    replay_and_compare(make_frame(bars, interval, seed=bars))
+
+
+def test_nan_volume_matches_pandas_cumsum(backend):
+    df = make_frame(160, "1d", seed=3)
+    df.iloc[[10, 55, 90, 91], df.columns.get_loc('Volume')] = np.nan
+
+    state = replay_and_compare(df, every=1)
+
+    # The running VWAP sums skip the NaN bars instead of staying NaN
+    assert not math.isnan(state.get_latest_values()['vwap'])
+
+
+def test_from_history_matches_updates():
+    df = make_frame(120, "15m", seed=7)
+    replayed = IncrementalIndicatorState.from_history(df)
+
+    expected = IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))
+    assert_snapshot_matches(replayed.get_latest_values(), expected, len(df))
+    assert replayed.last_timestamp == df.index[-1]
@@ -0,0 +1,47 @@
+"""Parity of the universe-wide indicator panel with per-ticker calculate_all"""
+
+import numpy as np
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import make_frame
+from src.indicator_panel import IndicatorPanel
+from src.indicators import INDICATOR_COLUMNS, IndicatorCalculator
+from tests.test_kernel_parity import TOLERANCE, relative_error
+
+# Ragged histories: the ATR window (the shortest ta accepts), around the EMA50
+# window and MIN_BARS, and a year
+LENGTHS = [14, 30, 49, 50, 51, 120, 250]
+
+
+@pytest.fixture
+def frames(monkeypatch):
+    monkeypatch.setattr(settings, "MEMORY_LEAN", False)
+    return {f"SYN{i:04d}.NS": make_frame(bars, "1d", seed=i) for i, bars in enumerate(LENGTHS)}
+
+
+@pytest.mark.parametrize("backend", ["numpy", "ta"])
+def test_panel_columns_match_calculate_all(frames, backend, monkeypatch):
+    monkeypatch.setattr(settings, "INDICATOR_BACKEND", backend)
+    panel = IndicatorPanel.from_frames(frames)
+    n_bars = max(LENGTHS)
+
+    for j, (ticker, df) in enumerate(frames.items()):
+        expected = IndicatorCalculator.calculate_all(df)
+        pad = n_bars - len(df)
+        for field in ['Close', 'Volume'] + INDICATOR_COLUMNS:
+            column = panel.values[field][:, j]
+            assert np.isnan(column[:pad]).all(), (ticker, field)
+            error = relative_error(column[pad:], expected[field].to_numpy())
+            assert error <= TOLERANCE, (ticker, field, error)
+
+
+def test_panel_snapshots_match_get_latest_values(frames):
+    latest = IndicatorPanel.from_frames(frames).latest_values()
+
+    for ticker, df in frames.items():
+        expected = IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))
+        if expected is None:
+            assert latest[ticker] is None, ticker
+            continue
+        for key in ('close', 'ema20', 'ema50', 'rsi', 'volume', 'volume_ma', 'volume_ratio', 'atr', 'vwap', 'prev_close'):
+            assert latest[ticker][key] == pytest.approx(expected[key], rel=TOLERANCE, nan_ok=True), (ticker, key)
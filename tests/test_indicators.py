@@ -0,0 +1,44 @@
+"""Lean (MEMORY_LEAN) indicator frames"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import make_frame
+from src.frames import OHLCV_COLUMNS, compact_ohlcv
+from src.indicators import INDICATOR_COLUMNS, IndicatorCalculator
+
+
+@pytest.fixture(params=["numpy", "ta"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "INDICATOR_BACKEND", request.param)
+    return request.param
+
+
+def _calculate(df: pd.DataFrame, lean: bool, monkeypatch) -> pd.DataFrame:
+    monkeypatch.setattr(settings, "MEMORY_LEAN", lean)
+    return IndicatorCalculator.calculate_all(df)
+
+
+def test_lean_frame_shares_the_input_and_adds_float32_columns(backend, monkeypatch):
+    df = compact_ohlcv(make_frame(300, "15m", seed=5))
+    result = _calculate(df, True, monkeypatch)
+
+    assert list(df.columns) == list(OHLCV_COLUMNS)
+    assert list(result.columns) == list(OHLCV_COLUMNS) + INDICATOR_COLUMNS
+    assert all(result[col].dtype == np.float32 for col in INDICATOR_COLUMNS)
+    for col in OHLCV_COLUMNS:
+        assert np.shares_memory(result[col].to_numpy(), df[col].to_numpy()), col
+
+    added = result.memory_usage(index=False).sum() - df.memory_usage(index=False).sum()
+    assert added == 4 * len(INDICATOR_COLUMNS) * len(df)
+
+
+def test_lean_values_match_the_default_path(backend, monkeypatch):
+    df = make_frame(300, "1d", seed=9)
+    df.iloc[[40, 41], df.columns.get_loc('Volume')] = np.nan
+    lean = _calculate(compact_ohlcv(df), True, monkeypatch)
+    full = _calculate(df, False, monkeypatch)
+
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(lean[col].to_numpy(np.float64), full[col].to_numpy(), rtol=1e-4, err_msg=col)
@@ -0,0 +1,81 @@
+"""Numerical parity of the NumPy indicator kernels against the ta library"""
+
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+from benchmarks.synthetic import make_frame
+from src import kernels
+
+TOLERANCE = 1e-12           # Max relative difference; the kernels agree with ta to ~1e-15
+FLOAT32_TOLERANCE = 1e-6    # ta adds float32 columns in float32; the kernels upcast first
+
+
+def _reference(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    high, low, close, volume = df['High'], df['Low'], df['Close'], df['Volume']
+    return {
+        'ema20': ta.trend.ema_indicator(close, window=20),
+        'ema50': ta.trend.ema_indicator(close, window=50),
+        'rsi': ta.momentum.rsi(close, window=14),
+        'atr': ta.volatility.average_true_range(high, low, close, window=14),
+        'volume_ma': volume.rolling(window=20).mean(),
+        'vwap': (volume * (high + low + close) / 3).cumsum() / volume.cumsum(),
+    }
+
+
+def _kernels(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    high, low, close, volume = (df[col].to_numpy() for col in ('High', 'Low', 'Close', 'Volume'))
+    return {
+        'ema20': kernels.ema(close, 20),
+        'ema50': kernels.ema(close, 50),
+        'rsi': kernels.rsi(close, 14),
+        'atr': kernels.atr(high, low, close, 14),
+        'volume_ma': kernels.rolling_mean(volume, 20),
+        'vwap': kernels.vwap(high, low, close, volume),
+    }
+
+
+def _with_nans(rows: List[int]) -> Callable[[pd.DataFrame], pd.DataFrame]:
+    def apply(df):
+        df = df.copy()
+        df.iloc[rows] = np.nan
+        return df
+    return apply
+
+
+# Case name -> (bars, transform of a synthetic daily frame, float32 prices)
+CASES: Dict[str, Tuple[int, Callable[[pd.DataFrame], pd.DataFrame], bool]] = {
+    'min_atr_window': (14, lambda df: df, False),
+    'short': (60, lambda df: df, False),
+    'daily_year': (250, lambda df: df, False),
+    'long': (20000, lambda df: df, False),
+    'leading_nans': (250, _with_nans(list(range(5))), False),
+    'gaps': (250, _with_nans([0, 1, 100, 150]), False),
+    'flat': (100, lambda df: df.assign(Open=100.0, High=100.0, Low=100.0, Close=100.0), False),
+    'float32': (250, lambda df: df.astype({col: np.float32 for col in ('Open', 'High', 'Low', 'Close')}), True),
+}
+
+
+def relative_error(actual: np.ndarray, expected: np.ndarray) -> float:
+    """Largest relative difference; inf when the NaN positions differ"""
+    actual, expected = np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64)
+    if actual.shape != expected.shape or (np.isnan(actual) != np.isnan(expected)).any():
+        return float('inf')
+
+    both = ~np.isnan(expected)
+    if not both.any():
+        return 0.0
+    scale = np.maximum(np.abs(expected[both]), np.finfo(np.float64).tiny)
+    return float(np.max(np.abs(actual[both] - expected[both]) / scale))
+
+
+@pytest.mark.parametrize("seed, case", list(enumerate(CASES)))
+def test_kernels_match_ta(seed, case):
+    bars, transform, float32 = CASES[case]
+    df = transform(make_frame(bars, "1d", seed=seed))
+    expected, actual = _reference(df), _kernels(df)
+
+    limit = FLOAT32_TOLERANCE if float32 else TOLERANCE
+    errors = {name: relative_error(actual[name], expected[name].to_numpy()) for name in expected}
+    assert all(error <= limit for error in errors.values()), errors
@@ -0,0 +1,62 @@
+"""Lazy tail-only indicators against the full calculate_all"""
+
+import math
+import numpy as np
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import make_frame
+from src.frames import compact_ohlcv
+from src.indicators import IndicatorCalculator
+from src.lazy_indicators import LazyIndicatorCalculator
+from src.snapshot import SNAPSHOT_FIELDS
+
+
+def _nan_rows(rows, columns=None):
+    def apply(df):
+        df = df.copy()
+        df.iloc[rows, [df.columns.get_loc(col) for col in columns or ('Open', 'High', 'Low', 'Close', 'Volume')]] = np.nan
+        return df
+    return apply
+
+
+# Case name -> (interval, bars, transform of the synthetic frame)
+CASES = {
+    'daily': ("1d", 250, lambda df: df),
+    'intraday': ("15m", 300, lambda df: df),
+    'float32': ("15m", 300, compact_ohlcv),
+    'nan_bars': ("1d", 250, _nan_rows([3, 120, 240])),
+    'nan_last_volume': ("15m", 300, _nan_rows([150, -1], ['Volume'])),
+    'nan_last_bar': ("1d", 250, _nan_rows([-1])),
+}
+
+
+@pytest.fixture(params=["numpy", "ta"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(settings, "INDICATOR_BACKEND", request.param)
+    monkeypatch.setattr(settings, "MEMORY_LEAN", False)
+    return request.param
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_latest_values_match_calculate_all(backend, case):
+    interval, bars, transform = CASES[case]
+    df = transform(make_frame(bars, interval, seed=bars))
+
+    expected = IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))
+    actual = LazyIndicatorCalculator().get_latest_values(df)
+
+    for field in SNAPSHOT_FIELDS:
+        want, got = expected[field], actual[field]
+        if want is None or math.isnan(want):
+            assert math.isnan(got), field
+        else:
+            # RSI's ratio can amplify the truncated history's influence a few times
+            assert got == pytest.approx(want, rel=10 * settings.LAZY_TOLERANCE, abs=1e-9), field
+
+
+def test_unrequested_fields_are_nan():
+    df = make_frame(120, "1d", seed=1)
+    snapshot = LazyIndicatorCalculator(fields=['close', 'rsi']).get_latest_values(df)
+
+    assert snapshot['rsi'] == pytest.approx(IndicatorCalculator.get_latest_values(IndicatorCalculator.calculate_all(df))['rsi'])
+    assert all(math.isnan(snapshot[field]) for field in ('ema20', 'ema50', 'atr', 'vwap', 'volume_ma'))
@@ -0,0 +1,19 @@
+"""Command-line entry point"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "numpy", "yahooquery", "groq", "ta"]
+
+
+@pytest.mark.parametrize("module", HEAVY_MODULES)
+def test_import_main_stays_lazy(module):
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print({module!r} in sys.modules)"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
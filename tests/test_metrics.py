@@ -0,0 +1,88 @@
+"""Run instrumentation"""
+
+import glob
+import json
+import os
+import subprocess
+import sys
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import BARS_PER_SESSION, make_frames, make_tickers
+from src.data_cache import OHLCVCache
+from src.utils.metrics import Metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_window_bounds_samples_but_not_totals():
+    registry = Metrics(window=10)
+    for value in range(100):
+        registry.observe("fetch.request", float(value))
+
+    timing, = registry.export()['timings']
+    assert len(registry.samples[("fetch.request", ())]) == 10
+    assert timing['count'] == 100
+    assert timing['sum'] == sum(range(100))
+    assert timing['max'] == 99.0
+    assert timing['p50'] == pytest.approx(94.5)
+
+
+def test_set_window_keeps_latest_samples():
+    registry = Metrics()
+    for value in range(20):
+        registry.observe("server.refresh", float(value))
+    registry.set_window(5)
+    registry.observe("server.refresh", 20.0)
+
+    assert list(registry.samples[("server.refresh", ())]) == [16.0, 17.0, 18.0, 19.0, 20.0]
+    assert registry.export()['timings'][0]['count'] == 21
+
+
+def test_merge_adds_worker_totals():
+    registry, worker = Metrics(window=2), Metrics()
+    for value in (1.0, 2.0, 3.0):
+        worker.observe("fetch.request", value, source="yahoo")
+    registry.merge(worker.state())
+
+    timing, = registry.export()['timings']
+    assert (timing['count'], timing['sum'], timing['labels']) == (3, 6.0, {'source': "yahoo"})
+
+
+def test_offline_run_exports_stage_and_scanner_metrics(tmp_path):
+    # Relative CACHE_DIR / OUTPUT_DIR resolve inside tmp_path
+    cache = OHLCVCache(str(tmp_path / settings.CACHE_DIR))
+    for interval, bars in (("1d", 250), ("15m", 60 * BARS_PER_SESSION)):
+        for ticker, df in make_frames(8, bars, interval).items():
+            cache.save(ticker, interval, df, {})
+    universe = tmp_path / "universe.txt"
+    universe.write_text("\n".join(make_tickers(8)), encoding='utf-8')
+
+    env = {key: value for key, value in os.environ.items() if key != "GROQ_API_KEY"}
+    subprocess.run(
+        [sys.executable, os.path.join(ROOT, "main.py"), "report", "--from-cache", "--universe", str(universe)],
+        cwd=tmp_path, env=env, capture_output=True, check=True
+    )
+
+    exported, = glob.glob(str(tmp_path / settings.OUTPUT_DIR / "metrics_*.json"))
+    with open(exported, encoding='utf-8') as f:
+        data = json.load(f)
+    timings = {(t['name'], tuple(sorted(t['labels'].items()))): t['count'] for t in data['timings']}
+    counters = {(c['name'], tuple(sorted(c['labels'].items()))): c['value'] for c in data['counters']}
+
+    for stage in ("swing", "intraday", "ai"):
+        assert timings[("stage", (("stage", stage),))] == 1
+    for scanner in ("swing", "intraday"):
+        assert timings[("scan", (("path", "columnar"), ("scanner", scanner)))] == 1
+    assert timings[("report.write", ())] == 1
+    assert timings[("report.history", ())] == 1
+
+    # One snapshot pass per timeframe, covering every ticker once
+    snapshots = {labels: count for (name, labels), count in timings.items() if name == "indicators.snapshots"}
+    assert sum(snapshots.values()) == 2
+    recomputed = sum(value for (name, _), value in counters.items() if name == "indicators.recomputed")
+    assert recomputed == 2 * 8
+
+    with open(exported[:-len(".json")] + ".prom", encoding='utf-8') as f:
+        prometheus = f.read()
+    assert 'scanner_scan_seconds_count{path="columnar",scanner="swing"} 1' in prometheus
+    assert 'scanner_stage_seconds_count{stage="intraday"} 1' in prometheus
@@ -0,0 +1,33 @@
+"""Sharded scan pipeline"""
+
+import pytest
+import config.settings as settings
+from src.pipeline import ScanPipeline
+from src.scanners.swing_scanner import SwingScanner
+
+
+def record_rate(shard, rate_limit, rate_burst, collect_metrics=False, memo=None):
+    """Shard worker stand-in that reports the rate limits it was given"""
+    return shard, rate_limit, rate_burst, None
+
+
+@pytest.fixture(autouse=True)
+def rescore_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESCORE_DIR", str(tmp_path))
+
+
+@pytest.mark.parametrize("base_interval", ["", "15m"])
+def test_empty_universe_scans_empty(base_interval):
+    pipeline = ScanPipeline([], base_interval=base_interval)
+    assert pipeline.scan(SwingScanner(), settings.DATA_PERIOD_SWING, "1d") == []
+
+
+def test_rate_limit_and_burst_split_between_workers(monkeypatch):
+    monkeypatch.setattr(settings, "FETCH_RATE_LIMIT", 8.0)
+    monkeypatch.setattr(settings, "FETCH_RATE_BURST", 4)
+    pipeline = ScanPipeline([f"T{i}.NS" for i in range(4)], shard_size=1, workers=2)
+
+    results = pipeline._run_shards(record_rate)
+
+    assert [shard for shard, _, _ in results] == [[f"T{i}.NS"] for i in range(4)]
+    assert all(rate == 4.0 and burst == 2.0 for _, rate, burst in results)
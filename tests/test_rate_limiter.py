@@ -0,0 +1,34 @@
+"""Token-bucket rate limiter"""
+
+from src.utils.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_acquire_paces_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(2.0, 1, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.now == 1.0
+
+
+def test_acquire_gives_up_at_the_deadline_without_consuming():
+    clock = FakeClock()
+    bucket = TokenBucket(1.0, 1, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire()
+
+    assert not bucket.acquire(deadline=0.5)
+    assert clock.now == 0.0
+    assert bucket.acquire(deadline=1.0)
+    assert clock.now == 1.0
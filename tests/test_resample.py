@@ -0,0 +1,57 @@
+"""Timeframes built from one base download"""
+
+import pandas as pd
+import pytest
+import config.settings as settings
+from benchmarks.synthetic import BARS_PER_SESSION, MockTicker, make_tickers
+from src.data_cache import period_to_timedelta
+from src.data_fetcher import DataFetcher
+from src.resample import can_resample
+from src.server import ScanService
+
+
+class WindowedTicker(MockTicker):
+    """MockTicker that, like Yahoo, returns only the requested period of bars"""
+
+    requests = []
+
+    def history(self, period: str = "ytd", interval: str = "1d", start=None, end=None) -> pd.DataFrame:
+        self.requests.append((period, interval))
+        df = super().history(period, interval, start, end)
+        window = period_to_timedelta(period)
+        if start is None and window is not None:
+            dates = df.index.get_level_values('date')
+            df = df[dates >= dates.max() - window]
+        return df
+
+
+@pytest.mark.parametrize("base, interval, period, expected", [
+    ("15m", "15m", "5d", True),
+    ("15m", "1h", "60d", True),
+    ("15m", "1d", "60d", False),    # ~42 sessions: the daily EMA50 never warms up
+    ("15m", "1d", "1y", False),     # Upstream keeps only RESAMPLE_BASE_HISTORY of 15m
+    ("1d", "1d", "60d", True),
+    ("1h", "15m", "5d", False),
+])
+def test_can_resample(base, interval, period, expected):
+    assert can_resample(base, interval, period) == expected
+
+
+def test_daily_resampled_once_the_base_holds_enough_sessions(monkeypatch):
+    monkeypatch.setattr(settings, "RESAMPLE_BASE_HISTORY", "730d")
+    assert can_resample("1h", "1d", "1y")
+
+
+def test_swing_refresh_fetches_daily_bars_directly(monkeypatch):
+    monkeypatch.setattr(settings, "RESCORE_ENABLED", False)
+    monkeypatch.setattr(WindowedTicker, "requests", [])
+    tickers = make_tickers(5)
+    factory = WindowedTicker.factory(n_bars={'1d': 250, '15m': 60 * BARS_PER_SESSION})
+    fetcher = DataFetcher(use_cache=False, use_archive=False, ticker_factory=factory)
+
+    state = ScanService(tickers, data_source=fetcher).refresh()
+
+    # 60 days of 15m bars cannot warm up the daily indicators, so daily bars are requested
+    assert (settings.DATA_PERIOD_SWING, "1d") in WindowedTicker.requests
+    assert set(state.snapshots['intraday']) == set(tickers)
+    assert all(snapshot['ema50'] is not None for snapshot in state.snapshots['intraday'].values())
@@ -0,0 +1,76 @@
+"""Rescoring memo and scan diffs"""
+
+import numpy as np
+import pytest
+import config.settings as settings
+from src.rescoring import SnapshotMemo, diff_picks, format_diff
+from src.scanners.intraday_scanner import IntradayScanner
+from src.scanners.swing_scanner import SwingScanner
+from src.snapshot import SNAPSHOT_FIELDS
+
+
+def picks_of(*entries):
+    return [{'ticker': ticker, 'status': status} for ticker, status in entries]
+
+
+def test_rank_churn_is_not_a_drop_out():
+    previous = [("A.NS", "READY"), ("B.NS", "READY")]
+    picks = picks_of(("C.NS", "READY"), ("A.NS", "READY"))
+    before = {"A.NS": "READY", "B.NS": "READY", "C.NS": "WAIT (RSI high)", "D.NS": "READY"}
+    now = {"A.NS": "READY", "B.NS": "READY", "C.NS": "READY"}
+
+    diff = diff_picks(previous, picks, before, now)
+
+    assert diff['dropped'] == ["D.NS"]
+    assert diff['qualified'] == []
+    assert diff['left_top'] == ["B.NS"]
+    assert diff['entered_top'] == ["C.NS"]
+    assert diff['status_changed'] == [("C.NS", "WAIT (RSI high)", "READY")]
+    assert diff['ready'] == ["C.NS"]
+    assert format_diff(diff) == (
+        "new READY: C.NS; entered top picks: C.NS; left top picks: B.NS; "
+        "dropped out: D.NS; C.NS: WAIT (RSI high) -> READY"
+    )
+
+
+def test_first_scan():
+    diff = diff_picks(None, picks_of(("A.NS", "READY")), None, {"A.NS": "READY"})
+    assert diff['first_scan']
+    assert format_diff(diff) == "No previous scan to compare with"
+
+
+def test_memo_round_trips_qualification(tmp_path):
+    memo = SnapshotMemo("config")
+    memo.picks = {'SwingScanner': [("A.NS", "READY")], 'IntradayScanner': []}
+    memo.qualified = {'SwingScanner': {"A.NS": "READY", "B.NS": "WAIT (RSI high)"}, 'IntradayScanner': {}}
+    path = str(tmp_path / "memo.npz")
+    memo.save(path)
+
+    loaded = SnapshotMemo.load(path)
+
+    assert loaded.picks == memo.picks
+    assert loaded.qualified == memo.qualified
+
+
+@pytest.mark.parametrize("scanner_class", [SwingScanner, IntradayScanner])
+def test_qualifying_covers_every_qualifying_stock(scanner_class, monkeypatch):
+    monkeypatch.setattr(settings, "TOP_N_STOCKS", 3)
+    rng = np.random.default_rng(0)
+    n = 200
+    close = rng.uniform(100, 110, n)
+    ema20 = close / rng.uniform(0.99, 1.02, n)
+    columns = {field: rng.uniform(0, 1, n) for field in SNAPSHOT_FIELDS}
+    columns.update({
+        'close': close, 'ema20': ema20, 'ema50': ema20 / rng.uniform(0.99, 1.01, n),
+        'rsi': rng.uniform(40, 75, n), 'volume_ratio': rng.uniform(0.5, 3, n),
+        'vwap': close / rng.uniform(0.99, 1.03, n),
+    })
+    tickers = [f"T{i:03d}.NS" for i in range(n)]
+    scanner = scanner_class()
+
+    picks = scanner.scan_columns(tickers, columns)
+    qualified = scanner.qualifying(tickers, columns)
+
+    assert len(qualified) > len(picks) == 3
+    assert list(qualified) == [ticker for ticker, ok in zip(tickers, scanner.qualify_mask(columns)) if ok]
+    assert all(qualified[pick['ticker']] == pick['status'] for pick in picks)
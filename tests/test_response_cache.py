@@ -0,0 +1,39 @@
+"""Disk-backed AI response cache"""
+
+import time
+from src.utils.response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_but_stay_available_as_stale(tmp_path):
+    clock = FakeClock()
+    cache = ResponseCache(str(tmp_path), ttl=60, clock=clock)
+    cache.set("k", "analysis")
+
+    clock.now += 60
+    assert cache.get("k") == "analysis"
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.get_stale("k") == "analysis"
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_entries=2)
+    cache.set("a", "A")
+    time.sleep(0.01)
+    cache.set("b", "B")
+    time.sleep(0.01)
+    assert cache.get("a") == "A"        # Reading bumps "a" past "b"
+    time.sleep(0.01)
+    cache.set("c", "C")
+
+    assert cache.get_stale("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
@@ -0,0 +1,110 @@
+"""Dict and columnar scan paths on random snapshot batches"""
+
+import math
+import numpy as np
+import pytest
+import config.settings as settings
+from src.scanners.intraday_scanner import IntradayScanner
+from src.scanners.swing_scanner import SwingScanner
+from src.snapshot import SNAPSHOT_FIELDS, IndicatorSnapshot, to_array
+
+SCANNERS = [SwingScanner, IntradayScanner]
+
+
+def random_batch(rng: np.random.Generator, n: int, nan_rate: float) -> dict:
+    """
+    {ticker: snapshot or None} drawn from a few values per field
+
+    The coarse grids give exact score ties and values sitting on the rule
+    thresholds; some batches repeat whole snapshots. Fields are NaN with
+    probability `nan_rate`, vwap is sometimes None and some tickers have
+    no snapshot at all.
+    """
+    grids = {
+        'close': [99.0, 100.0, 101.0, 102.0, 105.0],
+        'ema20': [99.0, 100.0, 101.0, 104.0],
+        'ema50': [95.0, 99.0, 100.0],
+        'rsi': [35.0, 40.0, 45.0, 55.0, 60.0, 65.0, 68.0, 70.0, 75.0],
+        'volume': [1e5, 2e5],
+        'volume_ma': [1e5],
+        'volume_ratio': [0.5, 0.8, 1.0, 1.2, 1.5, 2.0, 3.0],
+        'atr': [1.0, 2.0],
+        'vwap': [98.0, 99.0, 100.0, 101.0],
+        'prev_close': [99.0, 100.0],
+    }
+    batch, drawn = {}, []
+    for i in range(n):
+        ticker = f"SYN{i:04d}.NS"
+        if rng.random() < 0.1:
+            batch[ticker] = None
+        elif drawn and rng.random() < 0.2:
+            batch[ticker] = drawn[rng.integers(len(drawn))]
+        else:
+            values = {field: float(rng.choice(grids[field])) for field in SNAPSHOT_FIELDS}
+            for field in SNAPSHOT_FIELDS:
+                if rng.random() < nan_rate:
+                    values[field] = math.nan
+            if rng.random() < 0.05:
+                values['vwap'] = None
+            batch[ticker] = IndicatorSnapshot(**values) if rng.random() < 0.5 else values
+            drawn.append(batch[ticker])
+    return batch
+
+
+def summary(picks: list) -> list:
+    """Comparable view of picks (NaN scores compare equal)"""
+    return [
+        (pick['ticker'], None if math.isnan(pick['score']) else pick['score'], pick['status'])
+        for pick in picks
+    ]
+
+
+@pytest.mark.parametrize("scanner_class", SCANNERS)
+@pytest.mark.parametrize("seed", range(40))
+def test_scan_matches_scan_columns(scanner_class, seed, monkeypatch):
+    rng = np.random.default_rng(seed)
+    monkeypatch.setattr(settings, "TOP_N_STOCKS", int(rng.choice([1, 3, 5, 50])))
+    batch = random_batch(rng, int(rng.integers(0, 80)), nan_rate=float(rng.choice([0.0, 0.02, 0.2])))
+
+    tickers = list(batch)
+    valid = np.array([batch[t] is not None for t in tickers], dtype=bool)
+    columns = to_array(batch[t] if batch[t] is not None else {} for t in tickers)
+
+    by_dict = scanner_class().scan(batch)
+    by_columns = scanner_class().scan_columns(tickers, columns, valid)
+
+    assert summary(by_dict) == summary(by_columns)
+    assert len(by_dict) <= settings.TOP_N_STOCKS
+    for pick in by_dict:
+        assert pick['indicators'] is batch[pick['ticker']]
+
+
+INTRADAY_SETUP = {
+    'close': 102.0, 'ema20': 101.0, 'ema50': 100.0, 'rsi': 60.0, 'volume': 2e5,
+    'volume_ma': 1e5, 'volume_ratio': 2.0, 'atr': 1.0, 'vwap': 101.0, 'prev_close': 101.5,
+}
+
+
+@pytest.mark.parametrize("vwap", [None, math.nan])
+def test_missing_vwap_never_qualifies(vwap):
+    # The original scanner let a NaN VWAP through (close <= NaN is false) and
+    # scored it NaN; missing and NaN VWAPs are now both rejected
+    stock_data = {"A.NS": INTRADAY_SETUP, "B.NS": dict(INTRADAY_SETUP, vwap=vwap)}
+    assert [pick['ticker'] for pick in IntradayScanner().scan(stock_data)] == ["A.NS"]
+
+
+@pytest.mark.parametrize("scanner_class", SCANNERS)
+def test_scan_keeps_every_qualifying_stock(scanner_class, monkeypatch):
+    monkeypatch.setattr(settings, "TOP_N_STOCKS", 2)
+    batch = random_batch(np.random.default_rng(7), 200, nan_rate=0.0)
+    scanner = scanner_class()
+
+    picks = scanner.scan(batch)
+
+    valid = np.array([s is not None for s in batch.values()])
+    qualifying = scanner_class().qualifying(list(batch), to_array(s or {} for s in batch.values()), valid)
+    assert len(qualifying) > 2
+    assert picks == scanner.qualified_stocks[:2]
+    assert sorted(pick['ticker'] for pick in scanner.qualified_stocks) == sorted(qualifying)
+    scores = [pick['score'] for pick in scanner.qualified_stocks]
+    assert scores == sorted(scores, reverse=True)
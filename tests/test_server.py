@@ -0,0 +1,29 @@
+"""Scan server state"""
+
+import time
+import pandas as pd
+import pytest
+from src.server import ScanState
+from src.snapshot import SNAPSHOT_FIELDS
+
+
+@pytest.fixture
+def state():
+    frame = pd.DataFrame({'close': [1.0]}, index=pd.DatetimeIndex(["2024-01-01"]))
+    snapshot = {field: 1.0 for field in SNAPSHOT_FIELDS}
+    return ScanState(
+        {'swing': {"M&M.NS": frame, "ONGC.NS": frame}},
+        {'swing': {"M&M.NS": snapshot, "ONGC.NS": snapshot}},
+        {'swing': []},
+        time.time(),
+        0.0
+    )
+
+
+@pytest.mark.parametrize("path", ["/indicators/M%26M.NS", "/indicators/M&M.NS", "/indicators/m%26m", "/indicators/ONGC"])
+def test_lookup_finds_quoted_and_bare_tickers(state, path):
+    assert state.lookup(path) is not None
+
+
+def test_lookup_misses_unknown_ticker(state):
+    assert state.lookup("/indicators/XYZ%2ENS") is None
@@ -0,0 +1,33 @@
+"""Indicator snapshot packing"""
+
+import math
+from src.scanners.intraday_scanner import IntradayScanner
+from src.scanners.swing_scanner import SwingScanner
+from src.snapshot import SNAPSHOT_FIELDS, IndicatorSnapshot, from_array, to_array
+
+SWING_SETUP = {
+    'close': 105.0, 'ema20': 104.0, 'ema50': 100.0, 'rsi': 58.0, 'volume': 2e5,
+    'volume_ma': 1e5, 'volume_ratio': 2.0, 'atr': 2.0, 'vwap': None, 'prev_close': 104.0,
+}
+
+
+def test_to_array_reads_plain_dicts():
+    records = to_array([SWING_SETUP, {'close': 1.0}])
+
+    assert records['close'].tolist() == [105.0, 1.0]
+    assert math.isnan(records['vwap'][0])
+    assert all(math.isnan(records[field][1]) for field in SNAPSHOT_FIELDS if field != 'close')
+
+
+def test_to_array_round_trips_snapshots():
+    snapshots = [IndicatorSnapshot(**dict(SWING_SETUP, vwap=103.0)), IndicatorSnapshot(**dict(SWING_SETUP, close=99.0, vwap=98.0))]
+    assert from_array(to_array(snapshots)) == snapshots
+
+
+def test_scan_accepts_plain_dicts():
+    stock_data = {"A.NS": SWING_SETUP, "B.NS": dict(SWING_SETUP, rsi=90.0), "C.NS": None}
+
+    picks = SwingScanner().scan(stock_data)
+    assert [pick['ticker'] for pick in picks] == ["A.NS"]
+    assert picks[0]['indicators'] is SWING_SETUP
+    assert IntradayScanner().scan(stock_data) == []
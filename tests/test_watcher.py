@@ -0,0 +1,71 @@
+"""Watch mode: candle-boundary scheduling"""
+
+import pandas as pd
+import pytest
+import config.settings as settings
+from src.watcher import IntradayWatcher
+
+
+class FakeClock:
+    """Exchange-time clock that only moves when slept on"""
+
+    def __init__(self, start: str):
+        self.now_ = pd.Timestamp(start, tz=settings.MARKET_TIMEZONE)
+        self.wakes = []
+
+    def now(self) -> pd.Timestamp:
+        return self.now_
+
+    def sleep(self, seconds: float):
+        self.now_ += pd.Timedelta(seconds=seconds)
+        self.wakes.append(self.now_)
+
+
+class EmptySource:
+    def fetch_multiple_stocks(self, tickers, period, interval):
+        return {}
+
+    def fetch_latest_bars(self, tickers, interval):
+        return {}
+
+
+def at(stamp: str) -> pd.Timestamp:
+    return pd.Timestamp(stamp, tz=settings.MARKET_TIMEZONE)
+
+
+@pytest.mark.parametrize("now, expected", [
+    ("2026-03-18 08:00", "2026-03-18 09:30"),     # Before the open: first candle (Wednesday)
+    ("2026-03-18 10:07", "2026-03-18 10:15"),
+    ("2026-03-18 10:15", "2026-03-18 10:30"),     # On a boundary: the next one
+    ("2026-03-18 15:20", "2026-03-18 15:30"),     # Last candle is cut short at the close
+    ("2026-03-18 16:00", "2026-03-19 09:30"),     # After the close: next morning
+    ("2026-03-20 15:45", "2026-03-23 09:30"),     # Friday after the close: Monday
+    ("2026-03-21 11:00", "2026-03-23 09:30"),     # Saturday
+    ("2026-03-22 23:59", "2026-03-23 09:30"),     # Sunday night
+])
+def test_next_boundary(now, expected):
+    watcher = IntradayWatcher([], EmptySource(), clock=FakeClock(now), interval="15m")
+    assert watcher.next_boundary(at(now)) == at(expected)
+
+
+def test_holidays_are_skipped(monkeypatch):
+    monkeypatch.setattr(settings, "WATCH_HOLIDAYS", ("2026-03-23",))
+    watcher = IntradayWatcher([], EmptySource(), interval="15m")
+
+    assert watcher.next_boundary(at("2026-03-20 16:00")) == at("2026-03-24 09:30")
+    assert watcher.next_boundary(at("2026-03-23 10:00")) == at("2026-03-24 09:30")
+
+
+def test_run_sleeps_through_the_weekend(monkeypatch):
+    monkeypatch.setattr(settings, "WATCH_GRACE_SECONDS", 20)
+    clock = FakeClock("2026-03-20 15:10")
+    watcher = IntradayWatcher([], EmptySource(), clock=clock, interval="15m")
+
+    watcher.run(max_cycles=3)
+
+    grace = pd.Timedelta(seconds=20)
+    assert clock.wakes == [
+        at("2026-03-20 15:15") + grace,
+        at("2026-03-20 15:30") + grace,
+        at("2026-03-23 09:30") + grace,
+    ]